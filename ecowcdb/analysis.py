@@ -3,25 +3,34 @@
 """
 
 # Standard Library Imports
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pickle import dump, load
 from math import ceil
+from random import Random
+from threading import Lock
 from time import time
-from typing import Dict, List, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
 
 # Third-Party Library Imports
 from tabulate import tabulate
 from tqdm import tqdm
 
 # Local Imports - ecowcdb libraries
-from ecowcdb.options import DisplayUnit, ForestGeneration, VerboseKW
+from ecowcdb.options import DisplayUnit, ForestGeneration, ForestOrder, ForestSampling, SolverBackend, VerboseKW
 
 # Local Imports - panco libraries
 from ecowcdb.panco.descriptor.network import Network
 from ecowcdb.panco.fifo.fifoLP import FifoLP
+from ecowcdb.panco.lpSolver import LPSolver
 
 # Local Imports - utility libraries
+from ecowcdb.util.cache import BoundCache
 from ecowcdb.util.errors import LPError, LPErrorType
-from ecowcdb.util.network import generate_forests, generate_symmetric_forests, scale_network
+from ecowcdb.util.network import ForestSource, generate_forests, gray_code_order, iterate_subset_forests
+from ecowcdb.util.solver import create_solver
+from ecowcdb.util.symmetry import canonical_forest, network_automorphisms
 from ecowcdb.util.units import convert_result_units, generate_header
 from ecowcdb.util.validation import Validation
 
@@ -39,18 +48,34 @@ class Analysis:
          computed results.
          __net (Network, private): The network object for which the analysis is performed.
          __forest_generation (ForestGeneration, private): Forest generation mode used.
-         __forests (List[List[Tuple[int, int]]], private): Holds the generated forests.
+         __min_edges (int, private): Minimum number of edges in generated forests.
+         __forest_order (ForestOrder, private): Order in which the forests are evaluated by the exhaustive searches.
+         __batch_lps (bool, private): Indicates whether the linear programs of the trees of a forest are solved
+         together.
+         __tree_workers (int, private): Number of linear programs of the trees of a forest solved in parallel.
+         __pipeline_lps (bool, private): Indicates whether the linear programs of the next trees are written while the
+         current one is solved.
+         __forests (List[List[Tuple[int, int]]] | ForestSource, private): Holds the generated forests, or the lazy
+         source generating them.
+         __automorphisms (List[Tuple[List[int], List[int]]], private): Automorphisms of the network, as pairs of server
+         and flow permutations.
          __timeout (int, private): Max timeout value provided by the user. This is the hard timeout limit.
          __delay_unit (DisplayUnit, private): Unit in which the delay values will be displayed in.
          __runtime_unit (DisplayUnit, private): Unit in which the runtime values will be displayed in.
          __temp_folder (str, private): Folderpath in which the .lp files will be stored in.
          __results_folder (str, private): Folderpath in which the results will be stored in.
+         __solver (LPSolver, private): Solver used for every linear program of the analysis.
+         __workers (int, private): Default number of forests evaluated in parallel during the exhaustive searches.
          __verbose (List[VerboseKW], private): List of verbose keywords indicating how much feedback regarding internal
          processes will be displayed to the user.
          __total_runtime (float, private): The total runtime taken in the current exhaustive search.
          __num_iters (int, private): The total number of cuts analyzed in the current exhaustive search.
          __timeout_factor (int, private): Initial timeout factor. Average runtime is multiplied by this factor to
          determine the soft timeout limit. This factor is dynamically updated when necessary.
+         __lock (Lock, private): Lock protecting __total_runtime, __num_iters and __timeout_factor, which are shared by
+         the parallel delay computations.
+         __bound_cache (BoundCache, private): Cache of the scaled networks, their SFA/TFA bounds and their
+         decompositions shared by all the delay computations.
          __SCALE_FACTORS (List[float], private): The list of scaling factors to be applied to the network in terms of
          lp errors.
          __HEADER (List[Tuple[str, str, str, str]], private): Header of the table.
@@ -60,8 +85,13 @@ class Analysis:
      Methods:
          __compute_timeout (private): Dynamic timeout computation method.
          delay (public): Computes the delay for a given forest.
-         __exhaustive_search_symmetric_copy (private): Copies the results to symmetric flows. 
-         __exhaustive_search_symmetric_cycle (private): Exhaustive search for symmetric cycles.
+         __num_forests (private): Returns the number of forests if it is known.
+         search_size (public): Returns the number of forests of the exhaustive searches.
+         projected_runtime (public): Projects the runtime of an exhaustive search.
+         __timed_delay (private): Computes the delay for a given forest and accounts its runtime.
+         __evaluation_order (private): Returns the forests in the order they are evaluated.
+         __evaluate_forests (private): Evaluates a function on forests, in parallel.
+         __exhaustive_search_orbits (private): Exhaustive search for all flows, one forest per orbit.
          exhaustive_search (public): Performs exhaustive search for the given flow.
          exhaustive_search_all_flows (public): Performs exhaustive search for all flows.
          __results_table (private): Returns a table of results for the flow of interest.
@@ -74,16 +104,26 @@ class Analysis:
     __results: Dict[int, List[Tuple[List[Tuple[int, int]], float, float]]]
     __net: Network
     __forest_generation: ForestGeneration
-    __forests: List[List[Tuple[int, int]]]
+    __min_edges: int
+    __forest_order: ForestOrder
+    __batch_lps: bool
+    __tree_workers: int
+    __pipeline_lps: bool
+    __forests: List[List[Tuple[int, int]]] | ForestSource
+    __automorphisms: List[Tuple[List[int], List[int]]]
     __timeout: int
     __delay_unit: DisplayUnit
     __runtime_unit: DisplayUnit
     __temp_folder: str
     __results_folder: str
+    __solver: LPSolver
+    __workers: int
     __verbose: List[VerboseKW]
     __total_runtime: float
     __num_iters: int
     __timeout_factor: int
+    __lock: Lock
+    __bound_cache: BoundCache
     __SCALE_FACTORS: List[float]
     __HEADER: List[Tuple[str, str, str, str]]
     __RESULTS_FILE_FORMAT: str
@@ -92,7 +132,11 @@ class Analysis:
     def __init__(self, net: Network, forest_generation: ForestGeneration = ForestGeneration.All, num_forests: int = 0,
                  min_edges: int = 0, timeout: int = 600, delay_unit: DisplayUnit = DisplayUnit.Second,
                  runtime_unit: DisplayUnit = DisplayUnit.Second, temp_folder: str = '', results_folder: str = '',
-                 verbose: List[VerboseKW] = []) -> None:
+                 verbose: List[VerboseKW] = [], solver_backend: SolverBackend = SolverBackend.LPSolve,
+                 workers: int = 1, lazy_forests: bool = False,
+                 forest_sampling: ForestSampling = ForestSampling.Stratified, slack: int = 0,
+                 forest_order: ForestOrder = ForestOrder.Generation, batch_lps: bool = False,
+                 tree_workers: int = 1, pipeline_lps: bool = False) -> None:
         """
         Initialize analysis. This function will validate all the inputs and generate everything needed to start the
         analysis.
@@ -120,24 +164,65 @@ class Analysis:
              directory from where the intial call was made.
              verbose (List[VerboseKW], optional): List of verbosity options. Default is [] which means all options are
              disabled.
+             solver_backend (SolverBackend, optional): Solver used for the linear programs. Default is
+             SolverBackend.LPSolve which means that the bundled lp_solve executable is used.
+             workers (int, optional): Number of forests evaluated in parallel during the exhaustive searches. Default
+             is 1 which means that the forests are evaluated sequentially.
+             lazy_forests (bool, optional): Indicates whether the forests are generated lazily during the exhaustive
+             searches instead of all at once in the constructor. This is used when the forests do not fit in memory.
+             Note that the randomly selected forests of ForestGeneration.Partial are then not sorted based on their
+             size. Default is False which means that the forests are generated in the constructor.
+             forest_sampling (ForestSampling, optional): Distribution of the forests selected at random. This is only
+             used when the forest_generation is set to ForestGeneration.Partial. Default is ForestSampling.Stratified
+             which means that every forest size is equally likely.
+             slack (int, optional): Number of edges that can be removed from the maximal forests. This is only used
+             when the forest_generation is set to ForestGeneration.Maximal. Default is 0 which means that only the
+             maximal forests are generated.
+             forest_order (ForestOrder, optional): Order in which the forests are evaluated by the exhaustive searches.
+             This is only used when lazy_forests is False. The results are the same for every order. Default is
+             ForestOrder.Generation which means that the forests are evaluated in the order they are generated.
+             batch_lps (bool, optional): Indicates whether the linear programs of the trees of a forest are solved
+             together in a single linear program. The delays are then read from the variables of the solution instead
+             of the objective, so they can differ in the last digits. Default is False which means that one linear
+             program is solved per tree.
+             tree_workers (int, optional): Number of linear programs of the trees of a forest solved in parallel when
+             batch_lps is False. This is in addition to the forests evaluated in parallel. Default is 1 which means
+             that the trees are solved sequentially.
+             pipeline_lps (bool, optional): Indicates whether the linear programs of the next trees of a forest are
+             written in the background while the current one is solved, when batch_lps is False and tree_workers is 1.
+             Default is False which means that every linear program is written right before it is solved.
         """
         self.__validation = Validation.Analysis()
         self.__validation.constructor_arguments(net, forest_generation, num_forests, min_edges, timeout, delay_unit,
-                                                runtime_unit, temp_folder, results_folder, verbose)
+                                                runtime_unit, temp_folder, results_folder, verbose, solver_backend,
+                                                workers, lazy_forests, forest_sampling, slack, forest_order, batch_lps,
+                                                tree_workers, pipeline_lps)
         self.__net = net
         self.__forest_generation = forest_generation
+        self.__min_edges = min_edges
+        self.__forest_order = forest_order
+        self.__batch_lps = batch_lps
+        self.__tree_workers = tree_workers
+        self.__pipeline_lps = pipeline_lps
         self.__forests = generate_forests(net, forest_generation, min_edges, num_forests,
-                                          True if VerboseKW.FG_ProgressBar in verbose else False)
+                                          True if VerboseKW.FG_ProgressBar in verbose else False, forest_sampling,
+                                          lazy_forests, slack)
+        self.__automorphisms = network_automorphisms(net)
         self.__timeout = timeout
         self.__delay_unit = delay_unit
         self.__runtime_unit = runtime_unit
         self.__temp_folder = temp_folder
         self.__results_folder = results_folder
+        self.__solver = create_solver(solver_backend, temp_folder)
+        self.__workers = workers
         self.__verbose = verbose
         self.__results = {}
         self.__total_runtime = 0.0
         self.__num_iters = 0
         self.__timeout_factor = 2
+        self.__lock = Lock()
+        self.__bound_cache = BoundCache(net, temp_folder, 'fifo', True if VerboseKW.LP_Details in verbose else False,
+                                        self.__solver)
         self.__SCALE_FACTORS = [1.0, 0.1, 10.0]
         self.__HEADER = generate_header(delay_unit, runtime_unit)
         self.__RESULTS_FILE_FORMAT = '.txt'
@@ -157,10 +242,11 @@ class Analysis:
          Returns: 
          	 int: The timeout to use during the lp_solve calls in delay computation.
         """
-        if self.__num_iters == 0:
-            return self.__timeout
-        average_runtime = self.__total_runtime / self.__num_iters
-        upper_bound = ceil(average_runtime * self.__timeout_factor)
+        with self.__lock:
+            if self.__num_iters == 0:
+                return self.__timeout
+            average_runtime = self.__total_runtime / self.__num_iters
+            upper_bound = ceil(average_runtime * self.__timeout_factor)
         if self.__timeout < upper_bound:
             return self.__timeout
         if all_delays:
@@ -200,10 +286,14 @@ class Analysis:
         could_not_solve = False
         while not could_not_solve:
             scale_factor = self.__SCALE_FACTORS[scale_factor_index]
-            scaled_net = scale_network(self.__net, scale_factor)
+            scaled_net = self.__bound_cache.network(scale_factor)
+            sfa_delays, tfa_delays = self.__bound_cache.bounds(scale_factor)
             timeout = self.__compute_timeout(_all_delays)
             PLP = FifoLP(scaled_net, list_edges=forest, sfa=True, tfa=True, timeout=timeout,
-                         temp_folder=self.__temp_folder, filename="fifo", verbose=lp_verbose)
+                         temp_folder=self.__temp_folder, filename="fifo", verbose=lp_verbose, sfa_delays=sfa_delays,
+                         tfa_delays=tfa_delays, solver=self.__solver,
+                         decomposition=self.__bound_cache.decomposition(scale_factor, forest), batch=self.__batch_lps,
+                         workers=self.__tree_workers, pipeline=self.__pipeline_lps)
             PLP.forest = PLP.forest.make_feed_forward()
             try:
                 if _all_delays:
@@ -227,7 +317,8 @@ class Analysis:
                         could_not_solve = True
                     else:
                         error_msg = f'{lperror} encountered for {timeout=}. Doubling the timeout value...'
-                        self.__timeout_factor *= 2
+                        with self.__lock:
+                            self.__timeout_factor *= 2
                 elif lperror.error_type() in [LPErrorType.InfeasibleProblemError, LPErrorType.UnboundedProblemError,
                                               LPErrorType.UnhandledLPError]:
                     error_msg = f'{lperror} encountered. Could not solve the LP. Skipping this cut!'
@@ -239,68 +330,229 @@ class Analysis:
                     print(error_msg)
 
         # Return infinity if this cut has failed.
+        if _all_delays:
+            return self.__net.num_flows * [float('inf')]
         return float('inf')
-    
-    # Copies the results obtained in exhaustive search to other flows
-    def __exhaustive_search_symmetric_copy(self) -> None:
+
+    def __num_forests(self) -> int | None:
+        """
+         Returns the number of forests if it is known. The number of forests of a lazy source may be unknown or an
+         estimate. This is a helper function for the progressbars of the exhaustive searches.
+         
+         Returns: 
+         	 int | None: Number of forests, None if it is unknown.
+        """
+        if isinstance(self.__forests, ForestSource):
+            return self.__forests.count()
+        return len(self.__forests)
+
+    def search_size(self) -> int:
+        """
+         Returns the number of forests of the exhaustive searches. The forests of ForestGeneration.All are counted
+         without being generated, so this can be used to check whether an exhaustive search is feasible. The lazily
+         generated maximal forests are generated to be counted.
+         
+         Returns: 
+         	 int: Number of forests.
         """
-         Copies the results of flow 0 to all other flows by offsetting the node indexes in edges. This is a helper
-         function for __exhaustive_search_symmetric_cycle.
+        num_forests = self.__num_forests()
+        if num_forests is None:
+            num_forests = sum(1 for _ in self.__forests)
+        return num_forests
+
+    def projected_runtime(self, foi: int | None = None, sample_size: int = 5, workers: int | None = None) -> float:
+        """
+         Projects the runtime of an exhaustive search from the runtime of a small calibration sample of forests. The
+         sample is drawn uniformly among the valid forests with ForestGeneration.All, and among the generated forests
+         otherwise. The delays computed for the sample are not saved in the results. If the network is symmetric, a
+         single forest per orbit is analyzed by the exhaustive searches, and the number of orbits is estimated by the
+         number of forests divided by the number of automorphisms.
+         
+         Args:
+         	 foi (int | None, optional): Flow of interest of the projected exhaustive_search. Default is None which
+             means that the runtime of exhaustive_search_all_flows is projected.
+         	 sample_size (int, optional): Number of forests analyzed for the calibration. Default is 5.
+         	 workers (int | None, optional): Number of forests evaluated in parallel during the projected search.
+             Default is None which means that the value given to the constructor is used.
+         
+         Returns: 
+         	 float: The projected runtime [seconds].
         """
+        self.__validation.callable(self.__forest_generation, self.projected_runtime)
+        if foi is not None:
+            self.__validation.foi(foi, self.__net.num_flows)
+        self.__validation.sample_size(sample_size)
+        self.__validation.workers(workers)
+        if workers is None:
+            workers = self.__workers
+
+        num_forests = self.search_size()
+        if num_forests <= sample_size:
+            sample = list(self.__forests)
+        elif self.__forest_generation == ForestGeneration.All:
+            # The empty forest is always generated first by the sampler.
+            sample = list(iterate_subset_forests(self.__net, self.__min_edges, sample_size+1,
+                                                 ForestSampling.Uniform))[1:]
+        elif isinstance(self.__forests, ForestSource):
+            sample = list(islice(self.__forests, sample_size))
+        else:
+            sample = Random(0).sample(self.__forests, sample_size)
+        if len(sample) == 0:
+            return 0.0
+
+        # The sample is analyzed like the forests of the projected search.
+        all_delays = foi is None or len(self.__automorphisms) > 1
         N = self.__net.num_flows
-        for foi in range(1, N):
-            # One-liner which offsets edges in the forest to obtain results of other flows.
-            self.__results[foi]\
-                = [(sorted([((edge[0]+foi)%N,(edge[1]+foi)%N) for edge in result[0]], key=lambda x: x[0]),
-                    result[1], result[2]) for result in self.__results[0]]
-
-    def __exhaustive_search_symmetric_cycle(self) -> None:
-        """
-         Exhaustive search for symmetric cycles. More efficient computation for a single flow by exploiting the fact
-         that there are many symmetric forests. Computing results for a single flow and all flows is the same runtime.
-         Therefore, even if the user asks for a single flow to be computed, all flows are computed.
-        """
-        result = []
-        forests = self.__forests
-        if VerboseKW.ES_ProgressBar in self.__verbose:
-            forests = tqdm(
-                iterable=self.__forests,
-                desc=f'Symmetric cycle detected. Calculating delay bounds for all flows',
-                unit='forest')
-
-        pre_computed_forests = set()
-        for forest in forests:
-            # Check whether the result for that forest was computed by symmetricity in a previous iteration.
-            if tuple(forest) in pre_computed_forests:
-                pre_computed_forests.remove(tuple(forest))
-                continue
-
-            start = time()
-            symmetric_forests = generate_symmetric_forests(forest, self.__net.num_servers)
-            delays = self.delay(None, forest, _internal_call=True, _all_delays=True)
-            end = time()
-            elapsed = end - start
-            for delay, symmetric_forest in zip(delays[:len(symmetric_forests)],
-                                               [symmetric_forests[0]] + symmetric_forests[1:][::-1]):
-                result.append((symmetric_forest, delay, elapsed/len(symmetric_forests)))
-                pre_computed_forests.add(tuple(symmetric_forest))
+        total_runtime, num_iters = self.__total_runtime, self.__num_iters
+        elapsed = sum(self.__timed_delay(foi if not all_delays else None, forest, N if all_delays else 1,
+                                         all_delays)[1] for forest in sample)
+        self.__total_runtime, self.__num_iters = total_runtime, num_iters
 
+        num_evaluations = ceil(num_forests / len(self.__automorphisms))
+        return num_evaluations * elapsed / len(sample) / min(workers, num_evaluations)
+
+    def __timed_delay(self, foi: int | None, forest: List[Tuple[int, int]], num_iters: int = 1,
+                      all_delays: bool = False) -> Tuple[float | List[float], float]:
+        """
+         Computes the delay for a given forest and accounts its runtime in the statistics used by __compute_timeout.
+         This is a helper function for the exhaustive searches.
+         
+         Args:
+         	 foi (int | None, required): Flow of interest. None only if all_delays is True.
+         	 forest (List[Tuple[int, int]], required): List of edges representing the forest.
+         	 num_iters (int, optional): Number of cuts analyzed by this computation. Default is 1.
+         	 all_delays (bool, optional): Indicates whether all flow delays should be computed. Default is False.
+         
+         Returns: 
+         	 Tuple[float | List[float], float]: The delay(s) computed by delay, and the elapsed time.
+        """
+        start = time()
+        delay = self.delay(foi, forest, _internal_call=True, _all_delays=all_delays)
+        end = time()
+        elapsed = end - start
+        with self.__lock:
             self.__total_runtime += elapsed
-            self.__num_iters += len(symmetric_forests)
-            pre_computed_forests.remove(tuple(forest))
-        
+            self.__num_iters += num_iters
+        return delay, elapsed
+
+    def __evaluation_order(self, forests: List[Any] | ForestSource, key: Callable[[Any], List[Tuple[int, int]]]
+                           ) -> Iterable[Tuple[int, Any]]:
+        """
+         Returns the forests in the order they are evaluated, with their index in the generation order. The results
+         are sorted by delay and by generation order, so they do not depend on the evaluation order. The forests of a
+         lazy source are evaluated in the order they are generated. This is a helper function for the exhaustive
+         searches.
+         
+         Args:
+         	 forests (List[Any] | ForestSource, required): Forests (or items containing forests) in generation order.
+         	 key (Callable[[Any], List[Tuple[int, int]]], required): Function returning the forest of an item.
+         
+         Returns: 
+         	 Iterable[Tuple[int, Any]]: The pairs of index and item, in evaluation order.
+        """
+        if isinstance(forests, ForestSource) or self.__forest_order == ForestOrder.Generation:
+            return enumerate(forests)
+        return [(i, forests[i]) for i in gray_code_order(self.__net, [key(forest) for forest in forests])]
+
+    def __evaluate_forests(self, evaluate: Callable[[Any], Any], forests: Iterable[Any], workers: int, desc: str,
+                           total: int | None) -> List[Tuple[Any, Any]]:
+        """
+         Evaluates the function on every forest with a pool of threads. The delay computations spend their
+         time waiting for the solver, so the forests are evaluated in parallel. The forests are consumed as the
+         evaluations progress: only a few forests per worker are taken in advance from the iterable, so that a lazy
+         source of forests is never held in memory. This is a helper function for the exhaustive searches.
+         
+         Args:
+         	 evaluate (Callable[[Any], Any], required): Function evaluated on each forest.
+         	 forests (Iterable[Any], required): The forests to evaluate.
+         	 workers (int, required): Number of forests evaluated in parallel.
+         	 desc (str, required): Description of the progressbar.
+         	 total (int | None, required): Number of forests displayed by the progressbar, None if it is unknown.
+         
+         Returns: 
+         	 List[Tuple[Any, Any]]: The forests with the results of the function, in the order of the forests.
+        """
+        results = []
+        with ThreadPoolExecutor(max_workers=workers) as executor, \
+             tqdm(total=total, desc=desc, unit='forest', disable=VerboseKW.ES_ProgressBar not in self.__verbose) as pbar:
+            pending = deque()
+            for forest in forests:
+                pending.append((forest, executor.submit(evaluate, forest)))
+                if len(pending) >= 2*workers:
+                    forest, future = pending.popleft()
+                    results.append((forest, future.result()))
+                    pbar.update(1)
+            while len(pending) != 0:
+                forest, future = pending.popleft()
+                results.append((forest, future.result()))
+                pbar.update(1)
+        return results
+    
+    def __exhaustive_search_orbits(self, workers: int) -> None:
+        """
+         Exhaustive search for all flows, which evaluates a single forest per orbit of the automorphism group of the
+         network. An automorphism maps a forest to a forest with the same delays up to a permutation of the flows, so
+         the delays of the other forests of the orbit are obtained by permuting the delays of the evaluated forest. The
+         runtime of the evaluated forest is equally shared between the forests of its orbit and the flows.
+
+         Args:
+         	 workers (int, required): Number of forests evaluated in parallel.
+        """
+        N = self.__net.num_flows
+        # Flow permutation of the evaluated forest (inverted) and number of forests of each orbit, by canonical forest.
+        orbits = {}
+        members = []
+
+        # Select the forests to compute: the first forest of each orbit.
+        def select_forests() -> Iterator[Tuple[List[Tuple[int, int]], Tuple[Tuple[int, int], ...]]]:
+            for forest in self.__forests:
+                canonical, flow_map = canonical_forest(forest, self.__automorphisms)
+                members.append((forest, canonical, flow_map))
+                if canonical in orbits:
+                    orbits[canonical][1] += 1
+                    continue
+                inverse_flow_map = N * [0]
+                for j in range(N):
+                    inverse_flow_map[flow_map[j]] = j
+                orbits[canonical] = [inverse_flow_map, 1]
+                yield forest, canonical
+
+        # The number of selected forests is only known if all the forests are already generated.
+        computed_forests = select_forests()
+        total = None
+        if not isinstance(self.__forests, ForestSource):
+            computed_forests = list(computed_forests)
+            total = len(computed_forests)
+
+        desc = 'Calculating delay bounds for all flows'
+        if len(self.__automorphisms) > 1:
+            desc = f'Symmetric network detected ({len(self.__automorphisms)} automorphisms). ' + desc
+        evaluations = self.__evaluate_forests(lambda item: self.__timed_delay(None, item[1][0], N, all_delays=True),
+                                              self.__evaluation_order(computed_forests, lambda forest: forest[0]),
+                                              workers, desc, total)
+        evaluations = {canonical: evaluation for (_, (_, canonical)), evaluation in evaluations}
+
         self.__total_runtime = 0.0
         self.__num_iters = 0
-        self.__results[0] = sorted(result, key=lambda x: x[1])
-        self.__exhaustive_search_symmetric_copy()
-
-    def exhaustive_search(self, foi: int, _internal_call: bool = False) -> None:
+        results = [[] for _ in range(N)]
+        for forest, canonical, flow_map in members:
+            inverse_flow_map, orbit_size = orbits[canonical]
+            delays, elapsed = evaluations[canonical]
+            for foi in range(N):
+                results[foi].append((forest, delays[inverse_flow_map[flow_map[foi]]], elapsed/(orbit_size*N)))
+        for foi in range(N):
+            self.__results[foi] = sorted(results[foi], key=lambda x: x[1])
+
+    def exhaustive_search(self, foi: int, workers: int | None = None, _internal_call: bool = False) -> None:
         """
          Performs exhaustive search for the given flow over all forests in self.__forests. Saves results in
-         self.__results.
+         self.__results. If the network is symmetric, computing the results of all the flows for a single forest per
+         orbit is faster, so the results of all the flows are computed.
          
          Args:
          	 foi (int, required): Flow of interest.
+         	 workers (int | None, optional): Number of forests evaluated in parallel. Default is None which means that
+             the value given to the constructor is used.
          	 _internal_call (bool, internal): This is an internal parameter and should not be changed by the user.
              Indicates whether the function was called internally. Default is False.
         """
@@ -308,47 +560,42 @@ class Analysis:
         if not _internal_call:
             self.__validation.callable(self.__forest_generation, self.exhaustive_search)
             self.__validation.foi(foi, self.__net.num_flows)
+            self.__validation.workers(workers)
+        if workers is None:
+            workers = self.__workers
 
-        # If it is a symmetric cycle, we can perform the efficient exhaustive search.
-        if self.__net.symmetric_cycle and self.__forest_generation == ForestGeneration.All:
-            self.__exhaustive_search_symmetric_cycle()
+        # If the network is symmetric, the delays of all flows are computed for a single forest per orbit.
+        if len(self.__automorphisms) > 1:
+            self.__exhaustive_search_orbits(workers)
             return
         
-        result = []
-        forests = self.__forests
-        if VerboseKW.ES_ProgressBar in self.__verbose:
-            forests = tqdm(
-                iterable=self.__forests,
-                desc=f'Calculating delay bounds for flow {foi}',
-                unit='forest')
-
-        for forest in forests:
-            start = time()
-            delay = self.delay(foi, forest, _internal_call=True)
-            end = time()
-            elapsed = end - start
-            result.append((forest, delay, elapsed))
-            self.__total_runtime += elapsed
-            self.__num_iters += 1
+        evaluations = self.__evaluate_forests(lambda item: self.__timed_delay(foi, item[1]),
+                                              self.__evaluation_order(self.__forests, lambda forest: forest),
+                                              workers, f'Calculating delay bounds for flow {foi}', self.__num_forests())
+        # Restore the generation order, so that the forests with equal delays keep it after sorting.
+        evaluations.sort(key=lambda evaluation: evaluation[0][0])
+        result = [(forest, delay, elapsed) for (_, forest), (delay, elapsed) in evaluations]
         
         self.__total_runtime = 0.0
         self.__num_iters = 0
         self.__results[foi] = sorted(result, key=lambda x: x[1])
 
-    def exhaustive_search_all_flows(self) -> None:
+    def exhaustive_search_all_flows(self, workers: int | None = None) -> None:
         """
          Perform exhaustive search for all flows over all forests in self.__forests. Saves results in self.__results.
+         The delays of all the flows are computed with a single delay computation per forest, the runtime of which is
+         equally shared between the flows. If the network is symmetric, a single forest per orbit is computed.
+
+         Args:
+         	 workers (int | None, optional): Number of forests evaluated in parallel. Default is None which means that
+             the value given to the constructor is used.
         """
         self.__validation.callable(self.__forest_generation, self.exhaustive_search_all_flows)
+        self.__validation.workers(workers)
+        if workers is None:
+            workers = self.__workers
 
-        # If it is a symmetric cycle, we can perform the efficient exhaustive search.
-        if self.__net.symmetric_cycle and self.__forest_generation == ForestGeneration.All:
-            self.__exhaustive_search_symmetric_cycle()
-            return
-
-        for foi in range(self.__net.num_flows):
-            self.exhaustive_search(foi, _internal_call=True)
-
+        self.__exhaustive_search_orbits(workers)
 
     def __results_table(self, foi: int) -> str:
         """
@@ -6,13 +6,19 @@
 from time import time
 from typing import List, Tuple
 
+# Local Imports - ecowcdb libraries
+from ecowcdb.options import SolverBackend
+
 # Local Imports - panco libraries
 from ecowcdb.panco.descriptor.network import Network
 from ecowcdb.panco.fifo.fifoLP import FifoLP
+from ecowcdb.panco.lpSolver import LPSolver
 
 # Local Imports - utility libraries
+from ecowcdb.util.cache import BoundCache
 from ecowcdb.util.errors import LPError, LPErrorType
-from ecowcdb.util.network import heuristic_algorithm, scale_network
+from ecowcdb.util.network import heuristic_algorithm
+from ecowcdb.util.solver import create_solver
 from ecowcdb.util.validation import Validation
 
 
@@ -28,6 +34,14 @@ class ECOWCDB:
          __net (Network, private): The network object for which the delay will be computed.
          __edges (List[Tuple[int, int]], private): Directed graph representation of the network.
          __temp_folder (str, private): Folderpath in which the .lp files will be stored in.
+         __solver (LPSolver, private): Solver used for every linear program.
+         __batch_lps (bool, private): Indicates whether the linear programs of the trees of a forest are solved
+         together.
+         __tree_workers (int, private): Number of linear programs of the trees of a forest solved in parallel.
+         __pipeline_lps (bool, private): Indicates whether the linear programs of the next trees are written while the
+         current one is solved.
+         __bound_cache (BoundCache, private): Cache of the scaled networks, their SFA/TFA bounds and their
+         decompositions shared by all the delay computations.
 
      Methods:
          __delay (private): Computes the delay of the flow of interest for a given forest.
@@ -40,8 +54,14 @@ class ECOWCDB:
     __net: Network
     __edges: List[Tuple[int, int]]
     __temp_folder: str
+    __solver: LPSolver
+    __batch_lps: bool
+    __tree_workers: int
+    __pipeline_lps: bool
+    __bound_cache: BoundCache
     
-    def __init__(self, net: Network, temp_folder: str = '') -> None:
+    def __init__(self, net: Network, temp_folder: str = '', solver_backend: SolverBackend = SolverBackend.LPSolve,
+                 batch_lps: bool = False, tree_workers: int = 1, pipeline_lps: bool = False) -> None:
         """
          Initialize ecowcdb. This function will validate all the inputs and generate everything needed to start the
          delay computation.
@@ -52,12 +72,28 @@ class ECOWCDB:
          	 temp_folder (str, optional): Folder to store temporary .lp files. It is the user's responsibility to
              ensure that the provided folder exists. Default is '' which means that temp files will be stored in the
              directory from where the intial call was made.
+             solver_backend (SolverBackend, optional): Solver used for the linear programs. Default is
+             SolverBackend.LPSolve which means that the bundled lp_solve executable is used.
+             batch_lps (bool, optional): Indicates whether the linear programs of the trees of a forest are solved
+             together in a single linear program. Default is False which means that one linear program is solved per
+             tree.
+             tree_workers (int, optional): Number of linear programs of the trees of a forest solved in parallel when
+             batch_lps is False. Default is 1 which means that the trees are solved sequentially.
+             pipeline_lps (bool, optional): Indicates whether the linear programs of the next trees of a forest are
+             written in the background while the current one is solved, when batch_lps is False and tree_workers is 1.
+             Default is False which means that every linear program is written right before it is solved.
         """
         self.__validation = Validation.ECOWCDB()
-        self.__validation.constructor_arguments(net, temp_folder)
+        self.__validation.constructor_arguments(net, temp_folder, solver_backend, batch_lps, tree_workers,
+                                                pipeline_lps)
         self.__net = net
         self.__edges = list(net.edges.keys())
         self.__temp_folder = temp_folder
+        self.__solver = create_solver(solver_backend, temp_folder)
+        self.__batch_lps = batch_lps
+        self.__tree_workers = tree_workers
+        self.__pipeline_lps = pipeline_lps
+        self.__bound_cache = BoundCache(net, temp_folder, solver=self.__solver)
 
     def __delay(self, foi: int, forest: List[Tuple[int, int]]) -> float:
         """
@@ -74,8 +110,12 @@ class ECOWCDB:
         scale_factor = 1.0
         timeout = 1000
         while True:
-            net = scale_network(self.__net, scale_factor)
-            PLP = FifoLP(net, list_edges=forest, sfa=True, tfa=True, timeout=timeout, temp_folder=self.__temp_folder)
+            net = self.__bound_cache.network(scale_factor)
+            sfa_delays, tfa_delays = self.__bound_cache.bounds(scale_factor)
+            PLP = FifoLP(net, list_edges=forest, sfa=True, tfa=True, timeout=timeout, temp_folder=self.__temp_folder,
+                         sfa_delays=sfa_delays, tfa_delays=tfa_delays, solver=self.__solver,
+                         decomposition=self.__bound_cache.decomposition(scale_factor, forest), batch=self.__batch_lps,
+                         workers=self.__tree_workers, pipeline=self.__pipeline_lps)
             PLP.forest = PLP.forest.make_feed_forward()
             try:
                 return PLP.delay(foi)
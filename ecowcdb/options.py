@@ -67,7 +67,56 @@ class ForestGeneration(Enum):
          Empty: Do not generate any forests.
          Partial: Generate a subset of forests at random.
          All: Generate all valid forests.
+         Maximal: Generate the maximal valid forests (smallest cuts), optionally widened by a slack of edges.
     """
     Empty = 0
     Partial = 1
     All = 2
+    Maximal = 3
+
+
+class ForestSampling(Enum):
+    """
+     Enum used for the distribution of the forests selected at random. Passed as input argument to ecowcdb.Analysis
+     class. Only used with ForestGeneration.Partial.
+
+     Members:
+         Uniform: Every valid forest has the same probability of being selected.
+         Stratified: Every forest size (number of edges) has the same probability of being selected, and the forests
+         of a given size are selected uniformly.
+    """
+    Uniform = 0
+    Stratified = 1
+
+
+class ForestOrder(Enum):
+    """
+     Enum used for the order in which the forests are evaluated by the exhaustive searches. Passed as input argument to
+     ecowcdb.Analysis class. The results are the same for every order.
+
+     Members:
+         Generation: Evaluate the forests in the order they are generated.
+         GrayCode: Evaluate the forests in the order of the binary reflected Gray code of their edge sets, so that
+         consecutive forests mostly differ by a single kept or cut edge.
+    """
+    Generation = 0
+    GrayCode = 1
+
+
+class SolverBackend(Enum):
+    """
+     Enum used for the linear program solver backend. Passed as input argument to ecowcdb.Analysis and ecowcdb.ECOWCDB
+     classes.
+
+     Members:
+         LPSolve: Solve every linear program with the bundled lp_solve executable. The linear programs are streamed
+         to lp_solve without writing any file.
+         HiGHS: Solve every linear program in-process with the HiGHS solver of scipy.
+         LPSolvePool: Solve every linear program with a pool of resident lp_solve workers.
+         LPSolveFile: Solve every linear program with the bundled lp_solve executable, reading it from a temporary .lp
+         file with a unique name.
+    """
+    LPSolve = 0
+    HiGHS = 1
+    LPSolvePool = 2
+    LPSolveFile = 3
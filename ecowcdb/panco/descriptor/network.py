@@ -1,7 +1,6 @@
 # Standard Library Imports
 from __future__ import annotations
 from collections import defaultdict
-from copy import deepcopy
 from typing import List, Tuple, Dict
 
 # Third-Party Library Imports
@@ -10,7 +9,7 @@ import numpy as np
 # Local Imports - panco libraries
 from ecowcdb.panco.descriptor.flow import Flow
 from ecowcdb.panco.descriptor.server import Server
-from ecowcdb.panco.descriptor.curves import tb_sum, residual_blind
+from ecowcdb.panco.descriptor.curves import TokenBucket, tb_sum, residual_blind
 
 
 
@@ -48,16 +47,18 @@ def topology(num_servers: int, num_flows: int, path: List[List[int]]):
     >>> topology(4, 3, paths)
     ([[2], [0], [1, 3], [1]], [[1], [2, 3], [0], [2]], [[0, 1], [0, 2], [1, 2], [0, 1]])
     """
-    successors = [[] for _ in range(num_servers)]
-    predecessors = [[] for _ in range(num_servers)]
-    flows_in_server = [[i for i in range(num_flows) if j in path[i]] for j in range(num_servers)]
+    # Single pass over the paths: the flows are visited in increasing order, so flows_in_server is built sorted.
+    successors = [set() for _ in range(num_servers)]
+    predecessors = [set() for _ in range(num_servers)]
+    flows_in_server = [[] for _ in range(num_servers)]
     for i in range(num_flows):
-        for j in range(len(path[i]) - 1):
-            if path[i][j + 1] not in successors[path[i][j]]:
-                successors[path[i][j]] += [path[i][j + 1]]
-            if path[i][j] not in predecessors[path[i][j + 1]]:
-                predecessors[path[i][j + 1]] += [path[i][j]]
-    return _sort_lists_of_lists(predecessors), _sort_lists_of_lists(successors), _sort_lists_of_lists(flows_in_server)
+        for j in path[i]:
+            if len(flows_in_server[j]) == 0 or flows_in_server[j][-1] != i:
+                flows_in_server[j].append(i)
+        for u, v in zip(path[i], path[i][1:]):
+            successors[u].add(v)
+            predecessors[v].add(u)
+    return _sort_lists_of_lists(predecessors), _sort_lists_of_lists(successors), flows_in_server
 
 
 def server_depth(num_servers: int, successors: List[List[int]]) -> List[int]:
@@ -99,14 +100,15 @@ def backward_search(sink: int, predecessors: List[List[int]]) -> List[int]:
     >>> backward_search(3, [[1], [0], [1, 3], [1]])
     [0, 1, 3]
     """
-    q = {sink}
-    servers = set([])
-    while len(q) > 0:
-        sink = q.pop()
-        servers |= {sink}
-        q |= set(predecessors[sink])
-        q -= servers
-    return sorted(list(servers))
+    servers = {sink}
+    stack = [sink]
+    while len(stack) > 0:
+        u = stack.pop()
+        for v in predecessors[u]:
+            if v not in servers:
+                servers.add(v)
+                stack.append(v)
+    return sorted(servers)
 
 
 def trunc_path(path: List[List[int]], list_servers: List[int]) -> List[List[int]]:
@@ -121,7 +123,8 @@ def trunc_path(path: List[List[int]], list_servers: List[int]) -> List[List[int]
     >>> trunc_path([[0, 1, 2, 3], [2, 3, 4], [3, 2, 5, 1]], [0, 1, 3])
     [[0, 1, 3], [3], [3, 1]]
     """
-    return [[path[i][j] for j in range(len(path[i])) if path[i][j] in list_servers] for i in range(len(path))]
+    servers = set(list_servers)
+    return [[u for u in path[i] if u in servers] for i in range(len(path))]
 
 
 def reindexing(lis: List[int]) -> Dict[int]:
@@ -138,55 +141,64 @@ def reindexing(lis: List[int]) -> Dict[int]:
     return dict(zip(lis, range(len(lis))))
 
 
-def dfs(u: int, num_servers: int, successors: List[List[int]], state: List[int], queue: List[int],
-        sort: List[int]) -> Tuple[List[int], List[int], List[int]]:
+def dfs(u: int, successors: List[List[int]], state: List[int], finished: List[int]) -> bool:
     """
-    Depth-first-search implementation of a graph without cycles
+    Iterative depth-first-search implementation, which detects the cycles reachable from the source node. The nodes
+    are discovered in the same order as a recursive search visiting the successors in the order of the adjacency list.
 
     :param u: source node
-    :param num_servers: size of the network
     :param successors: adjacency list of the nodes (list of successors)
-    :param state: state of the nodes ('white'/'gray'/'black')
-    :param queue: set of nodes queued for analysis
-    :param sort: list of nodes in the reversed order of end of discovery (when they become 'black')
-    :return: the new state after exploration from u, new queue, update order
-
-    >>> dfs(4, 6, [[], [0], [1, 4], [], [0, 3, 5], [3]], [0, 0, 0, 0, 0, 0], [], [])
-    (array([2, 0, 0, 2, 2, 2]), [], [4, 5, 3, 0])
+    :param state: state of the nodes (0: 'white', 1: 'gray', 2: 'black'), updated by the exploration
+    :param finished: list of nodes in the order of end of discovery (when they become 'black'), updated by the
+    exploration
+    :return: True if a cycle was found (the exploration is then stopped), False otherwise
+
+    >>> state, finished = [0, 0, 0, 0, 0, 0], []
+    >>> dfs(4, [[], [0], [1, 4], [], [0, 3, 5], [3]], state, finished)
+    False
+    >>> state, finished
+    ([2, 0, 0, 2, 2, 2], [0, 3, 5, 4])
+    >>> dfs(0, [[1], [2], [0]], [0, 0, 0], [])
+    True
     """
     state[u] = 1
-    queue = [u] + queue
-    while not queue == []:
-        for v in successors[u]:
-            if state[v] == 0:
-                (state, queue, sort) = dfs(v, num_servers, successors, state, queue, sort)
-            elif state[v] == 1:
-                raise NameError("Network has cycles: feed-forward analysis impossible")
-        sort = [u] + sort
-        state[u] = 2
-        queue = queue[1:]
-        return state, queue, sort
-
-
-def topological_sort(successors: List[List[int]], num_servers: int) -> List[int]:
+    stack = [(u, iter(successors[u]))]
+    while len(stack) > 0:
+        v, children = stack[-1]
+        for w in children:
+            if state[w] == 0:
+                state[w] = 1
+                stack.append((w, iter(successors[w])))
+                break
+            if state[w] == 1:
+                return True
+        else:
+            stack.pop()
+            state[v] = 2
+            finished.append(v)
+    return False
+
+
+def topological_sort(successors: List[List[int]], num_servers: int) -> Tuple[List[int], bool]:
     """
     Topological sort of a graph given by its lists of successors (adjacency)
 
     :param successors: the list of successors of each node
     :param num_servers: the number of nodes of the graph
-    :return: the topological order of the nodes, and an error if the graph has cycles.
+    :return: the topological order of the nodes, and whether the graph has cycles (the order is then incomplete).
 
 
     >>> topological_sort([[], [0], [1, 4], [], [0, 3, 5], [3]], 6)
-    [2, 4, 5, 3, 1, 0]
+    ([2, 4, 5, 3, 1, 0], False)
+    >>> topological_sort([[1], [2], [0]], 3)[1]
+    True
     """
-    sort = []
-    state = [0 for _ in range(num_servers)]
-    u = int(np.argmin(state))
-    while state[u] == 0:
-        (state, queue, sort) = dfs(u, num_servers, successors, state, [], sort)
-        u = np.argmin(state)
-    return sort
+    finished = []
+    state = num_servers * [0]
+    for u in range(num_servers):
+        if state[u] == 0 and dfs(u, successors, state, finished):
+            return finished[::-1], True
+    return finished[::-1], False
 
 
 def inverse_permutation(tab: List[int]) -> List[int]:
@@ -257,7 +269,7 @@ class Network:
     [[0, 1], [0, 1]]
     """
 
-    def __init__(self, servers: List[Server], flows: List[Flow], arrival_shaping=None, symmetric_cycle=False):
+    def __init__(self, servers: List[Server], flows: List[Flow], arrival_shaping=None):
         """
         Construction of a network
         """
@@ -273,8 +285,12 @@ class Network:
         self.successors = net_topology[1]
         self.flows_in_server = net_topology[2]
         self._depth = None
+        # The network is not modified after its construction, so the derived properties are computed once.
+        self._edges = None
+        self._is_feed_forward = None
+        self._is_tree = None
+        self._sub_networks = {}
         self.arrival_shaping = arrival_shaping
-        self.symmetric_cycle = symmetric_cycle
 
     def __str__(self) -> str:
         return "Flows:\n%s\nServers:\n%s" % (list_to_str(self.flows), list_to_str(self.servers))
@@ -307,11 +323,10 @@ class Network:
         >>> feed_forward.is_feed_forward
         True
         """
-        for i in range(self.num_flows):
-            for j in range(len(self.path[i]) - 1):
-                if self.path[i][j] >= self.path[i][j + 1]:
-                    return False
-        return True
+        if self._is_feed_forward is None:
+            self._is_feed_forward = all(self.path[i][j] < self.path[i][j + 1]
+                                        for i in range(self.num_flows) for j in range(len(self.path[i]) - 1))
+        return self._is_feed_forward
 
     def make_feed_forward(self) -> Network:
         """
@@ -342,7 +357,9 @@ class Network:
         """
         if self.is_feed_forward:
             return self
-        order = topological_sort(self.successors, self.num_servers)
+        order, has_cycles = topological_sort(self.successors, self.num_servers)
+        if has_cycles:
+            raise NameError("Network has cycles: feed-forward analysis impossible")
         inverse_order = inverse_permutation(order)
         servers = [self.servers[order[i]] for i in range(self.num_servers)]
         flows = []
@@ -376,12 +393,11 @@ class Network:
         >>> tandem.is_tree
         True
         """
-        for i in range(self.num_servers):
-            if len(self.successors[i]) > 1:
-                return False
-            if len(self.successors[i]) == 1 and self.successors[i][0] <= i:
-                return False
-        return True
+        if self._is_tree is None:
+            self._is_tree = all(len(self.successors[i]) == 0 or
+                                (len(self.successors[i]) == 1 and self.successors[i][0] > i)
+                                for i in range(self.num_servers))
+        return self._is_tree
 
     @property
     def is_elementary(self) -> bool:
@@ -464,7 +480,8 @@ class Network:
     def edges(self) -> defaultdict[Tuple[int, int]]:
         """
         Builds the dictionary of the edges of the networks. The keys are a pair in integers and the value is the set
-        of flows crossing that edge.
+        of flows crossing that edge. The dictionary is built once and shared by all the calls, so it must not be
+        modified.
 
         :return: The dictionary of the edges.
 
@@ -478,11 +495,13 @@ class Network:
         defaultdict(<class 'list'>, {(0, 1): [0, 1], (1, 2): [0, 2]})
         """
         # builds the set of edged and the flows crossed by each edge. Returns a defaultdict
-        dict_edges = defaultdict(list)
-        for i in range(self.num_flows):
-            for h in range(len(self.path[i]) - 1):
-                dict_edges[(self.path[i][h], self.path[i][h + 1])] += [i]
-        return dict_edges
+        if self._edges is None:
+            dict_edges = defaultdict(list)
+            for i in range(self.num_flows):
+                for h in range(len(self.path[i]) - 1):
+                    dict_edges[(self.path[i][h], self.path[i][h + 1])] += [i]
+            self._edges = dict_edges
+        return self._edges
 
     @property
     def depth(self) -> List[int]:
@@ -614,6 +633,8 @@ class Network:
         """
         Builds a sub-network with sink the last server crossed by the flow foi
         This methods applies only to well-numbered feed-forward networks
+        The sub-network only depends on the sink, so it is built once per sink and shared by all the flows ending
+        there (only the flow number of the foi differs). It must not be modified.
 
         :param foi: the flow of interest
         :return: the sub-network, the flow number of the foi in this new network, the list of the number
@@ -645,20 +666,22 @@ class Network:
         """
         if not self.is_feed_forward:
             raise Exception("Network not feed-forward")
-        list_servers = backward_search(self.path[foi][-1], self.predecessors)
-        sub_path = trunc_path(self.path, list_servers)
-        list_flows = [i for i in range(self.num_flows) if not sub_path[i] == []]
-        ind_s = reindexing(list_servers)
-        ind_f = reindexing(list_flows)
-        servers = [self.servers[i] for i in list_servers]
-        flows = [Flow(self.flows[i].arrival_curve, [ind_s[sub_path[i][j]] for j in range(len(sub_path[i]))])
-                 for i in list_flows]
-        arrival_shaping = []
-        for i in range(len(self.arrival_shaping)):
-            x, y, z = self.arrival_shaping[i]
-            if x in list_servers:
-                arrival_shaping += [(ind_s[x], [ind_f[j] for j in y], z)]
-        sub_net = Network(servers, flows, arrival_shaping)
+        sink = self.path[foi][-1]
+        if sink not in self._sub_networks:
+            list_servers = backward_search(sink, self.predecessors)
+            ind_s = reindexing(list_servers)
+            list_flows = []
+            flows = []
+            for i in range(self.num_flows):
+                sub_path = [ind_s[u] for u in self.path[i] if u in ind_s]
+                if not sub_path == []:
+                    list_flows += [i]
+                    flows += [Flow(self.flows[i].arrival_curve, sub_path)]
+            ind_f = reindexing(list_flows)
+            servers = [self.servers[i] for i in list_servers]
+            arrival_shaping = [(ind_s[x], [ind_f[j] for j in y], z) for (x, y, z) in self.arrival_shaping if x in ind_s]
+            self._sub_networks[sink] = (Network(servers, flows, arrival_shaping), ind_f, list_flows, list_servers)
+        sub_net, ind_f, list_flows, list_servers = self._sub_networks[sink]
         return sub_net, ind_f[foi], list_flows, list_servers
 
     def decomposition(self, keep_edges: List[(int, int)]) -> Tuple[Network, List[int], List[(int, int)]]:
@@ -666,6 +689,8 @@ class Network:
         Decomposition of the network by keeping edges in keep_edges, and cutting the flows.
         returns a new network with arrival curve[0] for all flows obtained from one flow
         returns list_first the list of the first path of the initial flows
+        The arrival curves are shared with the network (they are never modified, the bursts of the flows of the
+        decomposition are replaced with with_bursts).
 
         :param keep_edges: the edges to keep in the network
         :return: the new network, the list of the number of flows that are the start of the original flows,
@@ -701,34 +726,53 @@ class Network:
         >>> tree.decomposition([(0, 3), (1, 3), (2, 4)])[0].arrival_shaping
         [(0, [2], [10 + 0t]), (4, [1, 5], [0 + 40t])]
         """
+        keep_edges = set(keep_edges)
         dict_removed_edges = defaultdict(list)
         flow_list = []
-        path_list = []
         list_first = []
-        pre = 0
         for flow in range(self.num_flows):
-            i = 0
             path = self.path[flow]
-            list_first += [pre]
-            p = [path[i]]
-            while i < len(path) - 1:
-                if (path[i], path[i + 1]) in keep_edges:
-                    p += [path[i + 1]]
+            arrival_curve = self.flows[flow].arrival_curve[0]
+            list_first.append(len(flow_list))
+            p = [path[0]]
+            for edge in zip(path, path[1:]):
+                if edge in keep_edges:
+                    p.append(edge[1])
                 else:
-                    pre += 1
-                    path_list += [p]
-                    flow_list += [Flow(deepcopy([self.flows[flow].arrival_curve[0]]), p)]
-                    p = [path[i + 1]]
-                    dict_removed_edges[(path[i], path[i + 1])] += [pre]
-                i += 1
-            pre += 1
-            flow_list += [Flow(deepcopy([self.flows[flow].arrival_curve[0]]), p)]
+                    flow_list.append(Flow([arrival_curve], p))
+                    p = [edge[1]]
+                    dict_removed_edges[edge].append(len(flow_list))
+            flow_list.append(Flow([arrival_curve], p))
         arrival_shaping_bis = [(j, [list_first[i] for i in l], sc) for (j, l, sc) in self.arrival_shaping]
         arrival_shaping_ter = [(j, dict_removed_edges[(i, j)], self.servers[i].max_service_curve)
                                for (i, j) in dict_removed_edges.keys() if self.servers[i].max_service_curve]
         return Network(self.servers, flow_list, arrival_shaping_bis + arrival_shaping_ter), list_first, \
                        dict_removed_edges.keys()
 
+    def with_bursts(self, bursts: List[float]) -> Network:
+        """
+        Builds the same network where the burst of the first token-bucket of the arrival curve of each flow is
+        replaced. The network itself is not modified: the servers, the paths and the arrival shaping are shared, and
+        new flows are built.
+
+        :param bursts: the new burst of each flow
+        :return: the network with the new bursts
+
+        >>> flows = [Flow([TokenBucket(1, 1)], [0, 1]), Flow([TokenBucket(2, 2), TokenBucket(5, 1)], [1])]
+        >>> servers = [Server([RateLatency(10, 1)], []), Server([RateLatency(20, 2)], [])]
+        >>> network = Network(servers, flows)
+        >>> network.with_bursts([3, 4]).flows
+        [<Flow: α(t) = min [3 + 1t]; π = [0, 1]>
+        , <Flow: α(t) = min [4 + 2t, 5 + 1t]; π = [1]>
+        ]
+        >>> network.flows[0].arrival_curve[0].sigma
+        1
+        """
+        flows = [Flow([TokenBucket(bursts[i], self.flows[i].arrival_curve[0].rho)] +
+                      self.flows[i].arrival_curve[1:], self.flows[i].path)
+                 for i in range(self.num_flows)]
+        return Network(self.servers, flows, self.arrival_shaping)
+
     def unfold(self, foi: int) -> Tuple[Network, int]:
         """
         Unfolds a feed-forward network into a tree, from the last server visited by the flows of interest.
@@ -3,6 +3,7 @@ import numpy as np
 
 # Local Imports - panco libraries
 from ecowcdb.panco.descriptor.network import Network
+from ecowcdb.panco.lpModel import LPModel
 
 
 
@@ -36,9 +37,14 @@ class ELPConstraints:
         else:
             self.list_flows = list_flows
             self.is_cyclic = True
+        self._matrix_order = None
+        self._date_pairs = {}
 
     @property
     def matrix_order(self):
+        # the order of the dates only depends on the network, it is computed once (and must not be modified)
+        if self._matrix_order is not None:
+            return self._matrix_order
         mat = np.zeros((self.num_dates, self.num_dates))
         mat[1, 0] = 1
         mat[2, 0] = 1
@@ -54,22 +60,36 @@ class ELPConstraints:
                         mat[self.t_min[j] + 2 * k, self.t_min[j] + 2 * i] = 1
                         mat[self.t_min[j] + 2 * k + 1, self.t_min[j] + 2 * i + 1] = 1
                         mat[self.t_min[j] + 2 * k + 1, self.t_min[j] + 2 * i] = 1
+        self._matrix_order = mat
         return mat
 
+    def date_pairs(self, j):
+        """
+        Returns the pairs of ordered dates (u, v) of server j, that is t_min[j] <= u < v <= t_max[j] and
+        matrix_order[v, u] == 1, in lexicographic order. They are computed once per server.
+        :param j: the server
+        :return: the list of pairs of dates
+        """
+        if j not in self._date_pairs:
+            lo, hi = self.t_min[j], self.t_max[j]
+            # the transposed block is scanned row by row, so the pairs are sorted by u, then v
+            pairs = np.argwhere(self.matrix_order[lo:hi + 1, lo:hi + 1].T == 1) + lo
+            self._date_pairs[j] = [(u, v) for u, v in pairs.tolist() if u < v]
+        return self._date_pairs[j]
+
+    # The constraint families are written in bulk: the template of a family is specialized once per flow or server
+    # (the fields in double braces remain), then formatted for every date, and the lines are written with one call.
+
     def time_constraints(self, file):
-        file.write('\n/* Time Constraints */\n')
         e = self.next_foi
-        mat = self.matrix_order
-        k, n = mat.shape
-        for i in range(k):
-            for j in range(k):
-                if mat[i, j] == 1:
-                    file.write('t{0}e{2} <= t{1}e{2};\n'.format(i, j, e))
+        line = 't{{0}}e{0} <= t{{1}}e{0};\n'.format(e)
+        # the nonzero entries are scanned row by row, as the dates i then j
+        lines = [line.format(i, j) for i, j in np.argwhere(self.matrix_order == 1).tolist()]
+        file.write('\n/* Time Constraints */\n' + ''.join(lines))
 
     def arrival_constraints(self, file):
-        file.write('\n/* arrival constraints */\n')
-        mat = self.matrix_order
         e = self.next_foi
+        lines = ['\n/* arrival constraints */\n']
         for i in range(self.network.num_flows):
             path = self.network.flows[i].path
             if i == self.foi:
@@ -77,100 +97,91 @@ class ELPConstraints:
             else:
                 arrival_curve = self.network.flows[i].arrival_curve
             for tb in arrival_curve:
-                for k in range(self.t_min[path[0]], self.t_max[path[0]]):
-                    for k1 in range(k + 1, self.t_max[path[0]] + 1):
-                        if mat[k1, k] == 1:
-                            file.write('f{0}s{1}t{2}e{6} - f{0}s{1}t{3}e{6} <= x{4} + {5} t{2}e{6} - {5} t{3}e{6};\n'.
-                                       format(i, path[0], k, k1, self.list_flows[i],
-                                              # self.sigma[i],
-                                              tb.rho, e))
+                line = 'f{0}s{1}t{{0}}e{4} - f{0}s{1}t{{1}}e{4} <= x{2} + {3} t{{0}}e{4} - {3} t{{1}}e{4};\n'.\
+                    format(i, path[0], self.list_flows[i],
+                           # self.sigma[i],
+                           tb.rho, e)
+                lines += [line.format(k, k1) for k, k1 in self.date_pairs(path[0])]
+        file.write(''.join(lines))
 
     def monotony_constraints(self, file):
-        file.write('\n/* Monotony constraints */\n')
-        mat = self.matrix_order
         e = self.next_foi
+        lines = ['\n/* Monotony constraints */\n']
         for i in range(self.network.num_flows):
             for j in self.network.path[i]:
-                for k in range(self.t_min[j], self.t_max[j]):
-                    for h in range(k + 1, self.t_max[j] + 1):
-                        if mat[h, k] == 1:
-                            file.write('f{0}s{1}t{2}e{4} - f{0}s{1}t{3}e{4} >= 0; \n'.format(i, j, k, h, e))
+                line = 'f{0}s{1}t{{0}}e{2} - f{0}s{1}t{{1}}e{2} >= 0; \n'.format(i, j, e)
+                lines += [line.format(k, h) for k, h in self.date_pairs(j)]
+        file.write(''.join(lines))
 
     def fifo_constraints(self, file):
-        file.write('\n/* fifo constraints */\n')
         e = self.next_foi
+        lines = ['\n/* fifo constraints */\n']
         for i in range(self.network.num_flows):
             for j in self.network.path[i]:
                 if j == self.network.num_servers - 1:
-                    file.write('f{0}s{1}t{2}e{6} = f{3}s{4}t{5}e{6};\n'.format(i, j + 1, 0,
-                                                                               i, j, 1, e))
+                    lines += ['f{0}s{1}t{2}e{6} = f{3}s{4}t{5}e{6};\n'.format(i, j + 1, 0,
+                                                                               i, j, 1, e)]
                 else:
                     h = self.network.successors[j][0]
-                    for k in range(2 ** self.network.depth[j]):
-                        file.write('f{0}s{1}t{2}e{6} = f{3}s{4}t{5}e{6};\n'.format(i, h, self.t_min[h] + k,
-                                                                                   i, j, self.t_min[j] + 2 * k, e))
+                    line = 'f{0}s{1}t{{0}}e{3} = f{0}s{2}t{{1}}e{3};\n'.format(i, h, j, e)
+                    lines += [line.format(self.t_min[h] + k, self.t_min[j] + 2 * k)
+                              for k in range(2 ** self.network.depth[j])]
+        file.write(''.join(lines))
 
     def shaping_constraints(self, file):
-        file.write('\n/* Maximum service / shaping constraints (maximum rate of the link)*/\n')
         e = self.next_foi
+        lines = ['\n/* Maximum service / shaping constraints (maximum rate of the link)*/\n']
         for j in range(self.network.num_servers - 1):
             h = self.network.successors[j][0]
-            for u in range(self.t_min[h], self.t_max[h]):
-                for v in range(u + 1, self.t_max[h] + 1):
-                    mat = self.matrix_order
-                    if mat[v, u] == 1:
-                        for tk in self.network.servers[j].max_service_curve:
-                            file.write('0')
-                            for i in self.network.flows_in_server[j]:
-                                if not self.is_cyclic or not i == self.foi:
-                                    file.write('+ f{0}s{1}t{2}e{4} - f{0}s{1}t{3}e{4}'.format(i, h, u, v, e))
-                            file.write('<= {4} + {0} t{1}e{3} - {0} t{2}e{3};\n'.format(tk.rho, u, v, e, tk.sigma))
+            flows = ''.join(['+ f{0}s{1}t{{0}}e{2} - f{0}s{1}t{{1}}e{2}'.format(i, h, e)
+                             for i in self.network.flows_in_server[j]
+                             if not self.is_cyclic or not i == self.foi])
+            templates = ['0' + flows + '<= {2} + {0} t{{0}}e{1} - {0} t{{1}}e{1};\n'.format(tk.rho, e, tk.sigma)
+                         for tk in self.network.servers[j].max_service_curve]
+            lines += [line.format(u, v) for u, v in self.date_pairs(h) for line in templates]
+        file.write(''.join(lines))
 
     def arrival_shaping_constraints(self, f, b=False):
-        f.write('\n/* arrival shaping constraints */\n')
-        mat = self.matrix_order
         e = self.next_foi
+        lines = ['\n/* arrival shaping constraints */\n']
         for k in range(len(self.network.arrival_shaping)):
             j = self.network.arrival_shaping[k][0]
             max_service = self.network.arrival_shaping[k][2]
             for i in self.network.arrival_shaping[k][1]:
                 if not j == self.network.path[i][0]:
+                    f.write(''.join(lines))
                     print('error in shaping constraints', j, self.network.path[i][0])
                     return
-            for u in range(self.t_min[j], self.t_max[j]):
-                for v in range(u + 1, self.t_max[j] + 1):
-                    if mat[v, u] == 1:
-                        for tb in max_service:
-                            f.write('0')
-                            for i in self.network.arrival_shaping[k][1]:
-                                if not (self.is_cyclic or b) or not i == self.foi:
-                                    f.write('+f{0}s{1}t{2}e{4} - f{0}s{1}t{3}e{4}'.format(i, j, u, v, e))
-                            f.write('<= {0} + {1}t{2}e{4} - {1}t{3}e{4};\n'.format(tb.sigma, tb.rho, u, v, e))
+            flows = ''.join(['+f{0}s{1}t{{0}}e{2} - f{0}s{1}t{{1}}e{2}'.format(i, j, e)
+                             for i in self.network.arrival_shaping[k][1]
+                             if not (self.is_cyclic or b) or not i == self.foi])
+            templates = ['0' + flows + '<= {0} + {1}t{{0}}e{2} - {1}t{{1}}e{2};\n'.format(tb.sigma, tb.rho, e)
+                         for tb in max_service]
+            lines += [line.format(u, v) for u, v in self.date_pairs(j) for line in templates]
+        f.write(''.join(lines))
 
     def service_constraints(self, file):
-        file.write('\n/* Service constraints */\n')
         e = self.next_foi
+        lines = ['\n/* Service constraints */\n']
         for j in range(self.network.num_servers):
             if j == self.network.num_servers - 1:
+                flows = ''.join(['f{0}s{1}t{2}e{6} - f{3}s{4}t{5}e{6} + '.format(i, j + 1, 0,
+                                                                                 i, j, 2, e)
+                                 for i in self.network.flows_in_server[j]])
                 for rl in self.network.servers[j].service_curve:
-                    for i in self.network.flows_in_server[j]:
-                        file.write('f{0}s{1}t{2}e{6} - f{3}s{4}t{5}e{6} + '.format(i, j + 1, 0,
-                                                                                   i, j, 2, e))
-                    file.write('{0} >= {1} t{2}e{5} - {3} t{4}e{5};\n'.format(rl.rate * rl.latency,
-                                                                              rl.rate, 0,
-                                                                              rl.rate, 2, e))
+                    lines += [flows, '{0} >= {1} t{2}e{5} - {3} t{4}e{5};\n'.format(rl.rate * rl.latency,
+                                                                                     rl.rate, 0,
+                                                                                     rl.rate, 2, e)]
             else:
+                h = self.network.successors[j][0]
+                flow_line = ''.join(['f{0}s{1}t{{0}}e{3} - f{0}s{2}t{{1}}e{3} + '.format(i, h, j, e)
+                                     for i in self.network.flows_in_server[j]])
                 for rl in self.network.servers[j].service_curve:
-                    h = self.network.successors[j][0]
-                    for k in range(2 ** self.network.depth[j]):
-                        for i in self.network.flows_in_server[j]:
-                            file.write('f{0}s{1}t{2}e{6} - f{3}s{4}t{5}e{6} + '.format(i, h, self.t_min[h] + k,
-                                                                                       i, j, self.t_min[j] + 2 * k + 1,
-                                                                                       e))
-                        file.write('{0} >= {1} t{2}e{5} - {3} t{4}e{5};\n'.format(rl.rate * rl.latency,
-                                                                                  rl.rate, self.t_min[h] + k,
-                                                                                  rl.rate, self.t_min[j] + 2 * k + 1,
-                                                                                  e))
+                    line = flow_line + '{0} >= {1} t{{0}}e{2} - {1} t{{1}}e{2};\n'.format(rl.rate * rl.latency,
+                                                                                          rl.rate, e)
+                    lines += [line.format(self.t_min[h] + k, self.t_min[j] + 2 * k + 1)
+                              for k in range(2 ** self.network.depth[j])]
+        file.write(''.join(lines))
 
     def fix_point_constraints(self, file):
         file.write('\n/* the x burst constraints*/\n')
@@ -178,10 +189,10 @@ class ELPConstraints:
                    format(self.foi, self.network.path[self.foi][0],
                           self.network.path[self.foi][-1] + 1, self.next_foi, self.next_foi))
         j = self.network.path[self.foi][0]
-        for k in range(self.t_min[j], self.t_max[j] + 1):
-            file.write('f{0}s{1}t0e{5} - f{0}s{1}t{2}e{5} <= x{3} + {4}t0e{5} - {4}t{2}e{5};\n'.
-                       format(self.foi, j, k, self.list_flows[self.foi],
-                              self.network.flows[self.foi].arrival_curve[0].rho, self.next_foi))
+        line = 'f{0}s{1}t0e{4} - f{0}s{1}t{{0}}e{4} <= x{2} + {3}t0e{4} - {3}t{{0}}e{4};\n'.\
+            format(self.foi, j, self.list_flows[self.foi], self.network.flows[self.foi].arrival_curve[0].rho,
+                   self.next_foi)
+        file.write(''.join([line.format(k) for k in range(self.t_min[j], self.t_max[j] + 1)]))
 
     def sfa_delay_constraints(self, f):
         pass
@@ -198,13 +209,147 @@ class ELPConstraints:
                 'max: f{0}s{1}t0e0 - f{0}s{2}t0e0;\n'.format(self.foi, self.network.flows[self.foi].path[0],
                                                              self.network.num_servers))
             j = self.network.path[self.foi][0]
-            for k in range(self.t_min[j], self.t_max[j] + 1):
-                file.write('f{0}s{1}t0e0 - f{0}s{1}t{2}e0 <= {3} + {4}t0e0 - {4}t{2}e0;\n'.
-                           format(self.foi, j, k, self.network.flows[self.foi].arrival_curve[0].sigma,
-                                  self.network.flows[self.foi].arrival_curve[0].rho))
+            line = 'f{0}s{1}t0e0 - f{0}s{1}t{{0}}e0 <= {2} + {3}t0e0 - {3}t{{0}}e0;\n'.\
+                format(self.foi, j, self.network.flows[self.foi].arrival_curve[0].sigma,
+                       self.network.flows[self.foi].arrival_curve[0].rho)
+            file.write(''.join([line.format(k) for k in range(self.t_min[j], self.t_max[j] + 1)]))
         else:
             raise Exception('flow do not stop at last server\n')
 
+    # The same constraints are built in an LPModel by the add_* methods, for the solvers that do not need the LP
+    # format. The terms are added in the order they are written (left-hand side, then right-hand side), so that the
+    # model is the same as the one read from the LP format.
+
+    def add_time_constraints(self, model: LPModel):
+        t = 't{{}}e{}'.format(self.next_foi).format
+        for i, j in np.argwhere(self.matrix_order == 1).tolist():
+            model.add_constraint([(t(i), 1.), (t(j), -1.)], '<=')
+
+    def add_arrival_constraints(self, model: LPModel):
+        e = self.next_foi
+        t = 't{{}}e{}'.format(e).format
+        for i in range(self.network.num_flows):
+            path = self.network.flows[i].path
+            if i == self.foi:
+                arrival_curve = [self.network.flows[i].arrival_curve[0]]
+            else:
+                arrival_curve = self.network.flows[i].arrival_curve
+            f = 'f{}s{}t{{}}e{}'.format(i, path[0], e).format
+            x = 'x{}'.format(self.list_flows[i])
+            for tb in arrival_curve:
+                for k, k1 in self.date_pairs(path[0]):
+                    model.add_constraint([(f(k), 1.), (f(k1), -1.), (x, -1.), (t(k), -tb.rho), (t(k1), tb.rho)], '<=')
+
+    def add_monotony_constraints(self, model: LPModel):
+        e = self.next_foi
+        for i in range(self.network.num_flows):
+            for j in self.network.path[i]:
+                f = 'f{}s{}t{{}}e{}'.format(i, j, e).format
+                for k, h in self.date_pairs(j):
+                    model.add_constraint([(f(k), 1.), (f(h), -1.)], '>=')
+
+    def add_fifo_constraints(self, model: LPModel):
+        e = self.next_foi
+        for i in range(self.network.num_flows):
+            for j in self.network.path[i]:
+                if j == self.network.num_servers - 1:
+                    model.add_constraint([('f{}s{}t0e{}'.format(i, j + 1, e), 1.),
+                                          ('f{}s{}t1e{}'.format(i, j, e), -1.)], '=')
+                else:
+                    h = self.network.successors[j][0]
+                    for k in range(2 ** self.network.depth[j]):
+                        model.add_constraint([('f{}s{}t{}e{}'.format(i, h, self.t_min[h] + k, e), 1.),
+                                              ('f{}s{}t{}e{}'.format(i, j, self.t_min[j] + 2 * k, e), -1.)], '=')
+
+    def add_shaping_constraints(self, model: LPModel):
+        e = self.next_foi
+        t = 't{{}}e{}'.format(e).format
+        for j in range(self.network.num_servers - 1):
+            h = self.network.successors[j][0]
+            flows = ['f{}s{}t{{}}e{}'.format(i, h, e).format for i in self.network.flows_in_server[j]
+                     if not self.is_cyclic or not i == self.foi]
+            for u, v in self.date_pairs(h):
+                terms = [term for f in flows for term in ((f(u), 1.), (f(v), -1.))]
+                for tk in self.network.servers[j].max_service_curve:
+                    model.add_constraint(terms + [(t(u), -tk.rho), (t(v), tk.rho)], '<=', tk.sigma)
+
+    def add_arrival_shaping_constraints(self, model: LPModel, b=False):
+        e = self.next_foi
+        t = 't{{}}e{}'.format(e).format
+        for k in range(len(self.network.arrival_shaping)):
+            j = self.network.arrival_shaping[k][0]
+            max_service = self.network.arrival_shaping[k][2]
+            for i in self.network.arrival_shaping[k][1]:
+                if not j == self.network.path[i][0]:
+                    print('error in shaping constraints', j, self.network.path[i][0])
+                    return
+            flows = ['f{}s{}t{{}}e{}'.format(i, j, e).format for i in self.network.arrival_shaping[k][1]
+                     if not (self.is_cyclic or b) or not i == self.foi]
+            for u, v in self.date_pairs(j):
+                terms = [term for f in flows for term in ((f(u), 1.), (f(v), -1.))]
+                for tb in max_service:
+                    model.add_constraint(terms + [(t(u), -tb.rho), (t(v), tb.rho)], '<=', tb.sigma)
+
+    def add_service_constraints(self, model: LPModel):
+        e = self.next_foi
+        for j in range(self.network.num_servers):
+            if j == self.network.num_servers - 1:
+                dates = [(j + 1, 0, 2)]
+            else:
+                h = self.network.successors[j][0]
+                dates = [(h, self.t_min[h] + k, self.t_min[j] + 2 * k + 1) for k in range(2 ** self.network.depth[j])]
+            for rl in self.network.servers[j].service_curve:
+                for h, u, v in dates:
+                    model.add_constraint([term for i in self.network.flows_in_server[j]
+                                          for term in (('f{}s{}t{}e{}'.format(i, h, u, e), 1.),
+                                                       ('f{}s{}t{}e{}'.format(i, j, v, e), -1.))] +
+                                         [('t{}e{}'.format(u, e), -rl.rate), ('t{}e{}'.format(v, e), rl.rate)],
+                                         '>=', 0. - rl.rate * rl.latency)
+
+    def add_fix_point_constraints(self, model: LPModel):
+        e = self.next_foi
+        model.add_constraint([('x{}'.format(e), 1.),
+                              ('f{}s{}t0e{}'.format(self.foi, self.network.path[self.foi][0], e), -1.),
+                              ('f{}s{}t0e{}'.format(self.foi, self.network.path[self.foi][-1] + 1, e), 1.)], '=')
+        self.add_t0_arrival_constraints(model, 'x{}'.format(self.list_flows[self.foi]), e)
+
+    def add_t0_arrival_constraints(self, model: LPModel, burst=None, e=0):
+        # arrival constraints of the flow of interest between date t0 and the dates of its first server, with the
+        # burst variable burst (the burst of the flow if None)
+        j = self.network.path[self.foi][0]
+        rho = self.network.flows[self.foi].arrival_curve[0].rho
+        f = 'f{}s{}t{{}}e{}'.format(self.foi, j, e).format
+        t = 't{{}}e{}'.format(e).format
+        for k in range(self.t_min[j], self.t_max[j] + 1):
+            if burst is None:
+                model.add_constraint([(f(0), 1.), (f(k), -1.), (t(0), -rho), (t(k), rho)], '<=',
+                                     self.network.flows[self.foi].arrival_curve[0].sigma)
+            else:
+                model.add_constraint([(f(0), 1.), (f(k), -1.), (burst, -1.), (t(0), -rho), (t(k), rho)], '<=')
+
+    def add_sfa_delay_constraints(self, model: LPModel):
+        pass
+
+    def add_tfa_delay_constraints(self, model: LPModel):
+        pass
+
+    def set_backlog_objective(self, model: LPModel):
+        if not self.network.path[self.foi][-1] == self.network.num_servers - 1:
+            raise Exception('flow do not stop at last server\n')
+        model.set_objective([('f{}s{}t0e0'.format(self.foi, self.network.flows[self.foi].path[0]), 1.),
+                             ('f{}s{}t0e0'.format(self.foi, self.network.num_servers), -1.)])
+        self.add_t0_arrival_constraints(model)
+
+    def add_constraints(self, model: LPModel):
+        self.add_time_constraints(model)
+        self.add_arrival_constraints(model)
+        self.add_fifo_constraints(model)
+        self.add_service_constraints(model)
+        self.add_monotony_constraints(model)
+        self.add_shaping_constraints(model)
+        self.add_arrival_shaping_constraints(model)
+        self.add_fix_point_constraints(model)
+
     def write_constraints(self, file):
         file.write('\n/* flow {} */\n'.format(self.list_flows[self.foi]))
         self.time_constraints(file)
@@ -1,6 +1,8 @@
 # Standard Library Imports
-import subprocess as sp
-from typing import List
+import io
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
 
 # Third-Party Library Imports
 import numpy as np
@@ -11,11 +13,9 @@ from ecowcdb.panco.fifo.elpConstraints import ELPConstraints
 from ecowcdb.panco.fifo.plpConstraints import PLPConstraints
 from ecowcdb.panco.fifo.sfaLP import SfaLP
 from ecowcdb.panco.fifo.tfaLP import TfaLP
-from ecowcdb.panco.fifo.treeLP import TreeLP
-from ecowcdb.panco.lpSolvePath import LPSOLVEPATH
-
-# Local Imports - utility libraries
-from ecowcdb.util.errors import check_LP_error
+from ecowcdb.panco.fifo.treeLP import TreeLP, TreeLPBatch
+from ecowcdb.panco.lpModel import LPModel
+from ecowcdb.panco.lpSolver import LPSolver, LPSolveSolver
 
 
 
@@ -37,46 +37,77 @@ def edges_forest(network: Network):
 
 
 class FifoLP:
-    def __init__(self, network: Network, list_edges=None, polynomial=True, sfa=False, tfa=False, timeout=600, temp_folder="", filename="fifo", verbose=False):
+    # number of linear programs written in advance by the pipeline
+    PIPELINE_DEPTH = 2
+
+    def __init__(self, network: Network, list_edges=None, polynomial=True, sfa=False, tfa=False, timeout=600, temp_folder="", filename="fifo", verbose=False, sfa_delays=None, tfa_delays=None, solver: LPSolver = None, decomposition=None, batch=False, workers=1, pipeline=False):
         """
         Constructor for the class FifoLP, for the analysis of a network with the linear programming methods.
         The network is decomposed into a forest (self.forest)
+        The analysis is reentrant: the bursts of the flows of the forest are computed in separate burst vectors, and
+        neither the network nor the forest are modified. Therefore, delay and all_delays can be called concurrently
+        from several threads, on the same FifoLP or on FifoLPs sharing the same network, as long as the solver is
+        thread-safe (all the solvers of panco are).
         :param network: the network to analyze
         :param polynomial: True if the polynomial method, False for the more precise, but exponential method
         :param sfa: True for inclusion of sfa delay constraints (for polynomial only)
         :param tfa: True for inclusion of the tfa delay constraints (for olynimial method only)
         :param filename: name of the file to write the linear program
+        :param sfa_delays: precomputed sfa delays of the flows of network (only used if sfa is True). They only depend
+        on the network, so they can be shared between FifoLPs of the same network with different list_edges.
+        :param tfa_delays: precomputed tfa delays of the servers of network (only used if tfa is True)
+        :param solver: the solver of the linear programs (lp_solve executable if None)
+        :param decomposition: precomputed decomposition of network by list_edges (see Network.decomposition). It is
+        not modified, so it can be shared between FifoLPs of the same network with the same list_edges.
+        :param batch: True to solve the linear programs of the trees of the forest decomposition together in a single
+        linear program (see TreeLPBatch), instead of one linear program per tree (for polynomial only). The values are
+        then read from the variables of the solution instead of the objective, so they can differ in the last digits.
+        :param workers: maximum number of linear programs of trees solved concurrently when computing the bursts and
+        the delays (only used if batch is False). Each linear program is written in its own temporary file by the
+        solver, so the concurrent linear programs do not share files.
+        :param pipeline: True to write the linear programs of the next trees in a background thread while the linear
+        program of the current tree is solved (only used if batch is False and workers is 1). At most PIPELINE_DEPTH
+        linear programs are written in advance.
         """
         self.network = network
+        self.solver = solver if solver is not None else LPSolveSolver(temp_folder)
         self.polynomial = polynomial
+        self.batch = batch and polynomial
+        self.workers = workers
+        self.pipeline = pipeline
         self.tfa = tfa
         self.tfa_delays = None
         if self.tfa:
-            self.tfa_delays = TfaLP(network, temp_folder=temp_folder, filename=filename+'_tfa', verbose=verbose).delay_servers
+            if tfa_delays is None:
+                tfa_delays = TfaLP(network, temp_folder=temp_folder, filename=filename+'_tfa', verbose=verbose, solver=self.solver).delay_servers
+            self.tfa_delays = tfa_delays
             if network.num_servers > 0 and self.tfa_delays[0] == np.inf:
                 self.tfa = False
         self.sfa = sfa
         self.sfa_delays = None
         if self.sfa:
-            self.sfa_delays = SfaLP(network, temp_folder=temp_folder, filename=filename+'_sfa', verbose=verbose).all_delays
+            if sfa_delays is None:
+                sfa_delays = SfaLP(network, temp_folder=temp_folder, filename=filename+'_sfa', verbose=verbose, solver=self.solver).all_delays
+            self.sfa_delays = sfa_delays
             if network.num_flows > 0 and self.sfa_delays[0] == np.inf:
                 self.sfa = False
         self.timeout = timeout
         self.temp_folder = temp_folder
-        self.filepath = temp_folder + filename + ".lp"
+        self.filename = filename
         self.verbose = verbose
         if list_edges != None:
             self.list_edges = list_edges
         else:
             self.list_edges = edges_forest(self.network)
-        self.forest, self.list_first, z = self.network.decomposition(self.list_edges)
+        if decomposition is None:
+            decomposition = self.network.decomposition(self.list_edges)
+        self.forest, self.list_first, z = decomposition
 
-    def lp_constraint_flow(self, foi: int, file):  # foi flow of the decomposition
+    def flow_constraints(self, foi: int):  # foi flow of the decomposition
         """
-        Writes the linear constraints for flow foi of the forest decomposition
+        The linear constraints for flow foi of the forest decomposition
         :param foi: flow of interest
-        :param file: file where the constraints are written
-        :return: None
+        :return: the PLPConstraints or ELPConstraints of the flow
         """
         net, new_foi, list_flows, list_severs = self.forest.sub_network(foi)
         if self.polynomial:
@@ -84,10 +115,17 @@ class FifoLP:
                 sub_tfa_delays = [self.tfa_delays[j] for j in list_severs]
             else:
                 sub_tfa_delays = None
-            lp = PLPConstraints(net, new_foi, foi + 1, list_flows, None, sub_tfa_delays)
-        else:
-            lp = ELPConstraints(net, new_foi, foi + 1, list_flows)
-        lp.write_constraints(file)
+            return PLPConstraints(net, new_foi, foi + 1, list_flows, None, sub_tfa_delays)
+        return ELPConstraints(net, new_foi, foi + 1, list_flows)
+
+    def lp_constraint_flow(self, foi: int, file):  # foi flow of the decomposition
+        """
+        Writes the linear constraints for flow foi of the forest decomposition
+        :param foi: flow of interest
+        :param file: file where the constraints are written
+        :return: None
+        """
+        self.flow_constraints(foi).write_constraints(file)
 
     def lp_constraints(self, file):
         """
@@ -110,69 +148,213 @@ class FifoLP:
             if i in self.list_first:
                 f += 1
 
+    def add_lp_constraints(self, model: LPModel):
+        """
+        Builds the linear program of lp_constraints in model
+        :param model: the model
+        :return: None
+        """
+        model.set_objective([('x{}'.format(i), 1.) for i in range(self.forest.num_flows)])
+        i = 0
+        f = 0
+        while i < self.forest.num_flows:
+            if i == self.list_first[f]:
+                model.fix('x{}'.format(i), self.network.flows[f].arrival_curve[0].sigma)
+            else:
+                self.flow_constraints(i - 1).add_constraints(model)
+            i += 1
+            if i in self.list_first:
+                f += 1
+
     @property
     def lp_program(self) -> np.ndarray:
         """
-        Writes the linear program and solves it to obtain the unknown burst where the flows have been cut
+        Writes the linear program (or builds it as an LPModel if the solver solves them natively) and solves it to
+        obtain the unknown burst where the flows have been cut
         :return: the list of bursts of flows in the forest
         """
-        file = open(self.filepath, 'w')
-        self.lp_constraints(file)
-        file.close()
+        if self.solver.native_models:
+            model = LPModel()
+            self.add_lp_constraints(model)
+        else:
+            file = io.StringIO()
+            self.lp_constraints(file)
+            model = file.getvalue()
 
         if self.verbose:
-            print('Solving:', self.filepath)
-        s = sp.run(LPSOLVEPATH + ["-timeout", f"{self.timeout}", "-S2", self.filepath], stdout=sp.PIPE, encoding='utf-8').stdout
-        
-        check_LP_error(s)
-        
-        tab_values = s.split('\n')[4:-1]
-        values = [[token for token in line.split(' ') if not token == ""] for line in tab_values]
+            print('Solving:', self.filename)
+        _, values = self.solver.solve(model, self.timeout, name=self.filename)
+
         tab_bursts = np.zeros(self.forest.num_flows)
-        for [s1, s2] in values:
+        for s1, s2 in values.items():
             if s1[0] == 'x':
-                tab_bursts[int(float(s1[1:]))] = float(s2)
+                tab_bursts[int(float(s1[1:]))] = s2
         return tab_bursts
 
     def update_sigma(self, f, sigma):
+        """
+        Computes the burst of flow f of the forest (and recursively of the flows it depends on) in the burst vector
+        sigma, where the unknown bursts are np.inf. Only sigma is modified.
+        :param f: the flow of the forest
+        :param sigma: the burst vector of the flows of the forest
+        :return: the burst vector
+        """
         if not sigma[f] == np.inf:
             return sigma
         sub_net, new_f, list_flows, list_servers = self.forest.sub_network(f - 1)
         for j in list_flows:
             if sigma[j] == np.inf:
                 sigma = self.update_sigma(j, sigma)
-        sigma[f] = TreeLP(sub_net, new_f, self.polynomial, self.sfa, self.tfa, self.timeout, self.temp_folder, "sigmatree", verbose=self.verbose).backlog
-        self.forest.flows[f].arrival_curve[0].sigma = sigma[f]
+        sub_net = sub_net.with_bursts([sigma[j] for j in list_flows])
+        sigma[f] = TreeLP(sub_net, new_f, self.polynomial, self.sfa, self.tfa, self.timeout, self.temp_folder, "sigmatree", verbose=self.verbose, solver=self.solver).backlog
         return sigma
 
-    def ff_analysis(self):
+    def ff_analysis(self) -> np.ndarray:
+        """
+        Computes the bursts of the flows of the forest when the network is feed-forward, server by server
+        :return: the list of bursts of flows in the forest
+        """
         sigma = np.inf * np.ones(self.forest.num_flows)
         for i in range(self.network.num_flows):
             sigma[self.list_first[i]] = self.network.flows[i].arrival_curve[0].sigma
+        if self.batch or self.workers > 1 or self.pipeline:
+            return self.ff_analysis_rounds(sigma)
         i = 0
         for f in range(self.forest.num_flows):
             if i < self.network.num_flows and self.list_first[i] == f:
                 i += 1
             else:
                 self.update_sigma(f, sigma)
-        return self.forest
+        return sigma
+
+    def ff_analysis_rounds(self, sigma) -> np.ndarray:
+        """
+        Computes the bursts of the flows of the forest when the network is feed-forward, by rounds: the bursts of all
+        the flows whose tree only contains flows with known bursts are computed together (see tree_backlogs).
+        :param sigma: the burst vector of the flows of the forest, where the unknown bursts are np.inf
+        :return: the burst vector
+        """
+        pending = [f for f in range(self.forest.num_flows) if sigma[f] == np.inf]
+        while len(pending) > 0:
+            ready = []
+            trees = {}
+            for f in pending:
+                sub_net, new_f, list_flows, list_servers = self.forest.sub_network(f - 1)
+                if all(not sigma[j] == np.inf for j in list_flows):
+                    # the flows ending at the same server share their tree
+                    if id(sub_net) not in trees:
+                        trees[id(sub_net)] = sub_net.with_bursts([sigma[j] for j in list_flows])
+                    ready += [(f, trees[id(sub_net)], new_f)]
+            if len(ready) == 0:
+                raise Exception("Network not feed-forward")
+            backlogs = self.tree_backlogs([(tree, new_f) for (f, tree, new_f) in ready])
+            for (f, tree, new_f), backlog in zip(ready, backlogs):
+                sigma[f] = backlog
+            pending = [f for f in pending if sigma[f] == np.inf]
+        return sigma
+
+    @property
+    def bursts(self) -> np.ndarray:
+        """
+        Computes the bursts of the flows of the forest: the bursts of the original flows, and the bursts obtained by
+        solving the fix-point equations for the flows that have been cut.
+        :return: the list of bursts of flows in the forest
+        """
+        if self.network.is_feed_forward:
+            return self.ff_analysis()
+        new_sigma = self.lp_program
+        for i in range(self.network.num_flows):
+            new_sigma[self.list_first[i]] = self.network.flows[i].arrival_curve[0].sigma
+        return new_sigma
 
     @property
     def ff_equiv(self) -> Network:
         """
         Construct the equivalent network by solving the fix-point equations. If the network has not been decomposed,
-        then returns the original network
+        then returns the original network. The equivalent network is a new network (self.forest is not modified),
+        so that the bursts computed by concurrent calls are kept separate.
         :return: the equivalent network
         """
         if self.forest.num_flows == self.network.num_flows:
             return self.network
-        if self.network.is_feed_forward:
-            return self.ff_analysis()
-        new_sigma = self.lp_program
-        for i in range(self.forest.num_flows):
-            if i not in self.list_first:
-                self.forest.flows[i].arrival_curve[0].sigma = new_sigma[i]
-        return self.forest
+        return self.forest.with_bursts(self.bursts)
+
+    def solve_trees(self, trees: List[Tuple[Network, int]], filename: str, backlog: bool) -> List[float]:
+        """
+        Computes the delay bounds (or the backlog bounds) of flows in their tree. The trees are independent, so their
+        linear programs are solved together if self.batch, concurrently by up to self.workers threads if
+        self.workers > 1, and one after the other otherwise, possibly written in advance by a pipeline.
+        :param trees: the list of pairs (tree, flow of interest in the tree)
+        :param filename: name of the linear programs
+        :param backlog: True for the backlog bounds, False for the delay bounds
+        :return: the list of bounds, in the order of trees
+        """
+        if self.batch:
+            lp = TreeLPBatch(trees, self.sfa, self.tfa, self.timeout, self.temp_folder, filename, verbose=self.verbose,
+                             solver=self.solver)
+            return lp.backlogs if backlog else lp.delays
+
+        def write_tree(tree, foi):
+            lp = TreeLP(tree, foi, self.polynomial, self.sfa, self.tfa, self.timeout, self.temp_folder, filename, verbose=self.verbose, solver=self.solver)
+            return lp, lp.backlog_model if backlog else lp.delay_model
+
+        def solve_model(lp, model):
+            return lp.solve_backlog(model) if backlog else lp.solve_delay(model)
+
+        def solve_tree(tree, foi):
+            return solve_model(*write_tree(tree, foi))
+
+        if len(trees) <= 1 or (self.workers <= 1 and not self.pipeline):
+            return [solve_tree(tree, foi) for tree, foi in trees]
+        if self.workers <= 1:
+            return self.pipeline_trees(trees, write_tree, solve_model)
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(trees))) as executor:
+            futures = [executor.submit(solve_tree, tree, foi) for tree, foi in trees]
+            try:
+                return [future.result() for future in futures]
+            finally:
+                # the remaining linear programs are useless if one of them failed
+                executor.shutdown(cancel_futures=True)
+
+    def pipeline_trees(self, trees: List[Tuple[Network, int]], write_tree, solve_model) -> List[float]:
+        """
+        Solves the linear programs of the trees one after the other, while a background thread writes the linear
+        programs of the next trees (at most PIPELINE_DEPTH in advance). Writing a linear program is pure Python while
+        solving it mostly waits for the solver, so both overlap.
+        :param trees: the list of pairs (tree, flow of interest in the tree)
+        :param write_tree: function returning the TreeLP of a tree and its linear program
+        :param solve_model: function solving the linear program of a TreeLP
+        :return: the list of bounds, in the order of trees
+        """
+        bounds = []
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pending = deque()
+            try:
+                for tree, foi in trees:
+                    pending.append(executor.submit(write_tree, tree, foi))
+                    if len(pending) > self.PIPELINE_DEPTH:
+                        bounds.append(solve_model(*pending.popleft().result()))
+                while len(pending) != 0:
+                    bounds.append(solve_model(*pending.popleft().result()))
+            finally:
+                executor.shutdown(cancel_futures=True)
+        return bounds
+
+    def tree_backlogs(self, trees: List[Tuple[Network, int]]) -> List[float]:
+        """
+        Computes the backlog bounds of flows in their tree (see solve_trees)
+        :param trees: the list of pairs (tree, flow of interest in the tree)
+        :return: the list of backlog bounds, in the order of trees
+        """
+        return self.solve_trees(trees, "sigmatree", True)
+
+    def tree_delays(self, trees: List[Tuple[Network, int]]) -> List[float]:
+        """
+        Computes the delay bounds of flows in their tree (see solve_trees)
+        :param trees: the list of pairs (tree, flow of interest in the tree)
+        :return: the list of delay bounds, in the order of trees
+        """
+        return self.solve_trees(trees, "tree", False)
 
     @property
     def all_delays(self) -> List[float]:
@@ -181,12 +363,12 @@ class FifoLP:
         :return: the list of delay bounds
         """
         ff = self.ff_equiv
+        piece_delays = self.tree_delays([ff.sub_network(i)[:2] for i in range(ff.num_flows)])
         tab_delays = []
         i = 0
         d = 0
         while i < ff.num_flows:
-            tree, foi, list_flows, list_servers = ff.sub_network(i)
-            d += TreeLP(tree, foi, self.polynomial, self.sfa, self.tfa, self.timeout, self.temp_folder, "tree", verbose=self.verbose).delay
+            d += piece_delays[i]
             i += 1
             if i in self.list_first:
                 tab_delays += [d]
@@ -201,11 +383,6 @@ class FifoLP:
         :return: the delay bound of foi
         """
         ff = self.ff_equiv
-        i = self.list_first[foi]
-        delay = 0
-        while (foi < self.network.num_flows - 1 and i < self.list_first[foi + 1]) or \
-              (foi == self.network.num_flows - 1 and i < ff.num_flows):
-            tree, foi1, list_flows, list_servers = ff.sub_network(i)
-            delay += TreeLP(tree, foi1, self.polynomial, self.sfa, self.tfa, self.timeout, self.temp_folder, filename="tree", verbose=self.verbose).delay
-            i += 1
-        return delay
+        first = self.list_first[foi]
+        last = self.list_first[foi + 1] if foi < self.network.num_flows - 1 else ff.num_flows
+        return sum(self.tree_delays([ff.sub_network(i)[:2] for i in range(first, last)]))
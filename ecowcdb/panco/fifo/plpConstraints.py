@@ -1,5 +1,6 @@
 # Local Imports - panco libraries
 from ecowcdb.panco.descriptor.network import Network
+from ecowcdb.panco.lpModel import LPModel
 
 
 
@@ -16,7 +17,8 @@ def times(num_servers, depth):
 
 class PLPConstraints:
     # Linear analysis for fifo tree networks using only a quadratic number of time constraints
-    def __init__(self, network: Network, foi, next_foi=None, list_flows=None, delays_flow=None, delays_server=None):
+    def __init__(self, network: Network, foi, next_foi=None, list_flows=None, delays_flow=None, delays_server=None,
+                 is_cyclic=None):
         self.network = network
         dates = times(self.network.num_servers, self.network.depth)
         self.t_min = dates[0]
@@ -33,77 +35,96 @@ class PLPConstraints:
         else:
             self.list_flows = list_flows
             self.is_cyclic = True
+        # the burst variables of a tree packed with other trees are renamed, but the tree is not part of a fix-point
+        if is_cyclic is not None:
+            self.is_cyclic = is_cyclic
         self.delays_flow = delays_flow
         self.delays_server = delays_server
+        self._date_pairs = {}
+
+    def date_pairs(self, j):
+        """
+        Returns the pairs of dates (u, v) of server j such that t_min[j] <= u < v <= t_max[j], in lexicographic order.
+        They index the arrival and shaping constraints, and are computed once per server.
+        :param j: the server
+        :return: the list of pairs of dates
+        """
+        if j not in self._date_pairs:
+            self._date_pairs[j] = [(u, v) for u in range(self.t_min[j], self.t_max[j])
+                                   for v in range(u + 1, self.t_max[j] + 1)]
+        return self._date_pairs[j]
+
+    # The constraint families are written in bulk: the template of a family is specialized once per flow or server
+    # (the fields in double braces remain), then formatted for every date, and the lines are written with one call.
 
     def time_constraints(self, f):
-        f.write('\n/* Time Constraints */\n')
         e = self.next_foi
-        f.write('t1e{0} <= t0e{0};\n'.format(e))
-        f.write('t2e{0} <= t1e{0};\n'.format(e))
+        lines = ['\n/* Time Constraints */\n', 't1e{0} <= t0e{0};\n'.format(e), 't2e{0} <= t1e{0};\n'.format(e)]
         for j in range(self.network.num_servers - 1):
             h = self.network.successors[j][0]
             tj = self.t_min[j]
             th = self.t_min[h]
-            for u in range(self.network.depth[j] + 1):
-                f.write('t{0}e{2} <= t{1}e{2};\n'.format(tj + u + 1, tj + u, e))
-                f.write('t{0}e{2} <= t{1}e{2};\n'.format(tj + u, th + u, e))
+            line = 't{{1}}e{0} <= t{{0}}e{0};\nt{{0}}e{0} <= t{{2}}e{0};\n'.format(e)
+            lines += [line.format(tj + u, tj + u + 1, th + u) for u in range(self.network.depth[j] + 1)]
+        f.write(''.join(lines))
 
     def arrival_constraints(self, f):
-        f.write('\n/* arrival constraints */\n')
         e = self.next_foi
+        lines = ['\n/* arrival constraints */\n']
         for i in range(self.network.num_flows):
             # path = self.network.flows[i].path
             if i == self.foi:
                 arrival_curve = [self.network.flows[i].arrival_curve[0]]
             else:
                 arrival_curve = self.network.flows[i].arrival_curve
+            j = self.network.path[i][0]
             for tb in arrival_curve:
-                j = self.network.path[i][0]
-                for u in range(self.t_min[j], self.t_max[j]):
-                    for v in range(u + 1, self.t_max[j] + 1):
-                        f.write('f{0}s{1}t{2}e{6} - f{0}s{1}t{3}e{6} <= x{4} + {5} t{2}e{6} - {5} t{3}e{6};\n'.
-                                format(i, j, u, v, self.list_flows[i], tb.rho, e))
+                line = 'f{0}s{1}t{{0}}e{4} - f{0}s{1}t{{1}}e{4} <= x{2} + {3} t{{0}}e{4} - {3} t{{1}}e{4};\n'.\
+                    format(i, j, self.list_flows[i], tb.rho, e)
+                lines += [line.format(u, v) for u, v in self.date_pairs(j)]
+        f.write(''.join(lines))
 
     def arrival_shaping_constraints(self, f, b=False):
-        f.write('\n/* arrival shaping constraints */\n')
         e = self.next_foi
+        lines = ['\n/* arrival shaping constraints */\n']
         for k in range(len(self.network.arrival_shaping)):
             j = self.network.arrival_shaping[k][0]
             max_service = self.network.arrival_shaping[k][2]
             for i in self.network.arrival_shaping[k][1]:
                 if not j == self.network.path[i][0]:
+                    f.write(''.join(lines))
                     print('error in shaping constraints', j, self.network.path[i][0])
                     return
-            for u in range(self.t_min[j], self.t_max[j]):
-                for v in range(u + 1, self.t_max[j] + 1):
-                    for tb in max_service:
-                        f.write('0')
-                        for i in self.network.arrival_shaping[k][1]:
-                            if b or (not self.is_cyclic) or (not i == self.foi):
-                                f.write('+f{0}s{1}t{2}e{4} - f{0}s{1}t{3}e{4}'.format(i, j, u, v, e))
-                        f.write('<= {0} + {1}t{2}e{4} - {1}t{3}e{4};\n'.format(tb.sigma, tb.rho, u, v, e))
+            flows = ''.join(['+f{0}s{1}t{{0}}e{2} - f{0}s{1}t{{1}}e{2}'.format(i, j, e)
+                             for i in self.network.arrival_shaping[k][1]
+                             if b or (not self.is_cyclic) or (not i == self.foi)])
+            templates = ['0' + flows + '<= {0} + {1}t{{0}}e{2} - {1}t{{1}}e{2};\n'.format(tb.sigma, tb.rho, e)
+                         for tb in max_service]
+            lines += [line.format(u, v) for u, v in self.date_pairs(j) for line in templates]
+        f.write(''.join(lines))
 
     def monotony_constraints(self, f):
-        f.write('\n/* Monotony constraints */\n')
         e = self.next_foi
+        lines = ['\n/* Monotony constraints */\n']
         for i in range(self.network.num_flows):
             for j in self.network.path[i]:
-                for u in range(self.t_min[j], self.t_max[j]):
-                    f.write('f{0}s{1}t{2}e{4} - f{0}s{1}t{3}e{4} >= 0; \n'.format(i, j, u, u + 1, e))
+                line = 'f{0}s{1}t{{0}}e{2} - f{0}s{1}t{{1}}e{2} >= 0; \n'.format(i, j, e)
+                lines += [line.format(u, u + 1) for u in range(self.t_min[j], self.t_max[j])]
+        f.write(''.join(lines))
 
     def fifo_constraints(self, f):
-        f.write('\n/* fifo constraints */\n')
         e = self.next_foi
+        lines = ['\n/* fifo constraints */\n']
         for i in range(self.network.num_flows):
             for j in self.network.path[i]:
                 if j == self.network.num_servers - 1:
-                    f.write('f{0}s{1}t{3}e{5}= f{0}s{2}t{4}e{5}; \n'.format(i, j, j + 1, 1, 0, e))
+                    lines += ['f{0}s{1}t{3}e{5}= f{0}s{2}t{4}e{5}; \n'.format(i, j, j + 1, 1, 0, e)]
                 else:
                     h = self.network.successors[j][0]
-                    for u in range(self.network.depth[j] + 1):
-                        f.write('f{0}s{1}t{3}e{5} = f{0}s{2}t{4}e{5}; \n'.format(i, j, h, self.t_min[j] + u,
-                                                                                 self.t_min[h] + u, e))
+                    line = 'f{0}s{1}t{{0}}e{3} = f{0}s{2}t{{1}}e{3}; \n'.format(i, j, h, e)
+                    lines += [line.format(self.t_min[j] + u, self.t_min[h] + u)
+                              for u in range(self.network.depth[j] + 1)]
+        f.write(''.join(lines))
 
     def sfa_delay_constraints(self, f):
         f.write('\n/* SFA delay constraints */\n')
@@ -111,15 +132,17 @@ class PLPConstraints:
         d = self. delays_flow  # Sfa(self.network).delay()
         if d is None:
             return
+        lines = []
         for i in range(self.network.num_flows):
             j = self.network.path[i][-1]
             h = self.network.path[i][0]
             if j == self.network.num_servers - 1:
-                f.write('t{0}e{3} - t{1}e{3} <= {2};\n'.format(0, self.t_min[h], d[i], e))
+                lines += ['t{0}e{3} - t{1}e{3} <= {2};\n'.format(0, self.t_min[h], d[i], e)]
             else:
                 j = self.network.successors[j][0]
-                for k in range(self.network.depth[j] + 2):
-                    f.write('t{0}e{3} - t{1}e{3} <= {2};\n'.format(self.t_min[j] + k, self.t_min[h] + k, d[i], e))
+                line = 't{{0}}e{1} - t{{1}}e{1} <= {0};\n'.format(d[i], e)
+                lines += [line.format(self.t_min[j] + k, self.t_min[h] + k) for k in range(self.network.depth[j] + 2)]
+        f.write(''.join(lines))
 
     def tfa_delay_constraints(self, f):
         f.write('\n/* TFA delay constraints */\n')
@@ -128,31 +151,32 @@ class PLPConstraints:
         d = self.delays_server
         if d is None:
             return
+        lines = []
         for j in range(self.network.num_servers):
             if j == self.network.num_servers - 1:
-                f.write('t{0}e{3} - t{1}e{3} <= {2};\n'.format(0, self.t_min[j], d[j], e))
+                lines += ['t{0}e{3} - t{1}e{3} <= {2};\n'.format(0, self.t_min[j], d[j], e)]
             else:
                 h = self.network.successors[j][0]
-                for k in range(self.network.depth[h] + 2):
-                    f.write('t{0}e{3} - t{1}e{3} <= {2};\n'.format(self.t_min[h] + k, self.t_min[j] + k, d[j], e))
+                line = 't{{0}}e{1} - t{{1}}e{1} <= {0};\n'.format(d[j], e)
+                lines += [line.format(self.t_min[h] + k, self.t_min[j] + k) for k in range(self.network.depth[h] + 2)]
+        f.write(''.join(lines))
 
     def shaping_constraints(self, f):
-        f.write('\n/* Shaping constraints (e.g. maximum rate of a link)*/\n')
         e = self.next_foi
+        lines = ['\n/* Shaping constraints (e.g. maximum rate of a link)*/\n']
         for j in range(self.network.num_servers - 1):
             h = self.network.successors[j][0]
-            for u in range(self.t_min[h], self.t_max[h]):
-                for v in range(u + 1, self.t_max[h] + 1):
-                    for tk in self.network.servers[j].max_service_curve:
-                        f.write('0')
-                        for i in self.network.edges[(j, h)]:  # flows_in_server[j]:
-                            if not self.is_cyclic or not i == self.foi:
-                                f.write('+ f{0}s{1}t{2}e{4} - f{0}s{1}t{3}e{4} '.format(i, h, u, v, e))
-                        f.write('<= {4} + {0} t{1}e{3} - {0} t{2}e{3};\n'.format(tk.rho, u, v, e, tk.sigma))
+            flows = ''.join(['+ f{0}s{1}t{{0}}e{2} - f{0}s{1}t{{1}}e{2} '.format(i, h, e)
+                             for i in self.network.edges[(j, h)]  # flows_in_server[j]:
+                             if not self.is_cyclic or not i == self.foi])
+            templates = ['0' + flows + '<= {2} + {0} t{{0}}e{1} - {0} t{{1}}e{1};\n'.format(tk.rho, e, tk.sigma)
+                         for tk in self.network.servers[j].max_service_curve]
+            lines += [line.format(u, v) for u, v in self.date_pairs(h) for line in templates]
+        f.write(''.join(lines))
 
     def service_constraints(self, f):
-        f.write('\n/* Service constraints */\n')
         e = self.next_foi
+        lines = ['\n/* Service constraints */\n']
         for j in range(self.network.num_servers):
             u = self.t_max[j]
             if j == self.network.num_servers - 1:
@@ -161,13 +185,13 @@ class PLPConstraints:
             else:
                 h = self.network.successors[j][0]
                 v = self.t_max[h]
+            flows = ''.join(['f{0}s{1}t{2}e{5} - f{0}s{3}t{4}e{5} + '.format(i, h, v, j, u, e)
+                             for i in self.network.flows_in_server[j]])
             for rl in self.network.servers[j].service_curve:
-                for i in self.network.flows_in_server[j]:
-                    f.write('f{0}s{1}t{2}e{5} - f{0}s{3}t{4}e{5} + '.format(i, h, v, j, u, e))
-                f.write('{0} >= {1} t{2}e{5} - {3} t{4}e{5};\n'.format(rl.rate * rl.latency, rl.rate, v, rl.rate, u, e))
-                for i in self.network.flows_in_server[j]:
-                    f.write('f{0}s{1}t{2}e{5} - f{0}s{3}t{4}e{5} + '.format(i, h, v, j, u, e))
-                f.write('0 >= 0;\n')
+                lines += [flows, '{0} >= {1} t{2}e{5} - {3} t{4}e{5};\n'.format(rl.rate * rl.latency, rl.rate, v,
+                                                                                 rl.rate, u, e),
+                          flows, '0 >= 0;\n']
+        f.write(''.join(lines))
 
     def fix_point_constraints(self, file):
         file.write('\n/* the x burst constraints*/\n')
@@ -177,24 +201,41 @@ class PLPConstraints:
                    format(self.foi, self.network.path[self.foi][0],
                           self.network.path[self.foi][-1] + 1, self.next_foi, self.next_foi))
         j = self.network.path[self.foi][0]
-        for k in range(self.t_min[j], self.t_max[j] + 1):
-            file.write('f{0}s{1}t0e{5} - f{0}s{1}t{2}e{5} <= x{3} + {4}t0e{5} - {4}t{2}e{5};\n'.
-                       format(self.foi, j, k, self.list_flows[self.foi],
-                              self.network.flows[self.foi].arrival_curve[0].rho, self.next_foi))
+        line = 'f{0}s{1}t0e{4} - f{0}s{1}t{{0}}e{4} <= x{2} + {3}t0e{4} - {3}t{{0}}e{4};\n'.\
+            format(self.foi, j, self.list_flows[self.foi], self.network.flows[self.foi].arrival_curve[0].rho,
+                   self.next_foi)
+        file.write(''.join([line.format(k) for k in range(self.t_min[j], self.t_max[j] + 1)]))
+
+    def t0_arrival_constraints(self, i, e=0):
+        # arrival constraints of flow i between date t0 and the dates of its first server, in the block e
+        j = self.network.path[i][0]
+        line = 'f{0}s{1}t0e{4} - f{0}s{1}t{{0}}e{4} <= {2} + {3}t0e{4} - {3}t{{0}}e{4};\n'.\
+            format(i, j, self.network.flows[i].arrival_curve[0].sigma, self.network.flows[i].arrival_curve[0].rho, e)
+        return ''.join([line.format(k) for k in range(self.t_min[j], self.t_max[j] + 1)])
 
     def backlog_objective(self, file):
         if True:  # self.network.path[self.foi][-1] == self.network.num_servers - 1:
             file.write(
                 'max: f{0}s{1}t0e0 - f{0}s{2}t0e0;\n'.format(self.foi, self.network.flows[self.foi].path[0],
                                                              self.network.num_servers))
-            j = self.network.path[self.foi][0]
-            for k in range(self.t_min[j], self.t_max[j] + 1):
-                file.write('f{0}s{1}t0e0 - f{0}s{1}t{2}e0 <= {3} + {4}t0e0 - {4}t{2}e0;\n'.
-                           format(self.foi, j, k, self.network.flows[self.foi].arrival_curve[0].sigma,
-                                  self.network.flows[self.foi].arrival_curve[0].rho))
+            file.write(self.t0_arrival_constraints(self.foi))
         else:
             raise Exception('flow do not stop at last server\n')
 
+    def delay_block_constraints(self, file, name):
+        # defines the variable name as the delay of the foi, in the block of variables next_foi
+        if not self.network.path[self.foi][-1] == self.network.num_servers - 1:
+            raise Exception('flow do not stop at last server\n')
+        file.write('{0} = t0e{1} - t{2}e{1};\n'.format(name, self.next_foi,
+                                                       self.t_min[self.network.path[self.foi][0]]))
+
+    def backlog_block_constraints(self, file, name):
+        # defines the variable name as the backlog of the foi, in the block of variables next_foi
+        e = self.next_foi
+        file.write('{0} = f{1}s{2}t0e{4} - f{1}s{3}t0e{4};\n'.format(name, self.foi, self.network.path[self.foi][0],
+                                                                     self.network.num_servers, e))
+        file.write(self.t0_arrival_constraints(self.foi, e))
+
     def backlog_set_objective(self, set_flows, file):
         for i in set_flows:
             if not self.network.path[self.foi][-1] == self.network.num_servers - 1:
@@ -204,21 +245,11 @@ class PLPConstraints:
             file.write('+ f{0}s{1}t0e0 - f{0}s{2}t0e0'.format(i, self.network.flows[i].path[0],
                                                              self.network.num_servers))
         file.write(';\n')
-        for i in set_flows:
-            j = self.network.path[i][0]
-            for k in range(self.t_min[j], self.t_max[j] + 1):
-                file.write('f{0}s{1}t0e0 - f{0}s{1}t{2}e0 <= {3} + {4}t0e0 - {4}t{2}e0;\n'.
-                           format(i, j, k, self.network.flows[i].arrival_curve[0].sigma,
-                                  self.network.flows[i].arrival_curve[0].rho))
+        file.write(''.join([self.t0_arrival_constraints(i) for i in set_flows]))
 
     def aggregated_backlog_constraints(self, set_flows, file):
         file.write('\n/* Constraints at time t0 for the global backlog */\n')
-        for i in set_flows:
-            j = self.network.path[i][0]
-            for k in range(self.t_min[j], self.t_max[j] + 1):
-                file.write('f{0}s{1}t0e0 - f{0}s{1}t{2}e0 <= {3} + {4}t0e0 - {4}t{2}e0;\n'.
-                           format(i, j, k, self.network.flows[i].arrival_curve[0].sigma,
-                                  self.network.flows[i].arrival_curve[0].rho))
+        file.write(''.join([self.t0_arrival_constraints(i) for i in set_flows]))
 
 
     def aggregated_arrival_constraints(self, set_flows, f):
@@ -226,11 +257,9 @@ class PLPConstraints:
         f.write('\n/* aggregated arrival constraints */\n')
         e = self.next_foi
         rho = sum([self.network.flows[i].arrival_curve[0].rho for i in set_flows])
-        for u in range(self.t_min[j], self.t_max[j]):
-            for v in range(u + 1, self.t_max[j] + 1):
-                for i in set_flows:
-                    f.write('+ f{0}s{1}t{2}e{4} - f{0}s{1}t{3}e{4} '.format(i, j, u, v, e))
-                f.write('<= y + {0} t{1}e{3} - {0} t{2}e{3};\n'.format(rho, u, v, e))
+        line = ''.join(['+ f{0}s{1}t{{0}}e{2} - f{0}s{1}t{{1}}e{2} '.format(i, j, e) for i in set_flows]) + \
+            '<= y + {0} t{{0}}e{1} - {0} t{{1}}e{1};\n'.format(rho, e)
+        f.write(''.join([line.format(u, v) for u, v in self.date_pairs(j)]))
 
     def tfa_delay_constraints_agg(self, f):
         f.write('\n/* TFA delay constraints */\n')
@@ -239,13 +268,182 @@ class PLPConstraints:
         # d = self.delays_server
         # if d is None:
         #     return
+        lines = []
+        for j in range(self.network.num_servers):
+            if j == self.network.num_servers - 1:
+                lines += ['t{0}e{3} - t{1}e{3} <= d{2};\n'.format(0, self.t_min[j], j, e)]
+            else:
+                h = self.network.successors[j][0]
+                line = 't{{0}}e{1} - t{{1}}e{1} <= d{0};\n'.format(j, e)
+                lines += [line.format(self.t_min[h] + k, self.t_min[j] + k) for k in range(self.network.depth[h] + 2)]
+        f.write(''.join(lines))
+
+    # The same constraints are built in an LPModel by the add_* methods, for the solvers that do not need the LP
+    # format. The terms are added in the order they are written (left-hand side, then right-hand side), so that the
+    # model is the same as the one read from the LP format.
+
+    def add_time_constraints(self, model: LPModel):
+        e = self.next_foi
+        t = 't{{}}e{}'.format(e).format
+        model.add_constraint([(t(1), 1.), (t(0), -1.)], '<=')
+        model.add_constraint([(t(2), 1.), (t(1), -1.)], '<=')
+        for j in range(self.network.num_servers - 1):
+            h = self.network.successors[j][0]
+            tj = self.t_min[j]
+            th = self.t_min[h]
+            for u in range(self.network.depth[j] + 1):
+                model.add_constraint([(t(tj + u + 1), 1.), (t(tj + u), -1.)], '<=')
+                model.add_constraint([(t(tj + u), 1.), (t(th + u), -1.)], '<=')
+
+    def add_arrival_constraints(self, model: LPModel):
+        e = self.next_foi
+        t = 't{{}}e{}'.format(e).format
+        for i in range(self.network.num_flows):
+            if i == self.foi:
+                arrival_curve = [self.network.flows[i].arrival_curve[0]]
+            else:
+                arrival_curve = self.network.flows[i].arrival_curve
+            j = self.network.path[i][0]
+            f = 'f{}s{}t{{}}e{}'.format(i, j, e).format
+            x = 'x{}'.format(self.list_flows[i])
+            for tb in arrival_curve:
+                for u, v in self.date_pairs(j):
+                    model.add_constraint([(f(u), 1.), (f(v), -1.), (x, -1.), (t(u), -tb.rho), (t(v), tb.rho)], '<=')
+
+    def add_arrival_shaping_constraints(self, model: LPModel, b=False):
+        e = self.next_foi
+        t = 't{{}}e{}'.format(e).format
+        for k in range(len(self.network.arrival_shaping)):
+            j = self.network.arrival_shaping[k][0]
+            max_service = self.network.arrival_shaping[k][2]
+            for i in self.network.arrival_shaping[k][1]:
+                if not j == self.network.path[i][0]:
+                    print('error in shaping constraints', j, self.network.path[i][0])
+                    return
+            flows = ['f{}s{}t{{}}e{}'.format(i, j, e).format for i in self.network.arrival_shaping[k][1]
+                     if b or (not self.is_cyclic) or (not i == self.foi)]
+            for u, v in self.date_pairs(j):
+                terms = [term for f in flows for term in ((f(u), 1.), (f(v), -1.))]
+                for tb in max_service:
+                    model.add_constraint(terms + [(t(u), -tb.rho), (t(v), tb.rho)], '<=', tb.sigma)
+
+    def add_monotony_constraints(self, model: LPModel):
+        e = self.next_foi
+        for i in range(self.network.num_flows):
+            for j in self.network.path[i]:
+                f = 'f{}s{}t{{}}e{}'.format(i, j, e).format
+                for u in range(self.t_min[j], self.t_max[j]):
+                    model.add_constraint([(f(u), 1.), (f(u + 1), -1.)], '>=')
+
+    def add_fifo_constraints(self, model: LPModel):
+        e = self.next_foi
+        for i in range(self.network.num_flows):
+            for j in self.network.path[i]:
+                if j == self.network.num_servers - 1:
+                    model.add_constraint([('f{}s{}t1e{}'.format(i, j, e), 1.),
+                                          ('f{}s{}t0e{}'.format(i, j + 1, e), -1.)], '=')
+                else:
+                    h = self.network.successors[j][0]
+                    for u in range(self.network.depth[j] + 1):
+                        model.add_constraint([('f{}s{}t{}e{}'.format(i, j, self.t_min[j] + u, e), 1.),
+                                              ('f{}s{}t{}e{}'.format(i, h, self.t_min[h] + u, e), -1.)], '=')
+
+    def add_sfa_delay_constraints(self, model: LPModel):
+        e = self.next_foi
+        d = self.delays_flow
+        if d is None:
+            return
+        t = 't{{}}e{}'.format(e).format
+        for i in range(self.network.num_flows):
+            j = self.network.path[i][-1]
+            h = self.network.path[i][0]
+            if j == self.network.num_servers - 1:
+                model.add_constraint([(t(0), 1.), (t(self.t_min[h]), -1.)], '<=', d[i])
+            else:
+                j = self.network.successors[j][0]
+                for k in range(self.network.depth[j] + 2):
+                    model.add_constraint([(t(self.t_min[j] + k), 1.), (t(self.t_min[h] + k), -1.)], '<=', d[i])
+
+    def add_tfa_delay_constraints(self, model: LPModel):
+        e = self.next_foi
+        d = self.delays_server
+        if d is None:
+            return
+        t = 't{{}}e{}'.format(e).format
         for j in range(self.network.num_servers):
             if j == self.network.num_servers - 1:
-                f.write('t{0}e{3} - t{1}e{3} <= d{2};\n'.format(0, self.t_min[j], j, e))
+                model.add_constraint([(t(0), 1.), (t(self.t_min[j]), -1.)], '<=', d[j])
             else:
                 h = self.network.successors[j][0]
                 for k in range(self.network.depth[h] + 2):
-                    f.write('t{0}e{3} - t{1}e{3} <= d{2};\n'.format(self.t_min[h] + k, self.t_min[j] + k, j, e))
+                    model.add_constraint([(t(self.t_min[h] + k), 1.), (t(self.t_min[j] + k), -1.)], '<=', d[j])
+
+    def add_shaping_constraints(self, model: LPModel):
+        e = self.next_foi
+        t = 't{{}}e{}'.format(e).format
+        for j in range(self.network.num_servers - 1):
+            h = self.network.successors[j][0]
+            flows = ['f{}s{}t{{}}e{}'.format(i, h, e).format for i in self.network.edges[(j, h)]
+                     if not self.is_cyclic or not i == self.foi]
+            for u, v in self.date_pairs(h):
+                terms = [term for f in flows for term in ((f(u), 1.), (f(v), -1.))]
+                for tk in self.network.servers[j].max_service_curve:
+                    model.add_constraint(terms + [(t(u), -tk.rho), (t(v), tk.rho)], '<=', tk.sigma)
+
+    def add_service_constraints(self, model: LPModel):
+        e = self.next_foi
+        for j in range(self.network.num_servers):
+            u = self.t_max[j]
+            if j == self.network.num_servers - 1:
+                v = 0
+                h = self.network.num_servers
+            else:
+                h = self.network.successors[j][0]
+                v = self.t_max[h]
+            terms = [term for i in self.network.flows_in_server[j]
+                     for term in (('f{}s{}t{}e{}'.format(i, h, v, e), 1.), ('f{}s{}t{}e{}'.format(i, j, u, e), -1.))]
+            for rl in self.network.servers[j].service_curve:
+                model.add_constraint(terms + [('t{}e{}'.format(v, e), -rl.rate), ('t{}e{}'.format(u, e), rl.rate)],
+                                     '>=', 0. - rl.rate * rl.latency)
+                model.add_constraint(terms, '>=', 0.)
+
+    def add_fix_point_constraints(self, model: LPModel):
+        e = self.next_foi
+        model.add_constraint([('x{}'.format(e), 1.),
+                              ('f{}s{}t0e{}'.format(self.foi, self.network.path[self.foi][0], e), -1.),
+                              ('f{}s{}t0e{}'.format(self.foi, self.network.path[self.foi][-1] + 1, e), 1.)], '=')
+        self.add_t0_arrival_constraints(model, self.foi, e, 'x{}'.format(self.list_flows[self.foi]))
+
+    def add_t0_arrival_constraints(self, model: LPModel, i, e=0, burst=None):
+        # arrival constraints of flow i between date t0 and the dates of its first server, in the block e, with the
+        # burst variable burst (the burst of the flow if None)
+        j = self.network.path[i][0]
+        rho = self.network.flows[i].arrival_curve[0].rho
+        f = 'f{}s{}t{{}}e{}'.format(i, j, e).format
+        t = 't{{}}e{}'.format(e).format
+        for k in range(self.t_min[j], self.t_max[j] + 1):
+            if burst is None:
+                model.add_constraint([(f(0), 1.), (f(k), -1.), (t(0), -rho), (t(k), rho)], '<=',
+                                     self.network.flows[i].arrival_curve[0].sigma)
+            else:
+                model.add_constraint([(f(0), 1.), (f(k), -1.), (burst, -1.), (t(0), -rho), (t(k), rho)], '<=')
+
+    def set_backlog_objective(self, model: LPModel):
+        model.set_objective([('f{}s{}t0e0'.format(self.foi, self.network.flows[self.foi].path[0]), 1.),
+                             ('f{}s{}t0e0'.format(self.foi, self.network.num_servers), -1.)])
+        self.add_t0_arrival_constraints(model, self.foi)
+
+    def add_constraints(self, model: LPModel):
+        self.add_time_constraints(model)
+        self.add_arrival_constraints(model)
+        self.add_fifo_constraints(model)
+        self.add_service_constraints(model)
+        self.add_monotony_constraints(model)
+        self.add_shaping_constraints(model)
+        self.add_arrival_shaping_constraints(model)
+        self.add_tfa_delay_constraints(model)
+        self.add_sfa_delay_constraints(model)
+        self.add_fix_point_constraints(model)
 
     def write_constraints(self, file):
         file.write('\n/* flow {} */\n'.format(self.list_flows[self.foi]))
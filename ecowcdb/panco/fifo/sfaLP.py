@@ -1,5 +1,5 @@
 # Standard Library Imports
-import subprocess as sp
+import io
 from typing import List
 
 # Third-Party Library Imports
@@ -7,24 +7,27 @@ import numpy as np
 
 # Local Imports - panco libraries
 from ecowcdb.panco.descriptor.network import Network
-from ecowcdb.panco.lpSolvePath import LPSOLVEPATH
+from ecowcdb.panco.lpModel import LPModel
+from ecowcdb.panco.lpSolver import LPSolveSolver
 
 # Local Imports - utility libraries
-from ecowcdb.util.errors import LPError, check_LP_error
+from ecowcdb.util.errors import LPError
 
 
 
 class SfaLP:
-    def __init__(self, network: Network, temp_folder="", filename="sfa", verbose=False):
+    def __init__(self, network: Network, temp_folder="", filename="sfa", verbose=False, solver=None):
         """
         Class for computing the performances using the SFA method (linear model only, without shaping)
         in fifo networks, using a linear program to perform the operations. the value of theta is T + b_cross/R.
         :param network: The network to analyze
         :param filename: the name of the file where the lp program is written
+        :param solver: the solver of the linear program (lp_solve executable if None)
         """
         self.network = network
+        self.solver = solver if solver is not None else LPSolveSolver(temp_folder)
         self.temp_folder = temp_folder
-        self.filepath = temp_folder + filename + ".lp"
+        self.filename = filename
         self.verbose = verbose
         self.forest, self.list_first, self.removed_edges = self.network.decomposition([])
 
@@ -50,41 +53,69 @@ class SfaLP:
                 file.write('+ {0};\n'.format(self.forest.flows[f].arrival_curve[0].rho *
                                              self.network.servers[j].service_curve[0].latency))
 
+    def add_sfa_variables(self, model: LPModel):
+        """
+        Adds the constraints of sfa_variables to a model
+        :param model: the model
+        :return: None
+        """
+        i = 0
+        for f in range(self.forest.num_flows):
+            if i < self.network.num_flows and f == self.list_first[i]:
+                model.fix('x{}'.format(f), self.network.flows[i].arrival_curve[0].sigma)
+                i += 1
+            else:
+                j = self.forest.flows[f - 1].path[0]
+                terms = [('x{}'.format(f), 1.), ('x{}'.format(f - 1), -1.)]
+                for k in self.forest.flows_in_server[j]:
+                    if not k == f - 1:
+                        terms.append(('x{}'.format(k), -(self.forest.flows[f].arrival_curve[0].rho /
+                                                         self.network.servers[j].service_curve[0].rate)))
+                model.add_constraint(terms, '=', self.forest.flows[f].arrival_curve[0].rho *
+                                     self.network.servers[j].service_curve[0].latency)
+
     @property
-    def ff_equiv(self) -> Network:
+    def lp_model(self) -> str | LPModel:
         """
-        The equivalent network: all the arrival curves of the flows at each server
-        :return: the equivalent network
+        The linear program computing the bursts of the flows at each server, built as an LPModel if the solver solves
+        them natively
+        :return: the linear program
         """
-        file = open(self.filepath, 'w')
+        if self.solver.native_models:
+            model = LPModel()
+            model.set_objective([('x{}'.format(f), 1.) for f in range(self.forest.num_flows)])
+            self.add_sfa_variables(model)
+            return model
+        file = io.StringIO()
         file.write('max:')
         for f in range(self.forest.num_flows):
             file.write('+ x{0} '.format(f))
         file.write(';\n')
         self.sfa_variables(file)
-        file.close()
-        
+        return file.getvalue()
+
+    @property
+    def ff_equiv(self) -> Network:
+        """
+        The equivalent network: all the arrival curves of the flows at each server. The equivalent network is a new
+        network (self.forest is not modified).
+        :return: the equivalent network
+        """
+        model = self.lp_model
+
         if self.verbose:
-            print('Solving:', self.filepath)
-        s = sp.run(LPSOLVEPATH + ["-S2", self.filepath], stdout=sp.PIPE, encoding='utf-8').stdout
-        
+            print('Solving:', self.filename)
         # If there is an error while computing SFA, return infinite bound.
         try:
-            check_LP_error(s)
+            _, values = self.solver.solve(model, name=self.filename)
         except LPError as _:
-            for f in range(self.forest.num_flows):
-                self.forest.flows[f].arrival_curve[0].sigma = np.inf 
-            return self.forest
+            return self.forest.with_bursts(self.forest.num_flows * [np.inf])
 
-        tab_values = s.split('\n')[4:-1]
-        values = [[token for token in line.split(' ') if not token == ""] for line in tab_values]
-        # if not values:
-        #     for f in range(self.forest.num_flows):
-        #         self.forest.flows[f].arrival_curve[0].sigma = np.inf
-        for [s1, s2] in values:
+        bursts = [flow.arrival_curve[0].sigma for flow in self.forest.flows]
+        for s1, s2 in values.items():
             if s1[0] == 'x':
-                self.forest.flows[int(float(s1[1:]))].arrival_curve[0].sigma = float(s2)
-        return self.forest
+                bursts[int(float(s1[1:]))] = s2
+        return self.forest.with_bursts(bursts)
 
     @property
     def all_delays(self) -> List[float]:
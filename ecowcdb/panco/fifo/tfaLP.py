@@ -1,5 +1,5 @@
 # Standard Library Imports
-import subprocess as sp
+import io
 from typing import List
 
 # Third-Party Library Imports
@@ -9,10 +9,11 @@ import numpy as np
 from ecowcdb.panco.descriptor.curves import TokenBucket
 from ecowcdb.panco.descriptor.flow import Flow
 from ecowcdb.panco.descriptor.network import Network
-from ecowcdb.panco.lpSolvePath import LPSOLVEPATH
+from ecowcdb.panco.lpModel import LPModel
+from ecowcdb.panco.lpSolver import LPSolveSolver
 
 # Local Imports - utility libraries
-from ecowcdb.util.errors import LPError, check_LP_error
+from ecowcdb.util.errors import LPError
 
 
 
@@ -25,11 +26,13 @@ class TfaLP:
     However, this takes into account only the first token-bucket of the arrival curves
     :param network: the network to analyse.
     :param filename: name of the file to write the linear program
+    :param solver: the solver of the linear program (lp_solve executable if None)
     """
-    def __init__(self, network: Network, temp_folder="", filename="tfa", verbose=False):
+    def __init__(self, network: Network, temp_folder="", filename="tfa", verbose=False, solver=None):
         self.network = network
+        self.solver = solver if solver is not None else LPSolveSolver(temp_folder)
         self.temp_folder = temp_folder
-        self.filepath = temp_folder + filename + ".lp"
+        self.filename = filename
         self.verbose = verbose
 
     def tfa_variables(self, file):
@@ -87,39 +90,102 @@ class TfaLP:
                     file.write('+ f{0}s{1}u{1}'.format(i, j))
                 file.write('<= {0} + {1}u{2};\n'.format(tb.sigma, tb.rho, j))
 
+    def add_tfa_variables(self, model: LPModel):
+        """
+        Adds the constraints of tfa_variables to a model
+        :param model: the model
+        :return: None
+        """
+        for i in range(self.network.num_flows):
+            for (l, j) in enumerate(self.network.path[i]):
+                if j == self.network.path[i][0]:
+                    model.fix('x{}s{}'.format(i, j), self.network.flows[i].arrival_curve[0].sigma)
+                else:
+                    model.add_constraint([('x{}s{}'.format(i, j), 1.),
+                                          ('x{}s{}'.format(i, self.network.path[i][l - 1]), -1.),
+                                          ('d{}'.format(self.network.path[i][l - 1]),
+                                           -self.network.flows[i].arrival_curve[0].rho)], '<=')
+
+    def add_tfa_constraints_server(self, model: LPModel):
+        """
+        Adds the constraints of tfa_constraints_server to a model. The constraints on a single variable are bounds.
+        :param model: the model
+        :return: None
+        """
+        for j in range(self.network.num_servers):
+            u = 'u{}'.format(j)
+            flows = ['f{0}s{1}u{1}'.format(i, j) for i in self.network.flows_in_server[j]]
+            for i in self.network.flows_in_server[j]:
+                model.add_constraint([('f{0}s{1}u{1}'.format(i, j), 1.), ('x{}s{}'.format(i, j), -1.),
+                                      (u, -self.network.flows[i].arrival_curve[0].rho)], '<=')
+            for h in self.network.predecessors[j]:
+                for tb in self.network.servers[h].max_service_curve:
+                    model.add_constraint([('f{0}s{1}u{1}'.format(i, j), 1.) for i in self.network.edges[(h, j)]] +
+                                         [(u, -tb.rho)], '<=', tb.sigma)
+            if len(flows) == 0:
+                model.fix('a{0}u{0}'.format(j), 0.)
+            else:
+                model.add_constraint([(f, 1.) for f in flows] + [('a{0}u{0}'.format(j), -1.)], '=')
+            for rl in self.network.servers[j].service_curve:
+                model.add_constraint([('b{0}t{0}'.format(j), 1.), ('t{}'.format(j), -rl.rate)], '>=',
+                                     -rl.rate * rl.latency)
+            model.set_bounds('b{0}t{0}'.format(j), lower=0.)
+            model.add_constraint([('b{0}t{0}'.format(j), 1.), ('a{0}u{0}'.format(j), -1.)], '=')
+            model.add_constraint([('d{}'.format(j), 1.), ('t{}'.format(j), -1.), (u, 1.)], '=')
+            model.set_bounds('d{}'.format(j), lower=0.)
+
+        for k in range(len(self.network.arrival_shaping)):
+            j = self.network.arrival_shaping[k][0]
+            max_service = self.network.arrival_shaping[k][2]
+            for i in self.network.arrival_shaping[k][1]:
+                if not j == self.network.path[i][0]:
+                    print('error in shaping constraints', j, self.network.path[i][0])
+                    return
+            for tb in max_service:
+                model.add_constraint([('f{0}s{1}u{1}'.format(i, j), 1.) for i in self.network.arrival_shaping[k][1]] +
+                                     [('u{}'.format(j), -tb.rho)], '<=', tb.sigma)
+
     @property
-    def delay_servers(self) -> np.ndarray:
+    def lp_model(self) -> str | LPModel:
         """
-        Computes the delay bounds of all the servers.
-        :return: the list of the delays of the servers
+        The linear program computing the delays of the servers, built as an LPModel if the solver solves them natively
+        :return: the linear program
         """
-        file = open(self.filepath, 'w')
+        if self.solver.native_models:
+            model = LPModel()
+            model.set_objective([('d{}'.format(i), 1.) for i in range(self.network.num_servers)])
+            self.add_tfa_constraints_server(model)
+            self.add_tfa_variables(model)
+            return model
+        file = io.StringIO()
         file.write('max:')
         for i in range(self.network.num_servers):
             file.write('+ d{} '.format(i))
         file.write(';\n')
         self.tfa_constraints_server(file)
         self.tfa_variables(file)
-        file.close()
-        
-        if self.verbose:
-            print('Solving:', self.filepath)
-        s = sp.run(LPSOLVEPATH + ["-S2", self.filepath], stdout=sp.PIPE, encoding='utf-8').stdout
+        return file.getvalue()
 
+    @property
+    def delay_servers(self) -> np.ndarray:
+        """
+        Computes the delay bounds of all the servers.
+        :return: the list of the delays of the servers
+        """
+        model = self.lp_model
+
+        if self.verbose:
+            print('Solving:', self.filename)
         # If there is an error while computing TFA, return infinite bound.
         try:
-            check_LP_error(s)
+            _, values = self.solver.solve(model, name=self.filename)
         except LPError as _:
             return self.network.num_servers * [np.inf]
-        
-        tab_values = s.split('\n')[4:-1]
-        values = [[token for token in line.split(' ') if not token == ""] for line in tab_values]
-        # if not values:
-        #     return self.network.num_servers * [np.inf]
+
         tab_delays = np.zeros(self.network.num_servers)
-        for [s1, s2] in values:
+        for s1, s2 in values.items():
             if s1[0] == 'd':
-                tab_delays[int(float(s1[1:]))] = float(s2)
+                tab_delays[int(float(s1[1:]))] = s2
         return tab_delays
 
     def delay(self, foi: int) -> float:
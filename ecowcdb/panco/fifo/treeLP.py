@@ -1,30 +1,31 @@
 # Standard Library Imports
-import subprocess as sp
+import io
+from typing import List, Tuple
 
 # Local Imports - panco libraries
+from ecowcdb.panco.descriptor.network import Network
 from ecowcdb.panco.fifo.elpConstraints import ELPConstraints
 from ecowcdb.panco.fifo.plpConstraints import PLPConstraints
 from ecowcdb.panco.fifo.sfaLP import SfaLP
 from ecowcdb.panco.fifo.tfaLP import TfaLP
-from ecowcdb.panco.lpSolvePath import LPSOLVEPATH
-
-# Local Imports - utility libraries
-from ecowcdb.util.errors import check_LP_error
+from ecowcdb.panco.lpModel import LPModel
+from ecowcdb.panco.lpSolver import LPSolveSolver
 
 
 
 class TreeLP:
     # Linear analysis for fifo tree networks
-    def __init__(self, network, foi, polynomial=True, sfa=False, tfa=False, timeout=600, temp_folder="", filename="tree", verbose=False):
+    def __init__(self, network, foi, polynomial=True, sfa=False, tfa=False, timeout=600, temp_folder="", filename="tree", verbose=False, solver=None):
         self.network = network
+        self.solver = solver if solver is not None else LPSolveSolver(temp_folder)
         self.foi = foi
         # self.constraints = LPConstraints(network, foi)
         if sfa:
-            delay_sfa = SfaLP(network, temp_folder=temp_folder, filename=filename+"_sfa", verbose=verbose).all_delays
+            delay_sfa = SfaLP(network, temp_folder=temp_folder, filename=filename+"_sfa", verbose=verbose, solver=self.solver).all_delays
         else:
             delay_sfa = None
         if tfa:
-            delay_tfa = TfaLP(network, temp_folder=temp_folder, filename=filename+"_tfa", verbose=verbose).delay_servers
+            delay_tfa = TfaLP(network, temp_folder=temp_folder, filename=filename+"_tfa", verbose=verbose, solver=self.solver).delay_servers
         else:
             delay_tfa = None
         if polynomial:
@@ -33,8 +34,8 @@ class TreeLP:
             self.constraints = ELPConstraints(network, foi)
         self.timeout = timeout
         self.temp_folder = temp_folder
-        self.filepath_delay = temp_folder + filename + "_delay.lp"
-        self.filepath_backlog = temp_folder + filename + "_backlog.lp"
+        self.filename_delay = filename + "_delay"
+        self.filename_backlog = filename + "_backlog"
         self.verbose = verbose
 
     def burst_constraints(self, file):
@@ -47,9 +48,40 @@ class TreeLP:
         else:
             file.write('flow do not stop at last server\n')
 
+    def add_burst_constraints(self, model: LPModel):
+        for i in range(self.network.num_flows):
+            model.fix('x{}'.format(i), self.network.flows[i].arrival_curve[0].sigma)
+
+    def set_delay_objective(self, model: LPModel):
+        if not self.network.path[self.foi][-1] == self.network.num_servers - 1:
+            raise Exception('flow do not stop at last server\n')
+        model.set_objective([('t0e0', 1.), ('t{}e0'.format(self.constraints.t_min[self.network.path[self.foi][0]]), -1.)])
+
+    def add_constraints(self, model: LPModel):
+        self.constraints.add_time_constraints(model)
+        self.constraints.add_arrival_constraints(model)
+        self.constraints.add_fifo_constraints(model)
+        self.constraints.add_service_constraints(model)
+        self.constraints.add_monotony_constraints(model)
+        self.constraints.add_shaping_constraints(model)
+        self.constraints.add_arrival_shaping_constraints(model, True)
+        self.constraints.add_sfa_delay_constraints(model)
+        self.constraints.add_tfa_delay_constraints(model)
+        self.add_burst_constraints(model)
+
     @property
-    def delay(self):
-        file = open(self.filepath_delay, 'w')
+    def delay_model(self) -> str | LPModel:
+        """
+        Writes the linear program of the delay bound of the flow of interest, or builds it as an LPModel if the solver
+        solves them natively
+        :return: the linear program
+        """
+        if self.solver.native_models:
+            model = LPModel()
+            self.set_delay_objective(model)
+            self.add_constraints(model)
+            return model
+        file = io.StringIO()
         self.delay_objective(file)
         self.constraints.time_constraints(file)
         self.constraints.arrival_constraints(file)
@@ -61,19 +93,21 @@ class TreeLP:
         self.constraints.sfa_delay_constraints(file)
         self.constraints.tfa_delay_constraints(file)
         self.burst_constraints(file)
-        file.close()
-
-        if self.verbose:
-            print('Solving:', self.filepath_delay)
-        s = sp.run(LPSOLVEPATH + ["-timeout", f"{self.timeout}", "-S1", self.filepath_delay], stdout=sp.PIPE, encoding='utf-8').stdout
-
-        check_LP_error(s)
-
-        return float(s.split()[-1])
+        return file.getvalue()
 
     @property
-    def backlog(self):
-        file = open(self.filepath_backlog, 'w')
+    def backlog_model(self) -> str | LPModel:
+        """
+        Writes the linear program of the backlog bound of the flow of interest, or builds it as an LPModel if the
+        solver solves them natively
+        :return: the linear program
+        """
+        if self.solver.native_models:
+            model = LPModel()
+            self.constraints.set_backlog_objective(model)
+            self.add_constraints(model)
+            return model
+        file = io.StringIO()
         self.constraints.backlog_objective(file)
         self.constraints.time_constraints(file)
         self.constraints.arrival_constraints(file)
@@ -85,12 +119,120 @@ class TreeLP:
         self.constraints.sfa_delay_constraints(file)
         self.constraints.tfa_delay_constraints(file)
         self.burst_constraints(file)
-        file.close()
+        return file.getvalue()
+
+    def solve_delay(self, model: str | LPModel) -> float:
+        """
+        Solves the linear program written by delay_model
+        :param model: the linear program
+        :return: the delay bound of the flow of interest
+        """
+        if self.verbose:
+            print('Solving:', self.filename_delay)
+        delay, _ = self.solver.solve(model, self.timeout, values=False, name=self.filename_delay)
+        return delay
 
+    def solve_backlog(self, model: str | LPModel) -> float:
+        """
+        Solves the linear program written by backlog_model
+        :param model: the linear program
+        :return: the backlog bound of the flow of interest
+        """
         if self.verbose:
-            print('Solving:', self.filepath_backlog)
-        s = sp.run(LPSOLVEPATH + ["-timeout", f"{self.timeout}", "-S1", self.filepath_backlog], stdout=sp.PIPE, encoding='utf-8').stdout
-        
-        check_LP_error(s)
+            print('Solving:', self.filename_backlog)
+        backlog, _ = self.solver.solve(model, self.timeout, values=False, name=self.filename_backlog)
+        return backlog
 
-        return float(s.split()[-1])
+    @property
+    def delay(self):
+        return self.solve_delay(self.delay_model)
+
+    @property
+    def backlog(self):
+        return self.solve_backlog(self.backlog_model)
+
+
+class TreeLPBatch:
+    """
+    Linear analysis of several fifo tree networks with a single linear program (polynomial method only). Each tree is
+    written as an independent block of variables (suffix e of PLPConstraints, and renamed burst variables), and the
+    objective is the sum of the values of the blocks. The blocks share no variable, so every block reaches its own
+    optimum, which is read from the variable z<block>. The SFA and TFA bounds are computed once per tree, which can be
+    shared by several blocks.
+    :param trees: the list of pairs (tree network, flow of interest) of the blocks
+    :param solver: the solver of the linear program (lp_solve executable if None)
+    """
+    def __init__(self, trees: List[Tuple[Network, int]], sfa=False, tfa=False, timeout=600, temp_folder="",
+                 filename="tree", verbose=False, solver=None):
+        self.trees = trees
+        self.solver = solver if solver is not None else LPSolveSolver(temp_folder)
+        self.constraints = []
+        bounds = {}
+        first_burst = 0
+        for block, (network, foi) in enumerate(trees):
+            if id(network) not in bounds:
+                if sfa:
+                    delay_sfa = SfaLP(network, temp_folder=temp_folder, filename=filename+"_sfa", verbose=verbose, solver=self.solver).all_delays
+                else:
+                    delay_sfa = None
+                if tfa:
+                    delay_tfa = TfaLP(network, temp_folder=temp_folder, filename=filename+"_tfa", verbose=verbose, solver=self.solver).delay_servers
+                else:
+                    delay_tfa = None
+                bounds[id(network)] = (delay_sfa, delay_tfa)
+            delay_sfa, delay_tfa = bounds[id(network)]
+            list_bursts = range(first_burst, first_burst + network.num_flows)
+            self.constraints += [PLPConstraints(network, foi, block, list_bursts, delay_sfa, delay_tfa, is_cyclic=False)]
+            first_burst += network.num_flows
+        self.timeout = timeout
+        self.temp_folder = temp_folder
+        self.filename_delay = filename + "_delay"
+        self.filename_backlog = filename + "_backlog"
+        self.verbose = verbose
+
+    def burst_constraints(self, file):
+        for constraints in self.constraints:
+            for i in range(constraints.network.num_flows):
+                file.write('x{0} = {1};\n'.format(constraints.list_flows[i],
+                                                  constraints.network.flows[i].arrival_curve[0].sigma))
+
+    def solve_blocks(self, block_constraints, filename) -> List[float]:
+        """
+        Writes the blocks and solves the linear program
+        :param block_constraints: the PLPConstraints method defining the value of a block
+        :param filename: the name of the linear program
+        :return: the value of each block
+        """
+        if len(self.constraints) == 0:
+            return []
+        file = io.StringIO()
+        file.write('max: ')
+        for block in range(len(self.constraints)):
+            file.write('+ z{} '.format(block))
+        file.write(';\n')
+        for block, constraints in enumerate(self.constraints):
+            file.write('\n/* block {} */\n'.format(block))
+            block_constraints(constraints, file, 'z{}'.format(block))
+            constraints.time_constraints(file)
+            constraints.arrival_constraints(file)
+            constraints.fifo_constraints(file)
+            constraints.service_constraints(file)
+            constraints.monotony_constraints(file)
+            constraints.shaping_constraints(file)
+            constraints.arrival_shaping_constraints(file, True)
+            constraints.sfa_delay_constraints(file)
+            constraints.tfa_delay_constraints(file)
+        self.burst_constraints(file)
+
+        if self.verbose:
+            print('Solving:', filename)
+        _, values = self.solver.solve(file.getvalue(), self.timeout, name=filename, precise_values=True)
+        return [values.get('z{}'.format(block), 0.0) for block in range(len(self.constraints))]
+
+    @property
+    def delays(self) -> List[float]:
+        return self.solve_blocks(PLPConstraints.delay_block_constraints, self.filename_delay)
+
+    @property
+    def backlogs(self) -> List[float]:
+        return self.solve_blocks(PLPConstraints.backlog_block_constraints, self.filename_backlog)
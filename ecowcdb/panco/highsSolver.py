@@ -0,0 +1,87 @@
+# Standard Library Imports
+from typing import Dict, Tuple
+
+# Third-Party Library Imports
+import numpy as np
+from scipy.optimize import linprog
+
+# Local Imports - panco libraries
+from ecowcdb.panco.lpModel import LPModel
+from ecowcdb.panco.lpSolver import LPSolver
+
+# Local Imports - utility libraries
+from ecowcdb.util.errors import LPError, LPErrorType
+
+
+
+def parse_lp(text: str):
+    """
+    Parses a linear program written in the (subset of the) lp_solve LP format used by panco: objective function,
+    linear constraints and single variable bounds. As in lp_solve, all the variables are non-negative unless a bound
+    says otherwise, and a relation on a single variable without a label is a bound and not a constraint.
+
+    :param text: the linear program
+    :return: the names of the variables, the objective coefficients, the objective constant, True if the objective
+    is maximized, the inequality constraints (matrix, right-hand side), the equality constraints (matrix, right-hand
+    side), the lower and upper bounds of the variables.
+
+
+    >>> names, c, c0, maximize, (a_ub, b_ub), (a_eq, b_eq), lb, ub = parse_lp('max: 2x + 3y; c1: x + y <= 4; x <= 3;')
+    >>> names, c.tolist(), maximize, a_ub.toarray().tolist(), b_ub.tolist(), ub.tolist()
+    (['x', 'y'], [2.0, 3.0], True, [[1.0, 1.0]], [4.0], [3.0, inf])
+    """
+    return LPModel.from_lp(text).matrices()
+
+
+class HighsSolver(LPSolver):
+    """
+    In-process solver: the linear program is converted into sparse matrices, and solved with the HiGHS solver of scipy
+    (scipy.optimize.linprog). This avoids starting a process per linear program, and no file is written. An LPModel
+    is converted directly, without writing and parsing the LP format.
+    """
+    native_models = True
+
+    def solve(self, model: str | LPModel, timeout=None, values=True, name="lp", precise_values=False
+              ) -> Tuple[float, Dict[str, float]]:
+        try:
+            if isinstance(model, LPModel):
+                names, c, c0, maximize, (a_ub, b_ub), (a_eq, b_eq), lb, ub = model.matrices()
+            else:
+                names, c, c0, maximize, (a_ub, b_ub), (a_eq, b_eq), lb, ub = parse_lp(model)
+        except ValueError:
+            raise LPError(LPErrorType.LPSolveFailure)
+        # the delays and bursts are small numbers (typically 1e-5 s), tighten the default tolerances (1e-7)
+        options = {'primal_feasibility_tolerance': 1e-9, 'dual_feasibility_tolerance': 1e-9}
+        if timeout is not None:
+            options['time_limit'] = float(timeout)
+        try:
+            res = linprog(-c if maximize else c,
+                          A_ub=a_ub if a_ub.shape[0] > 0 else None, b_ub=b_ub if a_ub.shape[0] > 0 else None,
+                          A_eq=a_eq if a_eq.shape[0] > 0 else None, b_eq=b_eq if a_eq.shape[0] > 0 else None,
+                          bounds=np.column_stack([lb, ub]) if len(names) > 0 else None, method='highs',
+                          options=options)
+        except ValueError:
+            raise LPError(LPErrorType.LPSolveFailure)
+        match res.status:
+            case 0:
+                pass
+            case 1:
+                if res.x is None:
+                    raise LPError(LPErrorType.TimeoutError)
+                raise LPError(LPErrorType.SuboptimalSolutionWarning)
+            case 2:
+                raise LPError(LPErrorType.InfeasibleProblemError)
+            case 3:
+                raise LPError(LPErrorType.UnboundedProblemError)
+            case 4:
+                raise LPError(LPErrorType.AccuracyError)
+            case _:
+                raise LPError(LPErrorType.UnhandledLPError)
+        objective = (-res.fun if maximize else res.fun) + c0
+        variables = dict(zip(names, res.x.tolist())) if values else {}
+        return objective, variables
+
+    def solve_file(self, filepath: str, timeout=None, values=True, precise_values=False
+                   ) -> Tuple[float, Dict[str, float]]:
+        with open(filepath, 'r') as file:
+            return self.solve(file.read(), timeout, values)
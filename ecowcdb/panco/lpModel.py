@@ -0,0 +1,389 @@
+# Standard Library Imports
+import io
+import re
+from typing import Dict, Iterable, List, Tuple
+
+# Third-Party Library Imports
+import numpy as np
+from scipy.sparse import coo_matrix
+
+
+
+_TOKENS = re.compile(r'\s*(?:(?P<num>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?|(?i:inf(?:inity)?)\b)'
+                     r'|(?P<var>[A-Za-z_][\w\[\]\.]*)'
+                     r'|(?P<rel><=|>=|=<|=>|<|>|=)|(?P<sign>[+-])|(?P<mul>\*))')
+_COMMENTS = re.compile(r'/\*.*?\*/|//[^\n]*', re.DOTALL)
+_LABEL = re.compile(r'\s*[A-Za-z_][\w\[\]\.]*\s*:')
+_INFINITY = 1e30
+
+
+def _linear_expression(text: str) -> Tuple[List[Tuple[Dict[str, float], float]], List[str]]:
+    """
+    Parses a sequence of linear terms and relational operators of the LP format.
+
+    :param text: the statement to parse (without label nor ';')
+    :return: the list of sides of the statement, as (dict of coefficients, constant) pairs, and the list of
+    relational operators between the sides
+    """
+    sides = []
+    relations = []
+    coefficients = {}
+    constant = 0.
+    sign = 1.
+    factor = None
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        m = _TOKENS.match(text, pos)
+        if m is None or m.end() == pos:
+            raise ValueError('syntax error near: {}'.format(text[pos:pos + 20]))
+        pos = m.end()
+        if m.group('num') is not None:
+            if factor is not None:
+                constant += sign * factor
+                sign = 1.
+            factor = float(m.group('num'))
+        elif m.group('var') is not None:
+            coefficients[m.group('var')] = coefficients.get(m.group('var'), 0.) + \
+                sign * (1. if factor is None else factor)
+            sign = 1.
+            factor = None
+        elif m.group('sign') is not None:
+            if factor is not None:
+                constant += sign * factor
+                sign = 1.
+                factor = None
+            if m.group('sign') == '-':
+                sign = -sign
+        elif m.group('rel') is not None:
+            if factor is not None:
+                constant += sign * factor
+            sides += [(coefficients, constant)]
+            relations += [m.group('rel')]
+            coefficients, constant, sign, factor = {}, 0., 1., None
+    if factor is not None:
+        constant += sign * factor
+    sides += [(coefficients, constant)]
+    return sides, relations
+
+
+def _number(value: float) -> str:
+    """
+    Formats a number for the LP and MPS files: the shortest representation that is read back as the same float.
+    """
+    return repr(float(value))
+
+
+class LPModel:
+    """
+    Backend-neutral linear program. The variables are identified by their names (fXsYtZeW, tKeW, xI... in the
+    linear programs of panco) and mapped to column indexes in the order of their first use. The constraints are stored
+    as a sparse matrix in coordinate format (rows, cols, values), with the sense ('<=', '>=' or '=') and the
+    right-hand side of each row. As in lp_solve, the variables are non-negative unless their bounds say otherwise.
+
+    The model can be inspected, solved directly by the solvers that support it (see LPSolver.native_models), or
+    written in the lp_solve LP format (to_lp) or in the free MPS format (to_mps) for the other solvers.
+
+    >>> model = LPModel()
+    >>> model.set_objective([('x', 2), ('y', 3)])
+    >>> _ = model.add_constraint([('x', 1), ('y', 1)], '<=', 4)
+    >>> model.set_bounds('x', upper=3)
+    >>> print(model.to_lp(), end='')
+    max: +2.0 x +3.0 y;
+    +1.0 x +1.0 y <= 4.0;
+    x <= 3.0;
+    """
+
+    def __init__(self):
+        self.names = []
+        self.index = {}
+        self.objective = {}
+        self.objective_constant = 0.
+        self.maximize = True
+        self.rows = []
+        self.cols = []
+        self.values = []
+        self.senses = []
+        self.rhs = []
+        self.lower = []
+        self.upper = []
+
+    @property
+    def num_variables(self) -> int:
+        return len(self.names)
+
+    @property
+    def num_constraints(self) -> int:
+        return len(self.rhs)
+
+    def variable(self, name: str) -> int:
+        """
+        Returns the column of a variable, which is created if it is not used yet
+
+        :param name: the name of the variable
+        :return: the column of the variable
+        """
+        col = self.index.get(name)
+        if col is None:
+            col = len(self.names)
+            self.index[name] = col
+            self.names.append(name)
+            self.lower.append(0.)
+            self.upper.append(np.inf)
+        return col
+
+    def set_objective(self, terms: Iterable[Tuple[str, float]], maximize=True, constant=0.):
+        """
+        Sets the objective function
+
+        :param terms: the pairs (variable, coefficient) of the objective function
+        :param maximize: True if the objective is maximized, False if it is minimized
+        :param constant: the constant term of the objective function
+        :return: None
+        """
+        self.objective = {}
+        for (name, value) in terms:
+            col = self.variable(name)
+            self.objective[col] = self.objective.get(col, 0.) + value
+        self.maximize = maximize
+        self.objective_constant = constant
+
+    def add_constraint(self, terms: Iterable[Tuple[str, float]], sense: str, rhs=0.) -> int:
+        """
+        Adds the constraint sum(coefficient * variable) sense rhs. The coefficients of a variable appearing several
+        times are summed.
+
+        :param terms: the pairs (variable, coefficient) of the left-hand side
+        :param sense: '<=', '>=' or '='
+        :param rhs: the right-hand side
+        :return: the row of the constraint
+        """
+        coefficients = {}
+        for (name, value) in terms:
+            col = self.variable(name)
+            coefficients[col] = coefficients.get(col, 0.) + value
+        row = len(self.rhs)
+        self.rows += len(coefficients) * [row]
+        self.cols += coefficients.keys()
+        self.values += coefficients.values()
+        self.senses.append(sense)
+        self.rhs.append(rhs)
+        return row
+
+    def set_bounds(self, name: str, lower=None, upper=None):
+        """
+        Sets the bounds of a variable (-np.inf and np.inf for no bound)
+
+        :param name: the name of the variable
+        :param lower: the lower bound, None to keep the current one
+        :param upper: the upper bound, None to keep the current one
+        :return: None
+        """
+        col = self.variable(name)
+        if lower is not None:
+            self.lower[col] = lower
+        if upper is not None:
+            self.upper[col] = upper
+
+    def fix(self, name: str, value: float):
+        """
+        Fixes the value of a variable
+
+        :param name: the name of the variable
+        :param value: the value
+        :return: None
+        """
+        self.set_bounds(name, value, value)
+
+    def matrices(self):
+        """
+        Returns the linear program as dense vectors and sparse matrices, in the form used by scipy.optimize.linprog:
+        the rows '>=' are negated into the inequality constraints.
+
+        :return: the names of the variables, the objective coefficients, the objective constant, True if the objective
+        is maximized, the inequality constraints (matrix, right-hand side), the equality constraints (matrix, right-hand
+        side), the lower and upper bounds of the variables.
+        """
+        n = len(self.names)
+        c = np.zeros(n)
+        for (col, value) in self.objective.items():
+            c[col] = value
+        # position of every row in the inequality or the equality constraints, and sign of its coefficients
+        is_eq = np.array([sense == '=' for sense in self.senses], dtype=bool)
+        signs = np.array([-1. if sense == '>=' else 1. for sense in self.senses])
+        position = np.zeros(len(self.senses), dtype=int)
+        position[is_eq] = np.arange(np.count_nonzero(is_eq))
+        position[~is_eq] = np.arange(np.count_nonzero(~is_eq))
+        rows = np.array(self.rows, dtype=int)
+        cols = np.array(self.cols, dtype=int)
+        values = np.array(self.values, dtype=float)
+        rhs = np.array(self.rhs, dtype=float)
+        eq_entries = is_eq[rows]
+        a_ub = coo_matrix((signs[rows[~eq_entries]] * values[~eq_entries],
+                           (position[rows[~eq_entries]], cols[~eq_entries])),
+                          shape=(np.count_nonzero(~is_eq), n)).tocsr()
+        a_eq = coo_matrix((values[eq_entries], (position[rows[eq_entries]], cols[eq_entries])),
+                          shape=(np.count_nonzero(is_eq), n)).tocsr()
+        return list(self.names), c, self.objective_constant, self.maximize, \
+            (a_ub, signs[~is_eq] * rhs[~is_eq]), (a_eq, rhs[is_eq]), np.array(self.lower), np.array(self.upper)
+
+    def row_terms(self) -> List[List[Tuple[int, float]]]:
+        """
+        Returns the (column, coefficient) pairs of every row, in the order they were added.
+        """
+        terms = [[] for _ in range(len(self.rhs))]
+        for (row, col, value) in zip(self.rows, self.cols, self.values):
+            terms[row].append((col, value))
+        return terms
+
+    def to_lp(self) -> str:
+        """
+        Writes the linear program in the lp_solve LP format. The rows with fewer than two variables are labelled, as
+        lp_solve would read them as bounds otherwise.
+
+        :return: the linear program
+        """
+        file = io.StringIO()
+        file.write('max:' if self.maximize else 'min:')
+        for (col, value) in self.objective.items():
+            file.write(' {:+} {}'.format(float(value), self.names[col]))
+        if not self.objective_constant == 0:
+            file.write(' {:+}'.format(float(self.objective_constant)))
+        file.write(';\n')
+        for (row, terms) in enumerate(self.row_terms()):
+            if len(terms) < 2:
+                file.write('R{}: '.format(row + 1))
+            file.write(' '.join(['{:+} {}'.format(float(value), self.names[col]) for (col, value) in terms])
+                       if len(terms) > 0 else '0')
+            file.write(' {} {};\n'.format(self.senses[row], _number(self.rhs[row])))
+        for (col, name) in enumerate(self.names):
+            lower, upper = self.lower[col], self.upper[col]
+            if lower == upper:
+                file.write('{} = {};\n'.format(name, _number(lower)))
+                continue
+            if lower == -np.inf:
+                file.write('{} >= -1e30;\n'.format(name))
+            elif not lower == 0:
+                file.write('{} >= {};\n'.format(name, _number(lower)))
+            if not upper == np.inf:
+                file.write('{} <= {};\n'.format(name, _number(upper)))
+        return file.getvalue()
+
+    def to_mps(self, name="lp") -> str:
+        """
+        Writes the linear program in the free MPS format. The objective is the row R0 and the constraints are the rows
+        R1, R2... The constant of the objective is written as the opposite of the right-hand side of R0.
+
+        :param name: the name of the linear program
+        :return: the linear program
+        """
+        file = io.StringIO()
+        file.write('NAME {}\n'.format(name))
+        if self.maximize:
+            file.write('OBJSENSE\n    MAX\n')
+        file.write('ROWS\n N  R0\n')
+        kinds = {'<=': 'L', '>=': 'G', '=': 'E'}
+        file.write(''.join([' {}  R{}\n'.format(kinds[sense], row + 1) for (row, sense) in enumerate(self.senses)]))
+        file.write('COLUMNS\n')
+        entries = [[] for _ in range(len(self.names))]
+        for (col, value) in self.objective.items():
+            entries[col].append((0, value))
+        for (row, col, value) in zip(self.rows, self.cols, self.values):
+            entries[col].append((row + 1, value))
+        for (col, column) in enumerate(entries):
+            if len(column) == 0:
+                # the variable must be declared, even if it only has bounds
+                column = [(0, 0.)]
+            file.write(''.join([' {} R{} {}\n'.format(self.names[col], row, _number(value))
+                                for (row, value) in column]))
+        file.write('RHS\n')
+        if not self.objective_constant == 0:
+            file.write(' RHS R0 {}\n'.format(_number(-self.objective_constant)))
+        file.write(''.join([' RHS R{} {}\n'.format(row + 1, _number(value))
+                            for (row, value) in enumerate(self.rhs) if not value == 0]))
+        file.write('BOUNDS\n')
+        for (col, name) in enumerate(self.names):
+            lower, upper = self.lower[col], self.upper[col]
+            if lower == upper:
+                file.write(' FX BND {} {}\n'.format(name, _number(lower)))
+                continue
+            if lower == -np.inf:
+                file.write(' MI BND {}\n'.format(name))
+            elif not lower == 0 or upper < 0:
+                # a negative upper bound alone would make the lower bound -inf for some readers
+                file.write(' LO BND {} {}\n'.format(name, _number(lower)))
+            if not upper == np.inf:
+                file.write(' UP BND {} {}\n'.format(name, _number(upper)))
+        file.write('ENDATA\n')
+        return file.getvalue()
+
+    @classmethod
+    def from_lp(cls, text: str) -> 'LPModel':
+        """
+        Reads a linear program written in the (subset of the) lp_solve LP format used by panco: objective function,
+        linear constraints and single variable bounds. As in lp_solve, a relation on a single variable without a label
+        is a bound and not a constraint.
+
+        :param text: the linear program
+        :return: the model
+        """
+        model = cls()
+        statements = _COMMENTS.sub(' ', text).split(';')
+        first = True
+        for statement in statements:
+            if statement.strip() == '':
+                continue
+            if first:
+                first = False
+                head = statement.lstrip()
+                maximize = False
+                for (prefix, sense) in [('max:', True), ('maximize:', True), ('maximise:', True),
+                                        ('min:', False), ('minimize:', False), ('minimise:', False)]:
+                    if head.lower().startswith(prefix):
+                        maximize = sense
+                        statement = head[len(prefix):]
+                        break
+                sides, relations = _linear_expression(statement)
+                if relations:
+                    raise ValueError('relational operator in the objective function')
+                objective, objective_constant = sides[0]
+                model.set_objective(objective.items(), maximize, objective_constant)
+                continue
+            label = _LABEL.match(statement)
+            if label is not None:
+                statement = statement[label.end():]
+            sides, relations = _linear_expression(statement)
+            if len(relations) != 1:
+                raise ValueError('unsupported statement: {}'.format(statement.strip()))
+            (lhs, lhs_constant), (rhs, rhs_constant) = sides
+            relation = relations[0]
+            coefficients = dict(lhs)
+            for (name, value) in rhs.items():
+                coefficients[name] = coefficients.get(name, 0.) - value
+            constant = rhs_constant - lhs_constant
+            if relation in ('<', '=<'):
+                relation = '<='
+            elif relation in ('>', '=>'):
+                relation = '>='
+            if label is None and len(lhs) + len(rhs) == 1:
+                # single variable: bound of the variable
+                [(name, value)] = coefficients.items()
+                model.variable(name)
+                if value == 0:
+                    continue
+                bound = constant / value
+                if bound >= _INFINITY:
+                    bound = np.inf
+                elif bound <= -_INFINITY:
+                    bound = -np.inf
+                if value < 0 and not relation == '=':
+                    relation = '<=' if relation == '>=' else '>='
+                if relation == '=':
+                    model.fix(name, bound)
+                elif relation == '<=':
+                    model.set_bounds(name, upper=bound)
+                else:
+                    model.set_bounds(name, lower=bound)
+                continue
+            model.add_constraint(coefficients.items(), relation, constant)
+        return model
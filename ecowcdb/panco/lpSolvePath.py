@@ -4,3 +4,7 @@ import os.path
 
 
 LPSOLVEPATH = [os.path.join(os.path.dirname(__file__), 'lp_solve')]
+
+# Path of the lp_solve library (liblpsolve55) used by the resident workers of LPSolvePoolSolver. None means that the
+# library is searched in the standard locations, and the workers run the lp_solve executable if it is not found.
+LPSOLVELIBPATH = None
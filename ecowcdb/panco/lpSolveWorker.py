@@ -0,0 +1,141 @@
+"""
+Resident lp_solve worker. The worker is started by LPSolvePoolSolver (python -m ecowcdb.panco.lpSolveWorker) and
+solves the linear programs it receives until its standard input is closed. The only argument is the folder of the
+temporary .lp files read by the lp_solve library.
+
+Protocol: one JSON message per line on the standard input, one JSON answer per line on the standard output.
+    {"op": "ping"} -> {"status": "pong", "backend": "library" or "executable"}
+    {"op": "solve", "model": ..., "timeout": ..., "values": ..., "name": ..., "precise_values": ...}
+        -> {"status": "ok", "objective": ..., "variables": {...}}
+        -> {"status": "error", "error": <name of the LPErrorType>}
+"""
+
+# Standard Library Imports
+import ctypes
+import ctypes.util
+import json
+import os
+import sys
+from typing import Dict, Tuple
+
+# Local Imports - panco libraries
+from ecowcdb.panco.lpSolvePath import LPSOLVELIBPATH
+from ecowcdb.panco.lpSolver import LPSolver, LPSolveSolver
+
+# Local Imports - utility libraries
+from ecowcdb.util.errors import LPError, LPErrorType
+
+
+# return codes of solve() in lp_lib.h
+_OPTIMAL = 0
+_SUBOPTIMAL = 1
+_INFEASIBLE = 2
+_UNBOUNDED = 3
+_NUMFAILURE = 5
+_TIMEOUT = 7
+_PRESOLVED = 9
+_ACCURACYERROR = 25
+_ERRORS = {_SUBOPTIMAL: LPErrorType.SuboptimalSolutionWarning,
+           _INFEASIBLE: LPErrorType.InfeasibleProblemError,
+           _UNBOUNDED: LPErrorType.UnboundedProblemError,
+           _NUMFAILURE: LPErrorType.LPSolveFailure,
+           _TIMEOUT: LPErrorType.TimeoutError,
+           _ACCURACYERROR: LPErrorType.AccuracyError}
+# verbosity level CRITICAL of lp_lib.h: only critical messages are printed
+_CRITICAL = 1
+
+
+class LPSolveLibrary(LPSolver):
+    """
+    Binding of the lp_solve 5.5 library (liblpsolve55) with ctypes. Solving a linear program with the library does
+    not start any process.
+    """
+
+    def __init__(self, path: str, temp_folder=""):
+        super().__init__(temp_folder)
+        lib = ctypes.CDLL(path)
+        lib.read_LP.restype = ctypes.c_void_p
+        lib.read_LP.argtypes = [ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p]
+        lib.set_timeout.restype = None
+        lib.set_timeout.argtypes = [ctypes.c_void_p, ctypes.c_long]
+        lib.solve.restype = ctypes.c_int
+        lib.solve.argtypes = [ctypes.c_void_p]
+        lib.get_objective.restype = ctypes.c_double
+        lib.get_objective.argtypes = [ctypes.c_void_p]
+        lib.get_Ncolumns.restype = ctypes.c_int
+        lib.get_Ncolumns.argtypes = [ctypes.c_void_p]
+        lib.get_col_name.restype = ctypes.c_char_p
+        lib.get_col_name.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        lib.get_variables.restype = ctypes.c_ubyte
+        lib.get_variables.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_double)]
+        lib.delete_lp.restype = None
+        lib.delete_lp.argtypes = [ctypes.c_void_p]
+        self.lib = lib
+
+    def solve_file(self, filepath: str, timeout=None, values=True, precise_values=False
+                   ) -> Tuple[float, Dict[str, float]]:
+        lp = self.lib.read_LP(filepath.encode(), _CRITICAL, b"")
+        if not lp:
+            raise LPError(LPErrorType.LPSolveFailure)
+        try:
+            if timeout is not None:
+                self.lib.set_timeout(lp, int(timeout))
+            status = self.lib.solve(lp)
+            if status not in (_OPTIMAL, _PRESOLVED):
+                raise LPError(_ERRORS.get(status, LPErrorType.UnhandledLPError))
+            objective = self.lib.get_objective(lp)
+            variables = {}
+            if values:
+                n = self.lib.get_Ncolumns(lp)
+                array = (ctypes.c_double * n)()
+                self.lib.get_variables(lp, array)
+                variables = {self.lib.get_col_name(lp, j + 1).decode(): array[j] for j in range(n)}
+            return objective, variables
+        finally:
+            self.lib.delete_lp(lp)
+
+
+def load_library(temp_folder=""):
+    """
+    Loads the lp_solve library if it can be found
+
+    :param temp_folder: the folder of the temporary .lp files
+
+    :return: the LPSolveLibrary, or None if the library is not available
+    """
+    path = LPSOLVELIBPATH if LPSOLVELIBPATH is not None else ctypes.util.find_library('lpsolve55')
+    if path is None:
+        return None
+    try:
+        return LPSolveLibrary(path, temp_folder)
+    except (OSError, AttributeError):
+        return None
+
+
+def main():
+    # the answers are written on a copy of the standard output, and the standard output itself is redirected to
+    # /dev/null, so that the messages printed by lp_solve cannot corrupt the protocol
+    answers = os.fdopen(os.dup(sys.stdout.fileno()), 'w', encoding='utf-8')
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
+    os.close(devnull)
+    temp_folder = sys.argv[1] if len(sys.argv) > 1 else ""
+    library = load_library(temp_folder)
+    solver = library if library is not None else LPSolveSolver(temp_folder)
+    for line in sys.stdin:
+        request = json.loads(line)
+        if request['op'] == 'ping':
+            answer = {'status': 'pong', 'backend': 'executable' if library is None else 'library'}
+        else:
+            try:
+                objective, variables = solver.solve(request['model'], request['timeout'], request['values'],
+                                                   request['name'], request['precise_values'])
+                answer = {'status': 'ok', 'objective': objective, 'variables': variables}
+            except LPError as lperror:
+                answer = {'status': 'error', 'error': lperror.error_type().name}
+        answers.write(json.dumps(answer) + '\n')
+        answers.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+# Standard Library Imports
+import json
+import os
+import queue
+import select
+import subprocess as sp
+import sys
+import tempfile
+import threading
+import weakref
+from typing import Dict, Tuple
+
+# Local Imports - panco libraries
+from ecowcdb.panco.lpModel import LPModel
+from ecowcdb.panco.lpSolvePath import LPSOLVEPATH
+
+# Local Imports - utility libraries
+from ecowcdb.util.errors import LPError, LPErrorType, check_LP_error
+
+
+
+def lp_text(model: str | LPModel) -> str:
+    """
+    Returns the linear program in the lp_solve LP format
+
+    :param model: the linear program, in the LP format or as an LPModel
+    :return: the linear program in the LP format
+    """
+    return model.to_lp() if isinstance(model, LPModel) else model
+
+
+class LPSolver:
+    """
+    Interface of the linear program solvers. A solver receives a linear program written in the lp_solve LP format or
+    an LPModel, and returns the optimal value of the objective function and the values of the variables. Every failure
+    is reported by raising an LPError with the corresponding LPErrorType.
+    Solvers that can only read files implement solve_file: the linear program is then written in a temporary file
+    with a unique name in temp_folder, which is removed after the solve.
+    Solvers with native_models set solve an LPModel without writing it, so the linear programs are built as LPModels
+    for them (see TreeLP). The other solvers receive the LP format, and an LPModel is written with LPModel.to_lp.
+    """
+    native_models = False
+
+    def __init__(self, temp_folder=""):
+        """
+        :param temp_folder: the folder of the temporary .lp files ("" for the current directory)
+        """
+        self.temp_folder = temp_folder
+
+    def solve(self, model: str | LPModel, timeout=None, values=True, name="lp", precise_values=False
+              ) -> Tuple[float, Dict[str, float]]:
+        """
+        Solves the linear program
+
+        :param model: the linear program, in the LP format or as an LPModel
+        :param timeout: maximum solving time in seconds, None for no limit
+        :param values: True if the values of the variables are needed, False if only the objective is needed
+        :param name: the name of the linear program, used as prefix of the temporary file if one is needed
+        :param precise_values: True if the values of the variables are needed with full precision (the lp_solve
+        executable prints them with 6 significant digits otherwise)
+        :return: the optimal value of the objective function and the dictionary of the values of the variables (empty
+        if values is False)
+        """
+        fd, filepath = tempfile.mkstemp(suffix=".lp", prefix=name + "_", dir=self.temp_folder)
+        try:
+            with os.fdopen(fd, 'w') as file:
+                file.write(lp_text(model))
+            return self.solve_file(filepath, timeout, values, precise_values)
+        finally:
+            os.remove(filepath)
+
+    def solve_file(self, filepath: str, timeout=None, values=True, precise_values=False
+                   ) -> Tuple[float, Dict[str, float]]:
+        """
+        Solves the linear program written in filepath
+
+        :param filepath: the path of the .lp file to solve
+        :param timeout: maximum solving time in seconds, None for no limit
+        :param values: True if the values of the variables are needed, False if only the objective is needed
+        :param precise_values: True if the values of the variables are needed with full precision
+        :return: the optimal value of the objective function and the dictionary of the values of the variables
+        """
+        raise NotImplementedError
+
+
+class LPSolveSolver(LPSolver):
+    """
+    Solver running the bundled lp_solve executable, one process per linear program. The linear program is streamed to
+    the standard input of lp_solve, or written in a temporary file if stream is False.
+    """
+
+    def __init__(self, temp_folder="", stream=True):
+        super().__init__(temp_folder)
+        self.stream = stream
+
+    def _run(self, timeout, values, precise_values, filepath=None, model=None) -> Tuple[float, Dict[str, float]]:
+        args = list(LPSOLVEPATH)
+        if timeout is not None:
+            args += ["-timeout", f"{timeout}"]
+        args += ["-S2" if values else "-S1"]
+        if values and precise_values:
+            args += ["-ip"]
+        if filepath is not None:
+            args += [filepath]
+        s = sp.run(args, input=model, stdout=sp.PIPE, encoding='utf-8').stdout
+        return parse_lp_solve_output(s, values)
+
+    def solve(self, model: str | LPModel, timeout=None, values=True, name="lp", precise_values=False
+              ) -> Tuple[float, Dict[str, float]]:
+        if not self.stream:
+            return super().solve(model, timeout, values, name, precise_values)
+        return self._run(timeout, values, precise_values, model=lp_text(model))
+
+    def solve_file(self, filepath: str, timeout=None, values=True, precise_values=False
+                   ) -> Tuple[float, Dict[str, float]]:
+        return self._run(timeout, values, precise_values, filepath=filepath)
+
+
+class _LPSolveWorker:
+    """
+    Handle of a resident worker process (see lpSolveWorker.py).
+    """
+    # time given to a worker to start and to answer a health check, and additional time given to a solve on top of
+    # the lp_solve timeout before the worker is considered hung
+    START_TIMEOUT = 30
+    GRACE = 10
+
+    def __init__(self, temp_folder=""):
+        self.temp_folder = temp_folder
+        self.process = None
+        self.backend = None
+        self.start()
+
+    def start(self):
+        """
+        Starts the worker process and checks that it answers
+        """
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join([root] + ([env['PYTHONPATH']] if env.get('PYTHONPATH') else []))
+        self.process = sp.Popen([sys.executable, "-m", "ecowcdb.panco.lpSolveWorker", self.temp_folder], stdin=sp.PIPE,
+                                stdout=sp.PIPE, encoding='utf-8', env=env)
+        if not self.healthy():
+            self.stop()
+            raise OSError("lp_solve worker did not start")
+
+    def stop(self):
+        """
+        Stops the worker process: closing its standard input ends its loop, it is killed if it does not end
+        """
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=1)
+        except (OSError, sp.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+        self.process.stdout.close()
+        self.process = None
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def healthy(self) -> bool:
+        """
+        Health check of the worker: the process is running and answers a ping
+
+        :return: True if the worker is healthy
+        """
+        try:
+            answer = self.request({'op': 'ping'}, self.START_TIMEOUT)
+        except (OSError, EOFError, ValueError, TimeoutError):
+            return False
+        self.backend = answer.get('backend')
+        return answer.get('status') == 'pong'
+
+    def request(self, message: dict, timeout=None) -> dict:
+        """
+        Sends a message to the worker and waits for its answer
+
+        :param message: the message
+        :param timeout: maximum waiting time in seconds, None for no limit
+        :return: the answer of the worker
+        """
+        if not self.alive():
+            raise EOFError("lp_solve worker is not running")
+        self.process.stdin.write(json.dumps(message) + '\n')
+        self.process.stdin.flush()
+        if timeout is not None:
+            ready, _, _ = select.select([self.process.stdout], [], [], timeout)
+            if not ready:
+                raise TimeoutError("lp_solve worker did not answer")
+        line = self.process.stdout.readline()
+        if line == '':
+            raise EOFError("lp_solve worker stopped")
+        return json.loads(line)
+
+
+def _stop_workers(workers):
+    for worker in workers:
+        worker.stop()
+
+
+class LPSolvePoolSolver(LPSolver):
+    """
+    Solver sending the linear programs to a pool of resident lp_solve workers (lpSolveWorker.py) instead of starting
+    an lp_solve process per linear program. The workers solve with the lp_solve library when it is available (see
+    LPSOLVELIBPATH), and run the lp_solve executable otherwise. Workers are started when needed, at most size of them,
+    their health is checked before use and they are restarted after a crash or a hang.
+    """
+
+    def __init__(self, temp_folder="", size=None):
+        """
+        :param temp_folder: the folder of the temporary .lp files of the workers using the lp_solve library
+        :param size: maximum number of workers, default is the number of CPUs
+        """
+        super().__init__(temp_folder)
+        self.size = size if size is not None else (os.cpu_count() or 1)
+        self._workers = []
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        weakref.finalize(self, _stop_workers, self._workers)
+
+    def _acquire(self) -> _LPSolveWorker:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if len(self._workers) < self.size:
+                worker = _LPSolveWorker(self.temp_folder)
+                self._workers.append(worker)
+                return worker
+        return self._idle.get()
+
+    def solve(self, model: str | LPModel, timeout=None, values=True, name="lp", precise_values=False
+              ) -> Tuple[float, Dict[str, float]]:
+        message = {'op': 'solve', 'model': lp_text(model), 'timeout': timeout, 'values': values, 'name': name,
+                   'precise_values': precise_values}
+        try:
+            worker = self._acquire()
+        except (OSError, EOFError, ValueError):
+            raise LPError(LPErrorType.LPSolveFailure)
+        try:
+            # one retry on a fresh worker if the worker crashed
+            for _ in range(2):
+                try:
+                    if not worker.alive():
+                        worker.restart()
+                    answer = worker.request(message, None if timeout is None else timeout + worker.GRACE)
+                    break
+                except TimeoutError:
+                    worker.stop()
+                    raise LPError(LPErrorType.TimeoutError)
+                except (OSError, EOFError, ValueError):
+                    worker.stop()
+            else:
+                raise LPError(LPErrorType.LPSolveFailure)
+        finally:
+            self._idle.put(worker)
+        if answer['status'] == 'error':
+            raise LPError(LPErrorType[answer['error']])
+        return answer['objective'], answer['variables']
+
+
+def parse_lp_solve_output(s: str, values=True) -> Tuple[float, Dict[str, float]]:
+    """
+    Parses the standard output of lp_solve (options -S1 or -S2)
+
+    :param s: the output of lp_solve
+    :param values: True if the values of the variables were printed (-S2)
+    :return: the optimal value of the objective function and the dictionary of the values of the variables
+
+
+    >>> parse_lp_solve_output('\\nValue of objective function: 3.50000000\\n\\nActual values of the variables:\\n'
+    ...                       'x                               3\\ny                             0.5\\n')
+    (3.5, {'x': 3.0, 'y': 0.5})
+    """
+    check_LP_error(s)
+    lines = s.split('\n')
+    objective = float(lines[1].split()[-1])
+    variables = {}
+    if values:
+        for line in lines[4:-1]:
+            tokens = line.split()
+            if len(tokens) == 2:
+                variables[tokens[0]] = float(tokens[1])
+    return objective, variables
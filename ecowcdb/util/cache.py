@@ -0,0 +1,149 @@
+"""
+ File containing the network-scoped caches. Used to avoid recomputing values that only depend on the analyzed network
+ and not on the forest being analyzed.
+"""
+
+# Standard Library Imports
+from collections import OrderedDict
+from threading import RLock
+from typing import Any, Dict, FrozenSet, List, Tuple
+
+# Local Imports - panco libraries
+from ecowcdb.panco.descriptor.network import Network
+from ecowcdb.panco.fifo.sfaLP import SfaLP
+from ecowcdb.panco.fifo.tfaLP import TfaLP
+from ecowcdb.panco.lpSolver import LPSolver, LPSolveSolver
+
+# Local Imports - utility libraries
+from ecowcdb.util.network import scale_network
+
+
+
+class BoundCache:
+    """
+     Cache of the SFA and TFA bounds of the uncut network. These bounds are used by every FifoLP constructed for the
+     network but they do not depend on the forest. Therefore they are computed once per scaling factor and shared by
+     every delay computation on the same network. The decompositions of the network by the most recently analyzed
+     forests are cached as well. The cache can be used from several threads.
+
+     Attributes:
+         __net (Network, private): The network for which the bounds are cached.
+         __temp_folder (str, private): Folderpath in which the .lp files will be stored in.
+         __filename (str, private): Name prefix of the .lp files.
+         __verbose (bool, private): Prints the names of lp files as they are being solved.
+         __solver (LPSolver, private): Solver of the SFA and TFA linear programs.
+         __networks (Dict[float, Network], private): Scaled networks indexed by their scaling factor.
+         __bounds (Dict[float, Tuple[List[float], List[float]]], private): SFA flow delays and TFA server delays of
+         the scaled networks indexed by their scaling factor.
+         __decompositions (OrderedDict[Tuple[float, FrozenSet[Tuple[int, int]]], Tuple[Network, List[int], Any]],
+         private): Decompositions of the scaled networks indexed by their scaling factor and kept edges, from the least
+         to the most recently used.
+         __max_decompositions (int, private): Maximum number of cached decompositions.
+         __lock (RLock, private): Lock ensuring that each value is computed once when the cache is used from several
+         threads.
+
+     Methods:
+         network (public): Returns the network scaled by the given factor.
+         bounds (public): Returns the SFA flow delays and TFA server delays of the network scaled by the given factor.
+         decomposition (public): Returns the decomposition of the network scaled by the given factor by a forest.
+    """
+    __net: Network
+    __temp_folder: str
+    __filename: str
+    __verbose: bool
+    __solver: LPSolver
+    __networks: Dict[float, Network]
+    __bounds: Dict[float, Tuple[List[float], List[float]]]
+    __decompositions: OrderedDict[Tuple[float, FrozenSet[Tuple[int, int]]], Tuple[Network, List[int], Any]]
+    __max_decompositions: int
+    __lock: RLock
+
+    def __init__(self, net: Network, temp_folder: str = '', filename: str = 'fifo', verbose: bool = False,
+                 solver: LPSolver | None = None, max_decompositions: int = 256) -> None:
+        """
+         Initialize the cache. This is the constructor for the class. Nothing is computed until it is requested.
+
+         Args:
+             net (Network, required): The network for which the bounds are cached. This network cannot be modified
+             after BoundCache object creation.
+             temp_folder (str, optional): Folder to store temporary .lp files. Default is '' which means that temp
+             files will be stored in the directory from where the intial call was made.
+             filename (str, optional): Name prefix of the .lp files. Default is 'fifo' which matches the FifoLP
+             default.
+             verbose (bool, optional): Prints the names of lp files as they are being solved. Default is False.
+             solver (LPSolver | None, optional): Solver of the SFA and TFA linear programs. Default is None which
+             means that the lp_solve executable is used.
+             max_decompositions (int, optional): Maximum number of cached decompositions. Default is 256.
+        """
+        self.__net = net
+        self.__temp_folder = temp_folder
+        self.__filename = filename
+        self.__verbose = verbose
+        self.__solver = solver if solver is not None else LPSolveSolver()
+        self.__networks = {}
+        self.__bounds = {}
+        self.__decompositions = OrderedDict()
+        self.__max_decompositions = max_decompositions
+        self.__lock = RLock()
+
+    def network(self, scale_factor: float) -> Network:
+        """
+         Returns the network scaled by the given factor. The scaled network is only built once per factor.
+
+         Args:
+             scale_factor (float, required): The factor by which the network is scaled.
+
+         Returns:
+             Network: The scaled network.
+        """
+        with self.__lock:
+            if scale_factor not in self.__networks:
+                self.__networks[scale_factor] = scale_network(self.__net, scale_factor)
+            return self.__networks[scale_factor]
+
+    def bounds(self, scale_factor: float) -> Tuple[List[float], List[float]]:
+        """
+         Returns the SFA flow delays and TFA server delays of the network scaled by the given factor. The bounds are
+         only computed once per factor.
+
+         Args:
+             scale_factor (float, required): The factor by which the network is scaled.
+
+         Returns:
+             Tuple[List[float], List[float]]: The SFA delays of the flows and the TFA delays of the servers.
+        """
+        with self.__lock:
+            if scale_factor not in self.__bounds:
+                net = self.network(scale_factor)
+                sfa_delays = SfaLP(net, temp_folder=self.__temp_folder, filename=self.__filename+'_sfa',
+                                   verbose=self.__verbose, solver=self.__solver).all_delays
+                tfa_delays = TfaLP(net, temp_folder=self.__temp_folder, filename=self.__filename+'_tfa',
+                                   verbose=self.__verbose, solver=self.__solver).delay_servers
+                self.__bounds[scale_factor] = (sfa_delays, tfa_delays)
+            return self.__bounds[scale_factor]
+
+    def decomposition(self, scale_factor: float, forest: List[Tuple[int, int]]) -> Tuple[Network, List[int], Any]:
+        """
+         Returns the decomposition of the network scaled by the given factor, where only the edges of the forest are
+         kept (see Network.decomposition). The decomposition only depends on the set of kept edges, so a forest that is
+         analyzed again (for another flow of interest, or after its validation) is only decomposed once. Only the
+         most recently used decompositions are kept.
+
+         Args:
+             scale_factor (float, required): The factor by which the network is scaled.
+             forest (List[Tuple[int, int]], required): List of edges representing the forest.
+
+         Returns:
+             Tuple[Network, List[int], Any]: The decomposed network, the index of the first piece of every flow, and
+             the removed edges.
+        """
+        key = (scale_factor, frozenset(forest))
+        with self.__lock:
+            if key in self.__decompositions:
+                self.__decompositions.move_to_end(key)
+                return self.__decompositions[key]
+            decomposition = self.network(scale_factor).decomposition(forest)
+            self.__decompositions[key] = decomposition
+            if len(self.__decompositions) > self.__max_decompositions:
+                self.__decompositions.popitem(last=False)
+            return decomposition
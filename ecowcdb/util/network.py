@@ -3,25 +3,132 @@
 """
 
 # Standard Library Imports
+from heapq import heapify, heappop, heappush
 from itertools import combinations
-from math import comb
-from random import randint, sample, seed
-from typing import List, Tuple
+from math import exp, log
+from random import Random
+from typing import Callable, Iterator, List, Tuple
 
 # Third-Party Library Imports
 from tqdm import tqdm
 
 # Local Imports - ecowcdb libraries
-from ecowcdb.options import ForestGeneration
+from ecowcdb.options import ForestGeneration, ForestSampling
 
 # Local Imports - panco libraries
 from ecowcdb.panco.descriptor.curves import RateLatency, TokenBucket
 from ecowcdb.panco.descriptor.flow import Flow
-from ecowcdb.panco.descriptor.network import Network, dfs
+from ecowcdb.panco.descriptor.network import Network, topological_sort
 from ecowcdb.panco.descriptor.server import Server
 
 
 
+def iterate_forests(net: Network, min_edges: int = 0) -> Iterator[List[Tuple[int, int]]]:
+    """
+     Generator of all valid forests for the given network. The forests are built directly instead of filtering all the
+     subsets of edges: edges are added in increasing index order, and an edge is only added if its source server has
+     no kept successor yet and if it does not close a cycle. Since every subset of a forest is a forest, the invalid
+     subsets are pruned with all their supersets. The forests are generated by increasing number of edges, and in
+     lexicographic order of the edge indexes for a given number of edges (the order of itertools.combinations).
+     
+     Args:
+     	 net (Network, required): Network to generate forests for.
+     	 min_edges (int, optional): Minimum number of edges that should be included in the forest. Default is 0.
+     
+     Yields: 
+     	 List[Tuple[int, int]]: Forest, as a list of edge tuples sorted by source server.
+    """
+    edges = list(net.edges.keys())
+    successor = net.num_servers * [-1]
+    forest = []
+
+    # Inner function extending the current forest with edges of index at least start, until it has size edges.
+    def extend(start: int, size: int) -> Iterator[List[Tuple[int, int]]]:
+        if len(forest) == size:
+            yield sorted(forest, key=lambda x: x[0])
+            return
+        for j in range(start, len(edges) - (size - len(forest)) + 1):
+            u, v = edges[j]
+            if successor[u] != -1:
+                continue
+            # Follow the successors from v, the edge closes a cycle if u is reached.
+            w = v
+            while w != -1 and w != u:
+                w = successor[w]
+            if w == u:
+                continue
+            successor[u] = v
+            forest.append(edges[j])
+            yield from extend(j+1, size)
+            forest.pop()
+            successor[u] = -1
+
+    for size in range(min_edges, len(edges)+1):
+        found = False
+        for valid_forest in extend(0, size):
+            found = True
+            yield valid_forest
+        # If there is no forest with size edges, there is no larger forest either.
+        if not found:
+            return
+
+class ForestSource:
+    """
+     Lazy source of forests. The forests are only generated while the source is iterated, so that they never need to
+     be all held in memory. The source can be iterated several times, and it generates the same forests in the same
+     order every time.
+
+     Attributes:
+         __generator (Callable[[], Iterator[List[Tuple[int, int]]]], private): Function returning a new iterator over
+         the forests.
+         __count (int | None, private): Number of forests, None if it is unknown.
+         __estimated (bool, private): Indicates whether the number of forests is an estimate.
+
+     Methods:
+         count (public): Returns the number of forests if it is known.
+         estimated (public): Returns whether the number of forests is an estimate.
+    """
+    __generator: Callable[[], Iterator[List[Tuple[int, int]]]]
+    __count: int | None
+    __estimated: bool
+
+    def __init__(self, generator: Callable[[], Iterator[List[Tuple[int, int]]]], count: int | None = None,
+                 estimated: bool = False) -> None:
+        """
+         Initialize the forest source. This is the constructor for the class. No forest is generated.
+
+         Args:
+             generator (Callable[[], Iterator[List[Tuple[int, int]]]], required): Function returning a new iterator
+             over the forests.
+             count (int | None, optional): Number of forests. Default is None which means that it is unknown.
+             estimated (bool, optional): Indicates whether count is an estimate instead of the exact number of forests.
+             Default is False.
+        """
+        self.__generator = generator
+        self.__count = count
+        self.__estimated = estimated
+
+    def __iter__(self) -> Iterator[List[Tuple[int, int]]]:
+        return self.__generator()
+
+    def count(self) -> int | None:
+        """
+         Returns the number of forests if it is known.
+
+         Returns:
+             int | None: Number of forests (exact or estimated), None if it is unknown.
+        """
+        return self.__count
+
+    def estimated(self) -> bool:
+        """
+         Returns whether the number of forests is an estimate.
+
+         Returns:
+             bool: True if count returns an estimate, False if it returns the exact number of forests.
+        """
+        return self.__estimated
+
 def __all_forests(net: Network, min_edges: int, verbose: bool) -> List[List[Tuple[int, int]]]:
     """
      Returns all valid forests for the given network. This is a helper function for generate_forests.
@@ -34,30 +141,158 @@ def __all_forests(net: Network, min_edges: int, verbose: bool) -> List[List[Tupl
      Returns: 
      	 List[List[Tuple[int, int]]]: List of forests, where each forest is a list of edge tuples.
     """
-    # Inner function defined to avoid code duplication.
-    def loop():
-        for i in range(min_edges, len(edges)+1):
-            for subset_edges in combinations(edges, i):
-                if is_forest(net.decomposition(list(subset_edges))[0]):
-                    forests.append(sorted(list(subset_edges), key=lambda x: x[0]))
-                if verbose:
-                    pbar.update(1)
-
-    forests = []
-    edges = list(net.edges.keys())
-    num_cuts = 2**len(edges)
-    for i in range(0, min_edges):
-        num_cuts -= comb(len(edges), i)
-    
+    forests = iterate_forests(net, min_edges)
     if verbose:
-        with tqdm(total=num_cuts, desc='Selecting all valid forests from all cuts', unit='cut') as pbar:
-            loop()
-    else:
-        loop()
-    
-    return forests
+        forests = tqdm(iterable=forests, total=count_forests(net, min_edges), desc='Generating all valid forests',
+                       unit='forest')
+    return list(forests)
+
+def count_forests_by_size(net: Network) -> List[int]:
+    """
+     Counts the valid forests of the given network for every forest size. A valid forest is a rooted spanning forest of
+     the graph of the edges, so by the matrix-tree theorem det(xI + L) = sum over forests F of x^(N - |F|), where L is
+     the out-degree Laplacian of the graph and N the number of servers. The coefficients of this polynomial are
+     computed exactly with the Faddeev-LeVerrier algorithm.
+     
+     Args:
+     	 net (Network, required): Network to count forests for.
+     
+     Returns: 
+     	 List[int]: The number of valid forests with i edges at index i, for i from 0 to N-1.
+    """
+    N = net.num_servers
+    # Sparse rows of M = -L.
+    rows = [[(u, 0)] for u in range(N)]
+    for edge in net.edges.keys():
+        rows[edge[0]].append((edge[1], 1))
+        rows[edge[0]][0] = (edge[0], rows[edge[0]][0][1] - 1)
+
+    # Coefficients of the characteristic polynomial det(xI - M) = sum of coefficients[i] * x^i.
+    coefficients = (N+1) * [0]
+    coefficients[N] = 1
+    Mk = [N * [0] for _ in range(N)]
+    for k in range(1, N+1):
+        Mk = [[sum(value * Mk[j][i] for j, value in rows[u]) + (coefficients[N-k+1] if i == u else 0)
+               for i in range(N)] for u in range(N)]
+        trace = sum(value * Mk[j][u] for u in range(N) for j, value in rows[u])
+        coefficients[N-k] = -trace // k
+
+    return [coefficients[N-size] for size in range(N)]
+
+def __sample_forest(successors: List[List[int]], root_weight: float, rng: Random) -> List[Tuple[int, int]]:
+    """
+     Samples a valid forest with Wilson's algorithm on the graph of the edges augmented with a virtual root, which is
+     the successor of every server with weight root_weight. A forest with r roots is sampled with a probability
+     proportional to root_weight^r, so the forests of a given size are sampled uniformly. This is a helper function for
+     iterate_subset_forests.
+     
+     Args:
+     	 successors (List[List[int]], required): The successors of every server in the graph of the edges.
+     	 root_weight (float, required): Weight of the edges to the virtual root.
+     	 rng (Random, required): The random generator.
+     
+     Returns: 
+     	 List[Tuple[int, int]]: Forest, as a list of edge tuples sorted by source server.
+    """
+    N = len(successors)
+    # Server N is the virtual root.
+    in_forest = N * [False] + [True]
+    successor = N * [N]
+    for i in range(N):
+        # Random walk until the forest is reached. Overwriting the successors erases the loops of the walk.
+        u = i
+        while not in_forest[u]:
+            r = rng.random() * (root_weight + len(successors[u]))
+            successor[u] = N if r < root_weight else successors[u][min(int(r - root_weight), len(successors[u])-1)]
+            u = successor[u]
+        u = i
+        while not in_forest[u]:
+            in_forest[u] = True
+            u = successor[u]
+    return [(u, successor[u]) for u in range(N) if successor[u] != N]
+
+def __root_weight(counts: List[int], size: int) -> float:
+    """
+     Returns the root weight for which __sample_forest samples a forest with the given size with the highest
+     probability. This probability is proportional to counts[size] * root_weight^(N - size). This is a helper function
+     for iterate_subset_forests.
+     
+     Args:
+     	 counts (List[int], required): The number of valid forests for every forest size.
+     	 size (int, required): The number of edges of the forests to sample.
+     
+     Returns: 
+     	 float: The root weight.
+    """
+    N = len(counts)
+    def log_probability(root_weight: float) -> float:
+        logs = [log(count) + (N - i) * log(root_weight) for i, count in enumerate(counts) if count > 0]
+        largest = max(logs)
+        return log(counts[size]) + (N - size) * log(root_weight) - largest \
+            - log(sum(exp(value - largest) for value in logs))
+    return max((10**(i/10) for i in range(-30, 31)), key=log_probability)
+
+def iterate_subset_forests(net: Network, min_edges: int, num_forests: int,
+                           forest_sampling: ForestSampling = ForestSampling.Stratified, seed: int = 0
+                           ) -> Iterator[List[Tuple[int, int]]]:
+    """
+     Generator of a random subset of valid forests for the given network. The empty forest is always generated first.
+     The other forests are sampled directly among the valid forests with at least min_edges edges (see
+     __sample_forest): a forest size is drawn first, with probability proportional to the number of forests of that
+     size that were not generated yet (ForestSampling.Uniform) or uniformly among the sizes that still have forests
+     to generate (ForestSampling.Stratified), and a forest of that size is then sampled uniformly. The same forests are
+     generated in the same order for the same seed, and the global random state is not modified.
+     
+     Args:
+     	 net (Network, required): Network to generate forests for.
+     	 min_edges (int, required): Minimum number of edges that should be included in the forest.
+     	 num_forests (int, required): The number of forests to be generated.
+     	 forest_sampling (ForestSampling, optional): Distribution of the generated forests. Default is
+         ForestSampling.Stratified.
+     	 seed (int, optional): Seed of the random generator. Default is 0.
+          
+     Raises:
+         ValueError: If num_forests exceeds the number of valid forests.
+     
+     Yields: 
+     	 List[Tuple[int, int]]: Forest, as a list of edge tuples sorted by source server.
+    """
+    if num_forests == 0:
+        return
+
+    counts = count_forests_by_size(net)
+    sizes = [size for size in range(max(min_edges, 1), len(counts)) if counts[size] > 0]
+    if num_forests > 1 + sum(counts[size] for size in sizes):
+        raise ValueError(f'Argument \'num_forests\' exceedes the number of valid forests')
+    yield []
 
-def __subset_forests(net: Network, min_edges: int, num_forests: int, verbose: bool)-> List[List[Tuple[int, int]]]:
+    successors = [[] for _ in range(net.num_servers)]
+    for edge in net.edges.keys():
+        successors[edge[0]].append(edge[1])
+    root_weights = {size: __root_weight(counts, size) for size in sizes}
+    remaining = {size: counts[size] for size in sizes}
+    generated = set()
+    rng = Random(seed)
+    for _ in range(num_forests-1):
+        if forest_sampling == ForestSampling.Uniform:
+            weights = [remaining[size] for size in sizes]
+        else:
+            weights = [1 if remaining[size] > 0 else 0 for size in sizes]
+        r = rng.randrange(sum(weights))
+        for size, weight in zip(sizes, weights):
+            if r < weight:
+                break
+            r -= weight
+
+        forest = __sample_forest(successors, root_weights[size], rng)
+        while len(forest) != size or tuple(forest) in generated:
+            forest = __sample_forest(successors, root_weights[size], rng)
+        generated.add(tuple(forest))
+        remaining[size] -= 1
+        yield forest
+
+def __subset_forests(net: Network, min_edges: int, num_forests: int, forest_sampling: ForestSampling, verbose: bool
+                     ) -> List[List[Tuple[int, int]]]:
     """
      Returns a random subset of valid forests for the given network. This is a helper function for generate_forests.
      
@@ -65,47 +300,114 @@ def __subset_forests(net: Network, min_edges: int, num_forests: int, verbose: bo
      	 net (Network, required): Network to generate forests for.
      	 min_edges (int, required): Minimum number of edges that should be included in the forest.
      	 num_forests (int, required): The number of forests to be returned.
+     	 forest_sampling (ForestSampling, required): Distribution of the returned forests.
          verbose (bool, required): Whether the progressbar will be displayed or not
           
      Raises:
-         ValueError: If sampling a random forest fails too many times consecutively.
-         This may give false positives.
+         ValueError: If num_forests exceeds the number of valid forests.
      
      Returns: 
      	 List[List[Tuple[int, int]]]: List of forests, where each forest is a list of edge tuples.
     """
-    # Inner function defined to avoid code duplication.
-    def loop():
-        FAIL_LIMIT = 10**4
-        consecutive_fails = 0
-        while len(forests) < num_forests:
-            num_edges = randint(min_edges,len(edges))
-            subset_edges = sorted(sample(edges, num_edges), key=lambda x: x[0])
-            if subset_edges not in forests and is_forest(net.decomposition(subset_edges)[0]):
-                forests.append(subset_edges)
-                consecutive_fails = 0
-                if verbose:
-                    pbar.update(1)
-            else:
-                consecutive_fails += 1
-                if consecutive_fails > FAIL_LIMIT:
-                    raise ValueError(f'Argument \'num_forests\' exceedes the number of valid forests')
-
-    if num_forests == 0:
-        return []
-    
-    seed(0)
-    edges = list(net.edges.keys())
-    forests = [[]]
+    forests = iterate_subset_forests(net, min_edges, num_forests, forest_sampling)
     if verbose:
-        with tqdm(total=num_forests, desc='Selecting a subset of forests at random', unit='forest', initial=1) as pbar:
-            loop()
-    else:
-        loop()
+        forests = tqdm(iterable=forests, total=num_forests, desc='Selecting a subset of forests at random',
+                       unit='forest')
 
     # Sort the forests based on the length. Smaller forests will be processed first.
     return sorted(forests, key=lambda x: len(x))
 
+def iterate_maximal_forests(net: Network, min_edges: int = 0, slack: int = 0) -> Iterator[List[Tuple[int, int]]]:
+    """
+     Generator of the maximal valid forests for the given network, the valid forests to which no edge can be added.
+     Smaller cuts tend to give better delay bounds, and these forests are the smallest cuts. If slack is positive, the
+     forests obtained by removing at most slack edges from a maximal forest are generated as well.
+     The successor of every server is decided in increasing order: either one of its successors in the network, or
+     none if the server is a root. A forest is maximal if and only if every successor of every root belongs to the
+     tree of that root (adding the edge would close a cycle), which is checked as soon as the servers are decided.
+     
+     Args:
+     	 net (Network, required): Network to generate forests for.
+     	 min_edges (int, optional): Minimum number of edges that should be included in the forest. Default is 0.
+     	 slack (int, optional): Number of edges that can be removed from the maximal forests. Default is 0.
+     
+     Yields: 
+     	 List[Tuple[int, int]]: Forest, as a list of edge tuples sorted by source server.
+    """
+    N = net.num_servers
+    successors = [[] for _ in range(N)]
+    for edge in net.edges.keys():
+        successors[edge[0]].append(edge[1])
+    # Decided successor of every server: -1 if undecided, N if the server is a root.
+    successor = N * [-1]
+    roots = []
+    generated = set()
+
+    # Inner function returning the last server of the decided path from v: a root or an undecided server.
+    def follow(v: int) -> int:
+        while successor[v] != -1 and successor[v] != N:
+            v = successor[v]
+        return v
+
+    # Inner function checking that the successors of the roots can still belong to the tree of their root.
+    def consistent() -> bool:
+        for u in roots:
+            for v in successors[u]:
+                w = follow(v)
+                if successor[w] == N and w != u:
+                    return False
+        return True
+
+    # Inner function deciding the successor of server u.
+    def decide(u: int) -> Iterator[Tuple[Tuple[int, int], ...]]:
+        if u == N:
+            yield tuple((w, successor[w]) for w in range(N) if successor[w] != N)
+            return
+        for v in successors[u]:
+            # The edge closes a cycle if the path from v ends at u.
+            successor[u] = -1
+            if follow(v) == u:
+                continue
+            successor[u] = v
+            if consistent():
+                yield from decide(u+1)
+        successor[u] = N
+        roots.append(u)
+        if consistent():
+            yield from decide(u+1)
+        roots.pop()
+        successor[u] = -1
+
+    for maximal_forest in decide(0):
+        for num_removed in range(min(slack, len(maximal_forest))+1):
+            for removed_edges in combinations(maximal_forest, num_removed):
+                forest = tuple(edge for edge in maximal_forest if edge not in removed_edges)
+                if len(forest) >= min_edges and forest not in generated:
+                    generated.add(forest)
+                    yield list(forest)
+
+def __maximal_forests(net: Network, min_edges: int, slack: int, verbose: bool) -> List[List[Tuple[int, int]]]:
+    """
+     Returns the maximal valid forests for the given network, and the forests with at most slack edges less. This is a
+     helper function for generate_forests.
+     
+     Args:
+     	 net (Network, required): Network to generate forests for.
+     	 min_edges (int, required): Minimum number of edges that should be included in the forest.
+     	 slack (int, required): Number of edges that can be removed from the maximal forests.
+         verbose (bool, required): Whether the progressbar will be displayed or not
+     
+     Returns: 
+     	 List[List[Tuple[int, int]]]: List of forests, where each forest is a list of edge tuples.
+    """
+    forests = iterate_maximal_forests(net, min_edges, slack)
+    if verbose:
+        forests = tqdm(iterable=forests, desc='Generating maximal forests', unit='forest')
+
+    # Sort the forests in the order of __all_forests: based on the length, then on the indexes of the edges.
+    indexes = {edge: i for i, edge in enumerate(net.edges.keys())}
+    return sorted(forests, key=lambda x: (len(x), sorted(indexes[edge] for edge in x)))
+
 def is_forest(net: Network) -> bool:
     """
      Check if a network is a forest.
@@ -113,9 +415,6 @@ def is_forest(net: Network) -> bool:
      
      Args:
      	 net (Network, required): Network to be checked.
-          
-     Raises:
-         NameError: Propagates all the unexpected NameErrors from dfs function.
      
      Returns: 
      	 bool: True if the network is a forest False otherwise.
@@ -125,70 +424,100 @@ def is_forest(net: Network) -> bool:
     for i in range(N):
         if len(net.successors[i]) > 1:
             return False
-    
-    try:
-        for i in range(N):
-            dfs(i, N, net.successors, N * [0], [], [])
-    except NameError as e:
-        if e.args[0] == 'Network has cycles: feed-forward analysis impossible':
-            return False
-        raise e
 
-    return True
+    _, has_cycles = topological_sort(net.successors, N)
+    return not has_cycles
 
-def generate_forests(net: Network, forest_generation: ForestGeneration, min_edges: int, num_forests: int, verbose: bool
-                     ) -> List[List[Tuple[int, int]]]:
+def generate_forests(net: Network, forest_generation: ForestGeneration, min_edges: int, num_forests: int, verbose: bool,
+                     forest_sampling: ForestSampling = ForestSampling.Stratified, lazy: bool = False, slack: int = 0
+                     ) -> List[List[Tuple[int, int]]] | ForestSource:
     """
      Generate forests based on the network.
      Returns no forests if ForestGeneration.Empty.
      Returns a random subset of valid forests if ForestGeneration.Partial.
      Returns all valid forests if ForestGeneration.All.
+     Returns the maximal valid forests, and the forests with at most slack edges less, if ForestGeneration.Maximal.
+     If lazy is True, the forests are not generated: a ForestSource generating them on iteration is returned instead.
+     In that case, the random subset of valid forests and the maximal forests are not sorted based on the length.
      
      Args:
          net (Network, required): Network to generate forests for.
          forest_generation (ForestGeneration, required): The type of forest generation.
      	 min_edges (int, required): Minimum number of edges that should be included in the forest.
      	 num_forests (int, required): The number of forests to be returned.
+         verbose (bool, required): Whether the progressbar will be displayed or not. Ignored if lazy is True.
+         forest_sampling (ForestSampling, optional): Distribution of the random subset of valid forests. Default is
+         ForestSampling.Stratified.
+         lazy (bool, optional): Indicates whether a lazy ForestSource is returned. Default is False.
+         slack (int, optional): Number of edges that can be removed from the maximal forests. Default is 0.
           
      Raises:
          ValueError: If an unexpected forest generation option is received.
      
      Returns: 
-     	 List[List[Tuple[int, int]]]: List of forests, where each forest is a list of edge tuples.
+     	 List[List[Tuple[int, int]]] | ForestSource: List of forests, where each forest is a list of edge tuples, or
+         lazy source of these forests.
     """
     match forest_generation:
         case ForestGeneration.Empty:
-            return []
+            return ForestSource(lambda: iter([]), 0) if lazy else []
         case ForestGeneration.Partial:
-            return __subset_forests(net, min_edges, num_forests, verbose)
+            if lazy:
+                return ForestSource(lambda: iterate_subset_forests(net, min_edges, num_forests, forest_sampling),
+                                    num_forests)
+            return __subset_forests(net, min_edges, num_forests, forest_sampling, verbose)
         case ForestGeneration.All:
+            if lazy:
+                return ForestSource(lambda: iterate_forests(net, min_edges), count_forests(net, min_edges))
             return __all_forests(net, min_edges, verbose)
+        case ForestGeneration.Maximal:
+            if lazy:
+                return ForestSource(lambda: iterate_maximal_forests(net, min_edges, slack))
+            return __maximal_forests(net, min_edges, slack, verbose)
         case _:
             raise ValueError(f'Unhandled forest generation type: {forest_generation}')
 
-def generate_symmetric_forests(forest: List[Tuple[int, int]], N: int) -> List[List[Tuple[int, int]]]:
+def count_forests(net: Network, min_edges: int = 0) -> int:
+    """
+     Counts the valid forests with at least min_edges edges for the given network, which is the number of forests
+     generated with ForestGeneration.All. The forests are counted exactly without being enumerated (see
+     count_forests_by_size).
+     
+     Args:
+     	 net (Network, required): Network to count forests for.
+     	 min_edges (int, optional): Minimum number of edges that should be included in the forest. Default is 0.
+     
+     Returns: 
+     	 int: The number of valid forests.
+    """
+    return sum(count_forests_by_size(net)[min_edges:])
+
+def gray_code_order(net: Network, forests: List[List[Tuple[int, int]]]) -> List[int]:
     """
-     Generates symmetric forests by orienting the given forest around.
-     This function only works for cycle networks with symmetric servers and flows.
+     Returns the order in which the forests are visited by a walk of the binary reflected Gray code over the edge
+     subsets of the network. Consecutive subsets of the Gray code differ by a single edge, so consecutive forests in
+     this order share most of their edges. The forests are sorted by the rank of their edge set in the Gray code, which
+     is obtained by inverting the Gray code of the edge set bitmask.
      
      Args:
-     	 forest (List[Tuple[int, int]], required): A list of edge tuples
-     	 N (int, required): The number of servers in the network
+     	 net (Network, required): Network of the forests.
+     	 forests (List[List[Tuple[int, int]]], required): Forests to order.
      
      Returns: 
-     	 List[List[Tuple[int, int]]]: A list of symmetrically oriented forests.
+     	 List[int]: The indexes of the forests in visiting order.
     """
-    symmetric_forests = [set(forest)]
-    for i in range(1,N):
-        symmetric_forest = set()
+    edge_indexes = {edge: i for i, edge in enumerate(net.edges.keys())}
+    ranks = []
+    for forest in forests:
+        mask = 0
         for edge in forest:
-            symmetric_forest.add(((edge[0]+i)%N,(edge[1]+i)%N))
-        # Some forests do not have N unique orientations
-        if symmetric_forest in symmetric_forests:
-            break
-        symmetric_forests.append(symmetric_forest)
-    
-    return [sorted(list(x), key=lambda x: x[0]) for x in symmetric_forests]
+            mask |= 1 << edge_indexes[edge]
+        rank = 0
+        while mask != 0:
+            rank ^= mask
+            mask >>= 1
+        ranks.append(rank)
+    return sorted(range(len(forests)), key=lambda i: ranks[i])
 
 def scale_network(net: Network, factor: float) -> Network:
     """
@@ -296,21 +625,25 @@ def heuristic_algorithm(edges: List[Tuple[int, int]], N: int, flow_path: List[in
             node_depth_list.append((edge[0], node_depth_list[-1][1]+1))
             forest.append(edge)
 
-    # Then, expand the forest keeping minimal depth.
-    while len(node_depth_list) != 0:
-        node_depth_list = sorted(node_depth_list, key=lambda x: x[1])
-        node_depth = node_depth_list.pop(0)
-        for neighbour in reverse_adjacency_list[node_depth[0]]:
+    # Then, expand the forest keeping minimal depth. The nodes are processed by increasing depth, and in insertion
+    # order for equal depths, with a priority queue of (depth, insertion index, node).
+    node_depth_queue = [(depth, i, node) for i, (node, depth) in enumerate(node_depth_list)]
+    heapify(node_depth_queue)
+    num_inserted = len(node_depth_queue)
+    while len(node_depth_queue) != 0:
+        depth, _, node = heappop(node_depth_queue)
+        for neighbour in reverse_adjacency_list[node]:
             if neighbour in visited:
                 continue
             visited.add(neighbour)
-            if node_depth[1] == max_depth:
+            if depth == max_depth:
                 if connected:
                     break
                 else:
-                    node_depth_list.append((neighbour, 0))
+                    heappush(node_depth_queue, (0, num_inserted, neighbour))
             else:
-                node_depth_list.append((neighbour, node_depth[1]+1))
-                forest.append((neighbour, node_depth[0]))
+                heappush(node_depth_queue, (depth+1, num_inserted, neighbour))
+                forest.append((neighbour, node))
+            num_inserted += 1
     
     return sorted(forest, key=lambda x: x[0])
@@ -0,0 +1,39 @@
+"""
+ File containing the solver related utility functions. Maps the solver backend options to panco solvers.
+"""
+
+# Local Imports - ecowcdb libraries
+from ecowcdb.options import SolverBackend
+
+# Local Imports - panco libraries
+from ecowcdb.panco.highsSolver import HighsSolver
+from ecowcdb.panco.lpSolver import LPSolver, LPSolvePoolSolver, LPSolveSolver
+
+
+
+def create_solver(solver_backend: SolverBackend, temp_folder: str = '') -> LPSolver:
+    """
+     Creates the panco solver corresponding to the given backend.
+     
+     Args:
+     	 solver_backend (SolverBackend, required): The solver backend to use.
+     	 temp_folder (str, optional): Folder to store temporary .lp files, for the backends that need them. Default is
+         '' which means that temp files will be stored in the directory from where the intial call was made.
+     
+     Raises:
+         ValueError: If an unexpected solver backend is received.
+     
+     Returns: 
+     	 LPSolver: The solver used for every linear program of the analysis.
+    """
+    match solver_backend:
+        case SolverBackend.LPSolve:
+            return LPSolveSolver(temp_folder)
+        case SolverBackend.LPSolveFile:
+            return LPSolveSolver(temp_folder, stream=False)
+        case SolverBackend.HiGHS:
+            return HighsSolver(temp_folder)
+        case SolverBackend.LPSolvePool:
+            return LPSolvePoolSolver(temp_folder)
+        case _:
+            raise ValueError(f'Unhandled solver backend: {solver_backend}')
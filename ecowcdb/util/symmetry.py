@@ -0,0 +1,168 @@
+"""
+ File containing the network symmetry related utility functions. The automorphisms of a network map its forests to
+ forests with the same delay bounds (up to a permutation of the flows), so a single forest per orbit needs to be
+ analyzed.
+"""
+
+# Standard Library Imports
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+# Local Imports - panco libraries
+from ecowcdb.panco.descriptor.network import Network
+
+
+
+def __class_indexes(items: List[Any]) -> List[int]:
+    """
+     Returns the index of the equality class of every item. The items do not need to be hashable. This is a helper
+     function for network_automorphisms.
+
+     Args:
+     	 items (List[Any], required): The items to classify.
+
+     Returns:
+     	 List[int]: The class index of every item. Equal items have the same index.
+    """
+    representatives = []
+    indexes = []
+    for item in items:
+        for i, representative in enumerate(representatives):
+            if item == representative:
+                indexes.append(i)
+                break
+        else:
+            indexes.append(len(representatives))
+            representatives.append(item)
+    return indexes
+
+def __relabel(signatures: List[Any]) -> List[int]:
+    """
+     Replaces the signatures by their rank among the distinct signatures. This is a helper function for
+     network_automorphisms.
+
+     Args:
+     	 signatures (List[Any], required): The signatures (hashable and comparable).
+
+     Returns:
+     	 List[int]: The rank of every signature.
+    """
+    ranks = {signature: i for i, signature in enumerate(sorted(set(signatures)))}
+    return [ranks[signature] for signature in signatures]
+
+def network_automorphisms(net: Network, limit: int = 256) -> List[Tuple[List[int], List[int]]]:
+    """
+     Computes the automorphisms of the network. An automorphism is a permutation of the servers and a permutation of
+     the flows such that every server is mapped to an equal server (same service curves and shapers), and every flow is
+     mapped to a flow with the same arrival curves whose path is the image of its path. The arrival shaping groups must
+     be mapped to arrival shaping groups. Reflections are found as well as rotations, as long as they map the paths to
+     paths. Servers that are not crossed by any flow are not permuted.
+     The candidate images of the servers are restricted by colour refinement, and the automorphisms are then found by
+     backtracking. Only the first limit automorphisms are returned, which is still correct for the orbit reduction but
+     may find smaller orbits.
+
+     Args:
+     	 net (Network, required): The network.
+     	 limit (int, optional): Maximum number of automorphisms returned. Default is 256.
+
+     Returns:
+     	 List[Tuple[List[int], List[int]]]: The automorphisms, as pairs of server and flow permutations. The identity is
+         always included.
+    """
+    N = net.num_servers
+    paths = net.path
+    flow_classes = __class_indexes([flow.arrival_curve for flow in net.flows])
+
+    # Colour refinement: servers and flows can only be mapped to servers and flows with the same colour.
+    server_colours = __class_indexes(net.servers)
+    server_colours = [(colour, u if len(net.flows_in_server[u]) == 0 else -1) for u, colour in enumerate(server_colours)]
+    server_colours = __relabel(server_colours)
+    num_colours = -1
+    while True:
+        flow_colours = __relabel([(flow_classes[j], tuple(server_colours[u] for u in path))
+                                  for j, path in enumerate(paths)])
+        server_colours = __relabel([(server_colours[u], tuple(sorted((flow_colours[j], paths[j].index(u))
+                                                                     for j in net.flows_in_server[u])))
+                                    for u in range(N)])
+        if len(set(server_colours)) == num_colours:
+            break
+        num_colours = len(set(server_colours))
+
+    candidates = [[v for v in range(N) if server_colours[v] == server_colours[u]] for u in range(N)]
+    flow_keys = [(flow_classes[j], tuple(path)) for j, path in enumerate(paths)]
+    flows_of_key: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+    for j, key in enumerate(flow_keys):
+        flows_of_key.setdefault(key, []).append(j)
+    key_counts = Counter(flow_keys)
+    # Servers are assigned in increasing order, so the path of a flow is mapped once its largest server is assigned.
+    completed_flows = [[] for _ in range(N)]
+    for j, path in enumerate(paths):
+        completed_flows[max(path)].append(j)
+    shaping = [(x, sorted(y), z) for x, y, z in net.arrival_shaping]
+
+    automorphisms = []
+    permutation = N * [-1]
+    used = N * [False]
+
+    # Inner function returning the flow permutation matching the complete server permutation, None if there is none.
+    def flow_permutation() -> List[int] | None:
+        mapped_keys = [(flow_classes[j], tuple(permutation[u] for u in path)) for j, path in enumerate(paths)]
+        if Counter(mapped_keys) != key_counts:
+            return None
+        available = {key: list(flows) for key, flows in flows_of_key.items()}
+        flow_map = [available[key].pop(0) for key in mapped_keys]
+        mapped_shaping = [(permutation[x], sorted(flow_map[j] for j in y), z) for x, y, z in shaping]
+        remaining = list(shaping)
+        for group in mapped_shaping:
+            if group not in remaining:
+                return None
+            remaining.remove(group)
+        return flow_map
+
+    # Inner function assigning the image of server u by backtracking.
+    def assign(u: int) -> None:
+        if len(automorphisms) >= limit:
+            return
+        if u == N:
+            flow_map = flow_permutation()
+            if flow_map is not None:
+                automorphisms.append((list(permutation), flow_map))
+            return
+        for v in candidates[u]:
+            if used[v]:
+                continue
+            permutation[u] = v
+            used[v] = True
+            if all((flow_classes[j], tuple(permutation[w] for w in paths[j])) in key_counts
+                   for j in completed_flows[u]):
+                assign(u+1)
+            used[v] = False
+            permutation[u] = -1
+
+    assign(0)
+    identity = (list(range(N)), list(range(net.num_flows)))
+    if identity not in automorphisms:
+        automorphisms = [identity] + automorphisms[:limit-1]
+    return automorphisms
+
+def canonical_forest(forest: List[Tuple[int, int]], automorphisms: List[Tuple[List[int], List[int]]]
+                     ) -> Tuple[Tuple[Tuple[int, int], ...], List[int]]:
+    """
+     Returns the canonical forest of the orbit of the forest, which is its smallest image by the automorphisms.
+     Two forests with the same canonical forest have the same delay bounds up to a permutation of the flows.
+
+     Args:
+     	 forest (List[Tuple[int, int]], required): The forest.
+     	 automorphisms (List[Tuple[List[int], List[int]]], required): The automorphisms of the network.
+
+     Returns:
+     	 Tuple[Tuple[Tuple[int, int], ...], List[int]]: The canonical forest, and the flow permutation of the
+         automorphism mapping the forest to it: the delay of flow j in the forest is the delay of flow flow_map[j] in
+         the canonical forest.
+    """
+    best = None
+    for permutation, flow_map in automorphisms:
+        image = tuple(sorted((permutation[edge[0]], permutation[edge[1]]) for edge in forest))
+        if best is None or image < best[0]:
+            best = (image, flow_map)
+    return best
@@ -8,7 +8,8 @@ from __future__ import annotations
 from typing import Any, Callable, Dict, List, Tuple
 
 # Local Imports - ecowcdb libraries
-from ecowcdb.options import DisplayUnit, ForestGeneration, NetworkType, VerboseKW
+from ecowcdb.options import (DisplayUnit, ForestGeneration, ForestOrder, ForestSampling, NetworkType, SolverBackend,
+                             VerboseKW)
 
 # Local Imports - panco libraries
 from ecowcdb.panco.descriptor.network import Network
@@ -148,6 +149,8 @@ class Validation:
              constructor_arguments (public): Validates all the arguments passed to the constructor of the Analysis
              class.
              callable (public): Checks whether a given function is callable.
+             workers (public): Validates the given number of workers.
+             sample_size (public): Validates the given sample size.
              foi (public): Validates the given foi.
              forest (public): Validates the given forest.
              filename (public): Validates the given filename.
@@ -162,7 +165,10 @@ class Validation:
         
         def constructor_arguments(self, net: Network, forest_generation: ForestGeneration, num_forests: int,
                                   min_edges: int, timeout: int, delay_unit: DisplayUnit, runtime_unit: DisplayUnit,
-                                  temp_folder: str, results_folder: str, verbose: List[VerboseKW]) -> None:
+                                  temp_folder: str, results_folder: str, verbose: List[VerboseKW],
+                                  solver_backend: SolverBackend, workers: int, lazy_forests: bool,
+                                  forest_sampling: ForestSampling, slack: int, forest_order: ForestOrder,
+                                  batch_lps: bool, tree_workers: int, pipeline_lps: bool) -> None:
             """
              Validates all the arguments passed to the constructor of the Analysis class.
              
@@ -177,6 +183,15 @@ class Validation:
              	 temp_folder (str, required): str to be validated.
              	 results_folder (str, required): str to be validated.
              	 verbose (List[VerboseKW], required): List of VerboseKW to be validated.
+             	 solver_backend (SolverBackend, required): SolverBackend to be validated.
+             	 workers (int, required): int to be validated.
+             	 lazy_forests (bool, required): bool to be validated.
+             	 forest_sampling (ForestSampling, required): ForestSampling to be validated.
+             	 slack (int, required): int to be validated.
+             	 forest_order (ForestOrder, required): ForestOrder to be validated.
+             	 batch_lps (bool, required): bool to be validated.
+             	 tree_workers (int, required): int to be validated.
+             	 pipeline_lps (bool, required): bool to be validated.
             """
             self.__validation._type(net, 'net', Network)
             self.__validation._type(forest_generation, 'forest_generation', ForestGeneration)
@@ -188,10 +203,22 @@ class Validation:
             self.__validation._type(temp_folder, 'temp_folder', str)
             self.__validation._type(results_folder, 'results_folder', str)
             self.__validation._type(verbose, 'verbose', list)
+            self.__validation._type(solver_backend, 'solver_backend', SolverBackend)
+            self.__validation._type(workers, 'workers', int)
+            self.__validation._type(lazy_forests, 'lazy_forests', bool)
+            self.__validation._type(forest_sampling, 'forest_sampling', ForestSampling)
+            self.__validation._type(slack, 'slack', int)
+            self.__validation._type(forest_order, 'forest_order', ForestOrder)
+            self.__validation._type(batch_lps, 'batch_lps', bool)
+            self.__validation._type(tree_workers, 'tree_workers', int)
+            self.__validation._type(pipeline_lps, 'pipeline_lps', bool)
             self.__validation._non_negative(num_forests, 'num_forests')
             self.__validation._non_negative(min_edges, 'min_edges')
+            self.__validation._non_negative(slack, 'slack')
             self.__validation._upper_bound(min_edges, 'min_edges', len(list(net.edges.keys())))
             self.__validation._positive(timeout, 'timeout')
+            self.__validation._positive(workers, 'workers')
+            self.__validation._positive(tree_workers, 'tree_workers')
             self.__validation._types_in_list(verbose, 'verbose', VerboseKW)
 
         def callable(self, forest_generation: ForestGeneration, foo: Callable[..., Any]) -> None:
@@ -210,6 +237,28 @@ class Validation:
                 raise ValueError(f'Cannot execute function \'{foo.__name__}\' because argument \'forest_generation\'\
                                  option was set to {ForestGeneration.Empty} in the constructor')
 
+        def workers(self, workers: int | None) -> None:
+            """
+             Validates the given number of workers. Checks if it is None, or a positive int.
+             
+             Args:
+                 workers (int | None, required): Number of workers to be validated.
+            """
+            if workers is None:
+                return
+            self.__validation._type(workers, 'workers', int)
+            self.__validation._positive(workers, 'workers')
+
+        def sample_size(self, sample_size: int) -> None:
+            """
+             Validates the given sample size. Checks if it is a positive int.
+             
+             Args:
+                 sample_size (int, required): Sample size to be validated.
+            """
+            self.__validation._type(sample_size, 'sample_size', int)
+            self.__validation._positive(sample_size, 'sample_size')
+
         def foi(self, foi: int, num_flows: int) -> None:
             """
              Validates the given foi. Checks if it is an int, non-negative, and less than the largest possible flow.
@@ -435,16 +484,26 @@ class Validation:
             """
             self.__validation = Validation()
         
-        def constructor_arguments(self, net: Network, temp_folder: str) -> None:
+        def constructor_arguments(self, net: Network, temp_folder: str, solver_backend: SolverBackend,
+                                  batch_lps: bool, tree_workers: int, pipeline_lps: bool) -> None:
             """
              Validates all the arguments passed to the constructor of the ECOWCDB class.
              
              Args:
              	 net (Network, required): Network to be validated.
              	 temp_folder (str, required): str to be validated.
+             	 solver_backend (SolverBackend, required): SolverBackend to be validated.
+             	 batch_lps (bool, required): bool to be validated.
+             	 tree_workers (int, required): int to be validated.
+             	 pipeline_lps (bool, required): bool to be validated.
             """
             self.__validation._type(net, 'net', Network)
             self.__validation._type(temp_folder, 'temp_folder', str)
+            self.__validation._type(batch_lps, 'batch_lps', bool)
+            self.__validation._type(solver_backend, 'solver_backend', SolverBackend)
+            self.__validation._type(tree_workers, 'tree_workers', int)
+            self.__validation._positive(tree_workers, 'tree_workers')
+            self.__validation._type(pipeline_lps, 'pipeline_lps', bool)
 
         def foi(self, foi: int, num_flows: int) -> None:
             """
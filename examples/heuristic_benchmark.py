@@ -0,0 +1,55 @@
+# Standard Library Imports
+from time import perf_counter
+
+# Local Imports - ecowcdb libraries
+from ecowcdb.networks import Networks
+from ecowcdb.util.network import heuristic_algorithm
+
+
+
+def ring_network(N: int, R: float, L: float, S: float, load: float, flow_length: int):
+    # N flows of flow_length servers, one starting at every server of the ring.
+    servers_args = N * [([(R, L)], [(0.0, R)])]
+    flows_args = [([(S, load * R / flow_length)], [(i+j) % N for j in range(flow_length)]) for i in range(N)]
+    return Networks().custom(servers_args, flows_args)
+
+
+def sink_tree_network(N: int, R: float, L: float, S: float, load: float, fan_in: int):
+    # Every server sends a flow towards server 0 through its parent and grandparent, and server 0 sends some flows back
+    # to create cyclic dependencies.
+    servers_args = N * [([(R, L)], [(0.0, R)])]
+    paths = []
+    for i in range(1, N):
+        parent = (i-1) // fan_in
+        paths.append([i, parent] + ([(parent-1) // fan_in] if parent > 0 else []))
+    paths += [[0, i] for i in range(1, N, 50)]
+    flows_args = [([(S, load * R / (fan_in+1) / 3)], path) for path in paths]
+    return Networks().custom(servers_args, flows_args)
+
+
+def main():
+    R = 10.0**7 # Kb/s
+    L = 10.0**-5 # s
+    S = 8.0 # Kb
+    N = 5000 # servers
+    load = 0.5
+    max_depth = 8
+    repeats = 10
+
+    nets = {'Ring': ring_network(N, R, L, S, load, 4), 'Sink Tree': sink_tree_network(N, R, L, S, load, 4)}
+    for name, net in nets.items():
+        edges = list(net.edges.keys())
+        flow_path = net.path[0]
+        # Forest selection of MCF, MCFr and MCTr (see ECOWCDB class), without the delay computation.
+        algorithms = {'MCF': (-1, False), 'MCFr': (max_depth, False), 'MCTr': (max_depth, True)}
+        for algorithm, (depth, connected) in algorithms.items():
+            start = perf_counter()
+            for _ in range(repeats):
+                forest = heuristic_algorithm(edges, net.num_servers, flow_path, depth, connected)
+            elapsed = (perf_counter() - start) / repeats
+            print(f'{name} ({net.num_servers} servers, {len(edges)} edges) {algorithm}: {len(forest)} edges kept in '
+                  f'{elapsed*1000:.2f}ms')
+
+
+if __name__ == '__main__':
+    main()